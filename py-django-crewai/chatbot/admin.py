@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Conversation, Message
+from .models import Conversation, Message, CrewJob, CrewJobEvent
 
 @admin.register(Conversation)
 class ConversationAdmin(admin.ModelAdmin):
@@ -13,3 +13,16 @@ class MessageAdmin(admin.ModelAdmin):
     list_filter = ('sender', 'created_at')
     search_fields = ('content',)
     ordering = ('conversation', 'created_at')
+
+@admin.register(CrewJob)
+class CrewJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'conversation', 'mode', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('mode', 'status', 'created_at')
+    search_fields = ('query',)
+    ordering = ('-created_at',)
+
+@admin.register(CrewJobEvent)
+class CrewJobEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'job', 'event', 'created_at')
+    list_filter = ('event', 'created_at')
+    ordering = ('-id',)
@@ -0,0 +1,94 @@
+"""
+Management command that micro-benchmarks the in-process caches.
+
+Usage:
+    python manage.py benchmark_caches --sizes 100 1000 10000 --ops 50000 --threads 4
+
+Reports get and set throughput of TTLCache once full (so every set evicts),
+and of the memory and locmem Django backends used for the pipeline cache.
+Throughput should stay flat as the cache grows.
+"""
+
+import threading
+import time
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from chatbot.services.memory_cache import MemoryCacheBackend, TTLCache
+
+
+class Command(BaseCommand):
+    help = 'Measure get/set throughput of the in-process caches at several sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[100, 1000, 10000],
+            help='Cache sizes (maximum entries) to benchmark'
+        )
+        parser.add_argument(
+            '--ops',
+            type=int,
+            default=50000,
+            help='Operations per measurement'
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=4,
+            help='Threads sharing the cache in the concurrent measurement'
+        )
+
+    def handle(self, *args, **options):
+        ops = options['ops']
+        self.stdout.write(f"{'cache':<24}{'size':>8}{'set/s':>12}{'get/s':>12}{'mixed/s (threads)':>20}")
+
+        for size in options['sizes']:
+            caches = [
+                ('TTLCache', TTLCache(max_size=size, default_ttl=3600)),
+                ('MemoryCacheBackend', MemoryCacheBackend(f'benchmark-{size}', {'OPTIONS': {'MAX_ENTRIES': size}})),
+                ('LocMemCache', LocMemCache(f'benchmark-{size}', {'OPTIONS': {'MAX_ENTRIES': size}})),
+            ]
+            for name, cache in caches:
+                # Fill the cache so that every further set evicts an entry
+                for i in range(size):
+                    cache.set(f"key-{i}", {'id': i})
+
+                set_rate = self._measure(lambda i: cache.set(f"key-{size + i}", {'id': i}), ops)
+                # Read back the keys that survived the sets, so gets are hits
+                get_rate = self._measure(lambda i: cache.get(f"key-{size + ops - 1 - i % size}"), ops)
+                mixed_rate = self._measure_threaded(cache, size, ops, options['threads'])
+                self.stdout.write(f"{name:<24}{size:>8}{set_rate:>12,.0f}{get_rate:>12,.0f}{mixed_rate:>20,.0f}")
+
+            stats = caches[0][1].stats()
+            self.stdout.write(f"  TTLCache counters: hits={stats['hits']} misses={stats['misses']} "
+                              f"evictions={stats['evictions']}")
+
+    def _measure(self, operation, ops):
+        started = time.perf_counter()
+        for i in range(ops):
+            operation(i)
+        return ops / (time.perf_counter() - started)
+
+    def _measure_threaded(self, cache, size, ops, thread_count):
+        """Run a 90% get / 10% set workload from several threads at once."""
+        per_thread = max(ops // thread_count, 1)
+
+        def worker(offset):
+            for i in range(per_thread):
+                key = f"key-{(offset + i) % (size * 2)}"
+                if i % 10 == 0:
+                    cache.set(key, {'id': i})
+                else:
+                    cache.get(key)
+
+        threads = [threading.Thread(target=worker, args=(n * per_thread,)) for n in range(thread_count)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return per_thread * thread_count / (time.perf_counter() - started)
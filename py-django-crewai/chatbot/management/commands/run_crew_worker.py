@@ -0,0 +1,63 @@
+"""
+Management command that runs crew job workers in a dedicated process.
+
+Usage:
+    python manage.py run_crew_worker --threads 2 --casual-threads 1
+
+Use together with CREW_JOB_WORKER_MODE=external so web processes only enqueue jobs.
+"""
+
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from chatbot.services.job_runner import CASUAL_LANES, requeue_stale_jobs, start_workers
+
+
+class Command(BaseCommand):
+    help = 'Run background workers that execute queued movie crew jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=getattr(settings, 'CREW_JOB_WORKER_THREADS', 2),
+            help='Number of worker threads to run for all lanes (casual jobs first)'
+        )
+        parser.add_argument(
+            '--casual-threads',
+            type=int,
+            default=getattr(settings, 'CREW_JOB_CASUAL_WORKER_THREADS', 1),
+            help='Number of worker threads that only run casual jobs'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=getattr(settings, 'CREW_JOB_POLL_INTERVAL', 1.0),
+            help='Seconds to wait between checks for new jobs'
+        )
+
+    def handle(self, *args, **options):
+        stop_event = threading.Event()
+
+        def _shutdown(signum, frame):
+            self.stdout.write('Stopping crew job workers after their current job...')
+            stop_event.set()
+
+        signal.signal(signal.SIGTERM, _shutdown)
+        signal.signal(signal.SIGINT, _shutdown)
+
+        requeue_stale_jobs()
+        workers = start_workers(options['threads'], options['poll_interval'], stop_event)
+        workers += start_workers(options['casual_threads'], options['poll_interval'], stop_event, lanes=CASUAL_LANES)
+        self.stdout.write(self.style.SUCCESS(f"Started {len(workers)} crew job worker(s)"))
+
+        # Wait on the stop event so signals are handled promptly in the main thread
+        while not stop_event.wait(1.0):
+            pass
+
+        for worker in workers:
+            worker.join()
+        self.stdout.write(self.style.SUCCESS('Crew job workers stopped'))
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0003_theater_distance_miles'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CrewJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mode', models.CharField(choices=[('first_run', 'First Run Movies'), ('casual', 'Casual Viewing')], max_length=10)),
+                ('query', models.TextField()),
+                ('user_location', models.CharField(blank=True, max_length=255)),
+                ('user_ip', models.CharField(blank=True, max_length=45)),
+                ('timezone', models.CharField(blank=True, max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], db_index=True, default='pending', max_length=10)),
+                ('result', models.JSONField(blank=True, help_text='Response payload returned to polling clients once the job succeeds', null=True)),
+                ('error', models.TextField(blank=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('worker_id', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='chatbot.conversation')),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0004_crewjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crewjob',
+            name='flight_key',
+            field=models.CharField(blank=True, db_index=True, help_text='Identifies jobs that would run an identical crew execution', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='crewjob',
+            name='response_data',
+            field=models.JSONField(blank=True, help_text='Raw pipeline output, shared with identical jobs in flight', null=True),
+        ),
+    ]
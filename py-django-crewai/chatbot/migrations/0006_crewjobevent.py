@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0005_crewjob_flight_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CrewJobEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(choices=[('queued', 'Queued'), ('started', 'Started'), ('crew_started', 'Crew Started'), ('task_finished', 'Task Finished'), ('recommendations_ready', 'Recommendations Ready'), ('theaters_ready', 'Theaters Ready'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], max_length=25)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='chatbot.crewjob')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0006_crewjobevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movierecommendation',
+            name='job',
+            field=models.ForeignKey(blank=True, help_text='The crew job that produced this recommendation', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='recommendations', to='chatbot.crewjob'),
+        ),
+        migrations.AddField(
+            model_name='movierecommendation',
+            name='theaters_ready',
+            field=models.BooleanField(default=True, help_text='False while the theater search for this movie is still running'),
+        ),
+    ]
@@ -43,6 +43,10 @@ class MovieRecommendation(models.Model):
     release_date = models.DateField(blank=True, null=True)
     tmdb_id = models.IntegerField(blank=True, null=True)
     rating = models.DecimalField(max_digits=3, decimal_places=1, blank=True, null=True)
+    job = models.ForeignKey('CrewJob', on_delete=models.SET_NULL, blank=True, null=True, related_name='recommendations',
+                            help_text="The crew job that produced this recommendation")
+    theaters_ready = models.BooleanField(default=True,
+                                         help_text="False while the theater search for this movie is still running")
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -69,3 +73,79 @@ class Showtime(models.Model):
 
     def __str__(self):
         return f"{self.movie.title} at {self.theater.name} - {self.start_time.strftime('%Y-%m-%d %H:%M')}"
+
+class CrewJob(models.Model):
+    """A queued crew execution for a user query, processed by a background worker."""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='jobs')
+    mode = models.CharField(max_length=10, choices=Conversation.MODE_CHOICES)
+    query = models.TextField()
+    user_location = models.CharField(max_length=255, blank=True)
+    user_ip = models.CharField(max_length=45, blank=True)
+    timezone = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    flight_key = models.CharField(max_length=255, blank=True, db_index=True,
+                                  help_text="Identifies jobs that would run an identical crew execution")
+    response_data = models.JSONField(blank=True, null=True,
+                                     help_text="Raw pipeline output, shared with identical jobs in flight")
+    result = models.JSONField(blank=True, null=True,
+                              help_text="Response payload returned to polling clients once the job succeeds")
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker_id = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['created_at']
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_SUCCEEDED, self.STATUS_FAILED)
+
+    def __str__(self):
+        return f"Job {self.id} ({self.mode}, {self.status}): {self.query[:50]}"
+
+class CrewJobEvent(models.Model):
+    """A progress event for a crew job, streamed to clients as it happens."""
+    EVENT_QUEUED = 'queued'
+    EVENT_STARTED = 'started'
+    EVENT_CREW_STARTED = 'crew_started'
+    EVENT_TASK_FINISHED = 'task_finished'
+    EVENT_RECOMMENDATIONS_READY = 'recommendations_ready'
+    EVENT_THEATERS_READY = 'theaters_ready'
+    EVENT_SUCCEEDED = 'succeeded'
+    EVENT_FAILED = 'failed'
+    EVENT_CHOICES = [
+        (EVENT_QUEUED, 'Queued'),
+        (EVENT_STARTED, 'Started'),
+        (EVENT_CREW_STARTED, 'Crew Started'),
+        (EVENT_TASK_FINISHED, 'Task Finished'),
+        (EVENT_RECOMMENDATIONS_READY, 'Recommendations Ready'),
+        (EVENT_THEATERS_READY, 'Theaters Ready'),
+        (EVENT_SUCCEEDED, 'Succeeded'),
+        (EVENT_FAILED, 'Failed'),
+    ]
+    TERMINAL_EVENTS = (EVENT_SUCCEEDED, EVENT_FAILED)
+
+    job = models.ForeignKey(CrewJob, on_delete=models.CASCADE, related_name='events')
+    event = models.CharField(max_length=25, choices=EVENT_CHOICES)
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"Job {self.job_id}: {self.event}"
@@ -12,5 +12,20 @@ from .views import (
     get_theaters,
     theater_status,
     reset_conversation,
-    get_api_config
+    get_api_config,
+    get_metrics,
+    job_events
 )
+
+from django.conf import settings
+
+# Serve the recommendation and polling endpoints from native async views under ASGI
+if getattr(settings, 'ASYNC_VIEWS_ENABLED', False):
+    from .views import (
+        aget_movies_theaters_and_showtimes as get_movies_theaters_and_showtimes,
+        aget_movie_recommendations as get_movie_recommendations,
+        apoll_movie_recommendations as poll_movie_recommendations,
+        apoll_first_run_recommendations as poll_first_run_recommendations,
+        atheater_status as theater_status,
+        ajob_events as job_events
+    )
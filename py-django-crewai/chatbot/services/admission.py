@@ -0,0 +1,221 @@
+"""
+Admission Control
+Bounds how many crew executions run at once so that a burst of users cannot
+start unlimited LLM sessions and threads.
+
+Crews run in lanes with independent limits, so slow first run crews (SerpAPI,
+Overpass) never hold up cheap casual ones:
+- Per process and lane, CREW_CASUAL_MAX_IN_FLIGHT or CREW_FIRST_RUN_MAX_IN_FLIGHT
+  crews may run at once. Further executions wait in a bounded queue
+  (CREW_ADMISSION_QUEUE_SIZE) for up to CREW_ADMISSION_MAX_WAIT seconds and are
+  rejected once the queue is full or the wait runs out.
+- Across processes, new requests are turned away with 429 and Retry-After as soon
+  as CREW_JOB_MAX_PENDING jobs of their lane are already waiting in the job queue.
+
+Queue depth and wait times are reported by the `/api/metrics/` endpoint.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils import timezone
+
+from ..models import CrewJob
+
+# Get the logger
+logger = logging.getLogger('chatbot.admission')
+
+# Number of recent wait times kept for the wait-time percentiles
+WAIT_SAMPLES = 200
+
+# Execution lanes (named after the job modes) and the setting that limits each one
+LANE_CASUAL = 'casual'
+LANE_FIRST_RUN = 'first_run'
+LANE_MAX_IN_FLIGHT_SETTINGS = {
+    LANE_CASUAL: ('CREW_CASUAL_MAX_IN_FLIGHT', 2),
+    LANE_FIRST_RUN: ('CREW_FIRST_RUN_MAX_IN_FLIGHT', 2),
+}
+
+
+class AdmissionRejected(Exception):
+    """Raised when a crew execution is turned away because the system is at capacity."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Limits concurrent crew executions in this process, with a bounded wait queue.
+    """
+
+    def __init__(self, name, max_in_flight, max_queue, max_wait):
+        """
+        Initialize the controller
+
+        Args:
+            name: Name used in logs and metrics
+            max_in_flight: Maximum executions running at once
+            max_queue: Maximum executions waiting for a slot
+            max_wait: Maximum seconds an execution waits for a slot
+        """
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._waiting = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self._durations = deque(maxlen=WAIT_SAMPLES)
+
+    def acquire(self):
+        """
+        Wait for an execution slot.
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            AdmissionRejected: If the wait queue is full or no slot frees up in time
+        """
+        start = time.monotonic()
+        with self._condition:
+            if self._in_flight >= self.max_in_flight:
+                if self._waiting >= self.max_queue:
+                    self._rejected += 1
+                    raise AdmissionRejected(f"{self.name}: wait queue is full", self.retry_after())
+
+                self._waiting += 1
+                try:
+                    admitted = self._condition.wait_for(
+                        lambda: self._in_flight < self.max_in_flight,
+                        timeout=self.max_wait
+                    )
+                finally:
+                    self._waiting -= 1
+                if not admitted:
+                    self._rejected += 1
+                    raise AdmissionRejected(f"{self.name}: no slot after {self.max_wait}s", self.retry_after())
+
+            self._in_flight += 1
+            self._admitted += 1
+            waited = time.monotonic() - start
+            self._waits.append(waited)
+        if waited > 1:
+            logger.info(f"[{self.name}] Admitted after waiting {waited:.1f}s")
+        return waited
+
+    def release(self, duration=None):
+        """Free an execution slot, recording how long the execution ran."""
+        with self._condition:
+            self._in_flight -= 1
+            if duration is not None:
+                self._durations.append(duration)
+            self._condition.notify()
+
+    @contextmanager
+    def admit(self):
+        """Run the enclosed block in an execution slot."""
+        self.acquire()
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+    def retry_after(self):
+        """Seconds a rejected client should wait before retrying, based on recent run times."""
+        default_retry_after = getattr(settings, 'CREW_ADMISSION_RETRY_AFTER', 15)
+        if not self._durations:
+            return default_retry_after
+        average = sum(self._durations) / len(self._durations)
+        return max(1, min(math.ceil(average), default_retry_after * 4))
+
+    def stats(self):
+        """Return counters, queue depth and wait-time percentiles for monitoring."""
+        with self._condition:
+            waits = sorted(self._waits)
+            return {
+                'max_in_flight': self.max_in_flight,
+                'in_flight': self._in_flight,
+                'queue_depth': self._waiting,
+                'max_queue': self.max_queue,
+                'admitted': self._admitted,
+                'rejected': self._rejected,
+                'wait_seconds_avg': round(sum(waits) / len(waits), 3) if waits else 0.0,
+                'wait_seconds_p95': round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 3) if waits else 0.0,
+                'wait_seconds_max': round(waits[-1], 3) if waits else 0.0
+            }
+
+
+_controllers = {}
+_controllers_lock = threading.Lock()
+
+
+def lane_for(first_run_mode):
+    """Return the execution lane for a query."""
+    return LANE_FIRST_RUN if first_run_mode else LANE_CASUAL
+
+
+def get_admission_controller(lane=LANE_CASUAL):
+    """Get the process-wide admission controller for a lane, creating it on first use."""
+    controller = _controllers.get(lane)
+    if controller is not None:
+        return controller
+
+    with _controllers_lock:
+        controller = _controllers.get(lane)
+        if controller is None:
+            setting_name, default_limit = LANE_MAX_IN_FLIGHT_SETTINGS[lane]
+            controller = AdmissionController(
+                lane,
+                max_in_flight=getattr(settings, setting_name, default_limit),
+                max_queue=getattr(settings, 'CREW_ADMISSION_QUEUE_SIZE', 8),
+                max_wait=getattr(settings, 'CREW_ADMISSION_MAX_WAIT', 30)
+            )
+            _controllers[lane] = controller
+        return controller
+
+
+def admission_stats():
+    """Return admission metrics for each lane."""
+    return {lane: get_admission_controller(lane).stats() for lane in LANE_MAX_IN_FLIGHT_SETTINGS}
+
+
+def check_job_backlog(lane):
+    """
+    Turn a new request away if too many jobs of its lane are already waiting.
+
+    Raises:
+        AdmissionRejected: If CREW_JOB_MAX_PENDING jobs of the lane are pending
+    """
+    max_pending = getattr(settings, 'CREW_JOB_MAX_PENDING', 50)
+    if not max_pending:
+        return
+    pending = CrewJob.objects.filter(status=CrewJob.STATUS_PENDING, mode=lane).count()
+    if pending >= max_pending:
+        logger.warning(f"Rejecting {lane} request: {pending} jobs pending (limit {max_pending})")
+        raise AdmissionRejected(f"{pending} {lane} jobs pending", get_admission_controller(lane).retry_after())
+
+
+def job_queue_stats():
+    """Return the depth of the job queue and the age of its oldest pending job, per lane."""
+    stats = {}
+    for lane in LANE_MAX_IN_FLIGHT_SETTINGS:
+        pending = CrewJob.objects.filter(status=CrewJob.STATUS_PENDING, mode=lane)
+        oldest = pending.order_by('created_at').values_list('created_at', flat=True).first()
+        stats[lane] = {
+            'pending_jobs': pending.count(),
+            'running_jobs': CrewJob.objects.filter(status=CrewJob.STATUS_RUNNING, mode=lane).count(),
+            'oldest_pending_seconds': round((timezone.now() - oldest).total_seconds(), 1) if oldest else 0.0
+        }
+    return stats
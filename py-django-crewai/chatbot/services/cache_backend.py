@@ -0,0 +1,167 @@
+"""
+Shared Cache Backend
+Stores crew results, theater lists and geocoded coordinates in the Django cache
+named 'pipeline', so every gunicorn worker and instance reads and warms the same
+entries, and they survive restarts when a file, database or Redis backend is
+configured (see CACHE_BACKEND).
+
+Each kind of data gets its own PipelineCache namespace with its own TTL. Cache
+errors are logged and treated as misses, so an unreachable backend slows
+requests down but never fails them.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from .memory_cache import MemoryCacheBackend
+
+# Get the logger
+logger = logging.getLogger('chatbot.cache')
+
+# Django cache alias configured in movie_chatbot/settings/cache.py
+PIPELINE_CACHE_ALIAS = 'pipeline'
+
+
+def location_bucket(user_location=None, user_ip=None):
+    """
+    Reduce a user's location to a bucket shared by users who would see the same theaters.
+
+    Args:
+        user_location: Location string supplied by the client
+        user_ip: Client IP address, used when no usable location was supplied
+
+    Returns:
+        Normalized location string
+    """
+    if user_location and user_location.strip().lower() not in ('', 'unknown'):
+        return re.sub(r'\s+', ' ', user_location.strip().lower())
+    if user_ip:
+        return f"ip:{user_ip}"
+    return 'unknown'
+
+
+class PipelineCache:
+    """
+    A namespaced view of the shared pipeline cache with get/set/delete/clear.
+
+    Keys may be any string; they are hashed so that user input never produces
+    keys the backend rejects. Values must be picklable.
+    """
+
+    def __init__(self, namespace, default_ttl, alias=PIPELINE_CACHE_ALIAS):
+        """
+        Initialize the cache
+
+        Args:
+            namespace: Prefix that keeps this cache's keys apart from the others
+            default_ttl: Default time-to-live in seconds
+            alias: Django cache alias to store entries in
+        """
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self.alias = alias
+        # Bumped by clear() so that old entries are no longer reachable
+        self._version = 1
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def _key(self, key):
+        digest = hashlib.md5(str(key).encode()).hexdigest()
+        return f"{self.namespace}:v{self._version}:{digest}"
+
+    def get(self, key, default=None):
+        """Get a value from the cache, or default if it is missing, expired or unreachable"""
+        try:
+            value = self.backend.get(self._key(key))
+        except Exception as e:
+            self._record('_errors')
+            logger.warning(f"Cache {self.namespace} get failed: {str(e)}")
+            return default
+
+        self._record('_misses' if value is None else '_hits')
+        return default if value is None else value
+
+    def set(self, key, value, ttl=None):
+        """Store a value for ttl seconds (default_ttl if not given)"""
+        try:
+            self.backend.set(self._key(key), value, self.default_ttl if ttl is None else ttl)
+        except Exception as e:
+            self._record('_errors')
+            logger.warning(f"Cache {self.namespace} set failed: {str(e)}")
+
+    def delete(self, key):
+        """Remove a value from the cache"""
+        try:
+            self.backend.delete(self._key(key))
+        except Exception as e:
+            self._record('_errors')
+            logger.warning(f"Cache {self.namespace} delete failed: {str(e)}")
+
+    def clear(self):
+        """Drop every entry in this namespace as seen by this process"""
+        with self._lock:
+            self._version += 1
+
+    def _record(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self):
+        """Return hit and miss counters for this process."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'ttl_seconds': self.default_ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'errors': self._errors,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0
+            }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace, default_ttl):
+    """Get the process-wide PipelineCache for a namespace, creating it on first use."""
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = PipelineCache(namespace, default_ttl)
+            _caches[namespace] = cache
+        return cache
+
+
+def is_shared():
+    """
+    Whether the pipeline cache is shared between processes.
+
+    The memory and locmem backends keep their entries in the process that wrote
+    them; the file, database and Redis backends are visible to every process.
+    """
+    return not isinstance(caches[PIPELINE_CACHE_ALIAS], (LocMemCache, MemoryCacheBackend))
+
+
+def cache_stats():
+    """Return the configured backend and per-namespace counters for monitoring."""
+    backend = caches[PIPELINE_CACHE_ALIAS]
+    with _caches_lock:
+        namespaces = dict(_caches)
+    return {
+        'backend': f"{type(backend).__module__}.{type(backend).__name__}",
+        # Size and eviction counters, for backends that keep them (the memory backend)
+        'store': backend.stats() if hasattr(backend, 'stats') else None,
+        'namespaces': {name: cache.stats() for name, cache in namespaces.items()}
+    }
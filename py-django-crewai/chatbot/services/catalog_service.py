@@ -0,0 +1,224 @@
+"""
+Movie Catalog
+An in-memory catalog of now-playing and popular TMDb titles, indexed by genre
+and release year and refreshed in the background every CATALOG_REFRESH_INTERVAL
+seconds.
+
+The search tool answers First Run queries (and casual queries that only name
+genres and years) from the catalog instead of calling TMDb, so only the
+refresher touches the network. Until the first refresh completes, or if the
+catalog is disabled, callers fall back to querying TMDb directly.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import tmdbsimple as tmdb
+from django.conf import settings
+
+# Get the logger
+logger = logging.getLogger('chatbot.catalog')
+
+# Seconds to wait before retrying a refresh that failed
+RETRY_DELAY = 60
+
+
+class CatalogSnapshot:
+    """An immutable set of catalog entries and their indexes, replaced wholesale on refresh."""
+
+    def __init__(self, now_playing: List[Dict[str, Any]], popular: List[Dict[str, Any]]):
+        self.movies = {}
+        for movie in now_playing + popular:
+            if movie.get('id') is not None:
+                self.movies.setdefault(movie['id'], movie)
+        self.now_playing_ids = [movie['id'] for movie in now_playing if movie.get('id') is not None]
+        self.popular_ids = [movie['id'] for movie in popular if movie.get('id') is not None]
+
+        self.by_genre = {}
+        self.by_year = {}
+        for movie_id, movie in self.movies.items():
+            for genre_id in movie.get('genre_ids', []):
+                self.by_genre.setdefault(genre_id, set()).add(movie_id)
+            year = _release_year(movie)
+            if year:
+                self.by_year.setdefault(year, set()).add(movie_id)
+        self.refreshed_at = time.time()
+
+
+def _release_year(movie: Dict[str, Any]) -> Optional[int]:
+    release_date = movie.get('release_date') or ''
+    try:
+        return int(release_date[:4])
+    except ValueError:
+        return None
+
+
+class MovieCatalog:
+    """Now-playing and popular titles kept in memory and refreshed by a daemon thread."""
+
+    def __init__(self, pages: int, refresh_interval: int):
+        """
+        Initialize the catalog
+
+        Args:
+            pages: Pages of now-playing and of popular titles to load (20 titles per page)
+            refresh_interval: Seconds between refreshes
+        """
+        self.pages = pages
+        self.refresh_interval = refresh_interval
+        self._snapshot = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._refreshes = 0
+        self._failures = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot is not None
+
+    def start(self):
+        """Start the background refresher."""
+        self._thread = threading.Thread(target=self._refresh_loop, name='movie-catalog', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _refresh_loop(self):
+        while not self._stop_event.is_set():
+            delay = self.refresh_interval if self.refresh() else RETRY_DELAY
+            self._stop_event.wait(delay)
+
+    def refresh(self) -> bool:
+        """Reload the catalog from TMDb, returning True on success."""
+        started = time.monotonic()
+        try:
+            movies = tmdb.Movies()
+            now_playing = self._fetch_pages(movies.now_playing)
+            popular = self._fetch_pages(movies.popular)
+        except Exception as e:
+            self._failures += 1
+            logger.error(f"Catalog refresh failed: {str(e)}")
+            return False
+
+        if not now_playing and not popular:
+            self._failures += 1
+            logger.warning("Catalog refresh returned no titles, keeping the previous catalog")
+            return False
+
+        self._snapshot = CatalogSnapshot(now_playing, popular)
+        self._refreshes += 1
+        logger.info(f"Catalog refreshed with {len(self._snapshot.movies)} titles "
+                    f"in {time.monotonic() - started:.2f}s")
+        return True
+
+    def _fetch_pages(self, endpoint) -> List[Dict[str, Any]]:
+        results = []
+        for page in range(1, self.pages + 1):
+            response = endpoint(page=page, language='en-US')
+            results.extend(response.get('results', []))
+            if page >= response.get('total_pages', 1):
+                break
+        return results
+
+    def now_playing(self, genres: Iterable[int] = (), limit: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return now-playing titles in TMDb order, optionally limited to any of the given genres.
+
+        Returns:
+            List of TMDb movie results, or None if the catalog has not loaded yet
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        matching = self._genre_matches(snapshot, genres)
+        results = [snapshot.movies[movie_id] for movie_id in snapshot.now_playing_ids
+                   if matching is None or movie_id in matching]
+        return results[:limit] if limit else results
+
+    def search(self, genres: Iterable[int] = (), year_ranges: Iterable[Tuple[int, int]] = (),
+               limit: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return now-playing and popular titles matching any of the genres and any of the
+        year ranges, most popular first.
+
+        Returns:
+            List of TMDb movie results, or None if the catalog has not loaded yet
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+
+        candidates = self._genre_matches(snapshot, genres)
+        year_ranges = list(year_ranges)
+        if year_ranges:
+            in_years = set()
+            for year, movie_ids in snapshot.by_year.items():
+                if any(start <= year <= end for start, end in year_ranges):
+                    in_years |= movie_ids
+            candidates = in_years if candidates is None else candidates & in_years
+        if candidates is None:
+            candidates = set(snapshot.movies)
+
+        results = sorted((snapshot.movies[movie_id] for movie_id in candidates),
+                         key=lambda movie: movie.get('popularity', 0), reverse=True)
+        return results[:limit] if limit else results
+
+    def _genre_matches(self, snapshot, genres):
+        genres = list(genres)
+        if not genres:
+            return None
+        matching = set()
+        for genre_id in genres:
+            matching |= snapshot.by_genre.get(genre_id, set())
+        return matching
+
+    def stats(self) -> Dict[str, Any]:
+        """Return catalog size and refresh counters for monitoring."""
+        snapshot = self._snapshot
+        return {
+            'titles': len(snapshot.movies) if snapshot else 0,
+            'now_playing': len(snapshot.now_playing_ids) if snapshot else 0,
+            'age_seconds': round(time.time() - snapshot.refreshed_at, 1) if snapshot else None,
+            'refreshes': self._refreshes,
+            'failures': self._failures
+        }
+
+
+_catalog = None
+_catalog_pid = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> Optional[MovieCatalog]:
+    """
+    Get this process's catalog, starting its refresher on first use.
+
+    Started lazily so that the refresher runs after gunicorn forks, and only in
+    processes that run crews. Returns None when CATALOG_ENABLED is off.
+    """
+    global _catalog, _catalog_pid
+
+    if not getattr(settings, 'CATALOG_ENABLED', True):
+        return None
+
+    with _catalog_lock:
+        if _catalog is None or _catalog_pid != os.getpid():
+            _catalog = MovieCatalog(
+                pages=getattr(settings, 'CATALOG_PAGES', 3),
+                refresh_interval=getattr(settings, 'CATALOG_REFRESH_INTERVAL', 1800)
+            )
+            _catalog_pid = os.getpid()
+            _catalog.start()
+            logger.info("Started movie catalog refresher")
+        return _catalog
+
+
+def catalog_stats() -> Optional[Dict[str, Any]]:
+    """Return catalog metrics, or None if no catalog was started in this process."""
+    if _catalog is None or _catalog_pid != os.getpid():
+        return None
+    return _catalog.stats()
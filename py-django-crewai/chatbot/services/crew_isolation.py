@@ -0,0 +1,249 @@
+"""
+Crew Isolation
+Makes timed-out crew runs actually stop, instead of only stopping the wait for them.
+
+Waiting on a future with a timeout leaves the kickoff thread running, still calling
+the LLM, TMDb and SerpAPI. Two mechanisms release that work:
+- CancellationToken: cancelled when a run times out, and checked after every agent
+  step and by the tools, so a thread-mode run unwinds at its next checkpoint.
+- IsolatedCrewPool: with CREW_EXECUTION_ISOLATION set to 'process', runs execute in
+  a small pool of worker processes; a run that overruns its deadline is terminated
+  and its process replaced, which frees its CPU, sockets and API quota immediately.
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+
+from django.conf import settings
+
+# Get the logger
+logger = logging.getLogger('chatbot.crew_isolation')
+
+
+class CrewCancelled(BaseException):
+    """
+    Raised inside a crew run once its cancellation token is cancelled.
+
+    Derives from BaseException, like asyncio.CancelledError, so the broad
+    `except Exception` handlers in tools and agents do not swallow it.
+    """
+
+
+class CrewTimeout(TimeoutError):
+    """Raised when an isolated crew run is terminated at its deadline."""
+
+
+class CancellationToken:
+    """Cooperative cancellation flag shared by a crew run, its agents and its tools."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason = ''
+
+    def cancel(self, reason='cancelled'):
+        """Ask the run to stop at its next checkpoint."""
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        """Raise CrewCancelled if the run has been cancelled."""
+        if self._event.is_set():
+            raise CrewCancelled(self.reason)
+
+    def wait(self, timeout):
+        """Sleep for up to timeout seconds, returning True early if the run is cancelled."""
+        return self._event.wait(timeout)
+
+    def step_callback(self, step_output):
+        """Crew step callback: stop between agent steps, before the next LLM or tool call."""
+        self.raise_if_cancelled()
+
+
+def _worker_main(conn):
+    """Entry point of an isolated worker process: run (fn, args, kwargs) tasks until closed."""
+    import django
+    django.setup()
+    from django.db import close_old_connections
+
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+
+        fn, args, kwargs = task
+        close_old_connections()
+        try:
+            conn.send(('ok', fn(*args, **kwargs)))
+        except BaseException as e:
+            conn.send(('error', f"{type(e).__name__}: {str(e)}"))
+
+
+class _WorkerProcess:
+    """A single worker process and the pipe used to send it tasks."""
+
+    def __init__(self, context, index):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn,),
+            name=f"crew-process-{index}",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def kill(self):
+        """Terminate the process, escalating to SIGKILL if it does not exit."""
+        self.process.terminate()
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(1)
+        self.conn.close()
+
+
+class IsolatedCrewPool:
+    """
+    A bounded pool of worker processes that run callables with a hard deadline.
+
+    Worker processes are spawned lazily and reused between runs. Callers beyond the
+    pool size wait for a free process. Callables and their arguments must be picklable.
+    """
+
+    def __init__(self, size):
+        """
+        Initialize the pool
+
+        Args:
+            size: Maximum number of worker processes
+        """
+        self.size = size
+        self._context = multiprocessing.get_context('spawn')
+        # Idle slots; None means the slot's process has not been started (or was killed)
+        self._slots = queue.Queue()
+        for _ in range(size):
+            self._slots.put(None)
+        self._lock = threading.Lock()
+        self._started = 0
+        self._busy = 0
+        self._completed = 0
+        self._failed = 0
+        self._killed = 0
+
+    def run(self, fn, *args, timeout=None, **kwargs):
+        """
+        Run fn(*args, **kwargs) in a worker process.
+
+        Args:
+            fn: Module-level callable to run
+            timeout: Seconds before the worker is terminated, or None to wait indefinitely
+
+        Returns:
+            The value returned by fn
+
+        Raises:
+            CrewTimeout: If the run did not finish before the timeout
+            RuntimeError: If fn raised or the worker process died
+        """
+        worker = self._slots.get()
+        with self._lock:
+            self._busy += 1
+        try:
+            if worker is None or not worker.is_alive():
+                worker = self._start_worker()
+
+            worker.conn.send((fn, args, kwargs))
+            if not worker.conn.poll(timeout):
+                worker.kill()
+                worker = None
+                with self._lock:
+                    self._killed += 1
+                raise CrewTimeout(f"Crew run terminated after {timeout} seconds")
+
+            try:
+                status, payload = worker.conn.recv()
+            except (EOFError, OSError):
+                worker.kill()
+                worker = None
+                with self._lock:
+                    self._failed += 1
+                raise RuntimeError("Crew worker process exited unexpectedly")
+
+            with self._lock:
+                if status == 'ok':
+                    self._completed += 1
+                else:
+                    self._failed += 1
+            if status != 'ok':
+                raise RuntimeError(payload)
+            return payload
+        finally:
+            with self._lock:
+                self._busy -= 1
+            self._slots.put(worker)
+
+    def _start_worker(self):
+        with self._lock:
+            self._started += 1
+            index = self._started
+        logger.info(f"Starting crew worker process {index}")
+        return _WorkerProcess(self._context, index)
+
+    def stats(self):
+        """Return counters for monitoring."""
+        with self._lock:
+            return {
+                'max_processes': self.size,
+                'busy': self._busy,
+                'started': self._started,
+                'completed': self._completed,
+                'failed': self._failed,
+                'killed': self._killed
+            }
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def isolation_enabled():
+    """Whether crew runs should execute in isolated worker processes."""
+    return getattr(settings, 'CREW_EXECUTION_ISOLATION', 'thread') == 'process'
+
+
+def get_isolated_pool():
+    """
+    Get this process's IsolatedCrewPool, creating it on first use.
+
+    The pool is tracked per pid so that gunicorn workers forked after
+    import start their own worker processes.
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = IsolatedCrewPool(getattr(settings, 'CREW_PROCESS_WORKERS', 2))
+            _pool_pid = os.getpid()
+            logger.info(f"Created isolated crew pool with {_pool.size} processes")
+        return _pool
+
+
+def isolation_stats():
+    """Return isolated pool metrics, or None if no pool was created in this process."""
+    if _pool is None or _pool_pid != os.getpid():
+        return None
+    return _pool.stats()
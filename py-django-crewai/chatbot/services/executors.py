@@ -0,0 +1,117 @@
+"""
+Shared Executors
+Process-wide, bounded and named thread pools used by the crew pipeline and its tools,
+replacing the thread pools that used to be created per request and per tool instance.
+
+Two pools are used so that work submitted from inside a pipeline thread (theater
+fan-out, image enhancement) never waits on a slot in the pool that is running it:
+- 'pipeline': crew kickoff and result post-processing
+- 'io': short blocking calls to external APIs
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+# Get the logger
+logger = logging.getLogger('chatbot.executors')
+
+# Setting that controls the size of each named executor, with its default
+EXECUTOR_SIZE_SETTINGS = {
+    'pipeline': ('PIPELINE_EXECUTOR_WORKERS', 4),
+    'io': ('IO_EXECUTOR_WORKERS', 8),
+}
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+class NamedExecutor:
+    """A bounded ThreadPoolExecutor that tracks queued and running tasks."""
+
+    def __init__(self, name, max_workers):
+        """
+        Initialize the executor
+
+        Args:
+            name: Name used as the thread name prefix and in metrics
+            max_workers: Maximum number of threads in the pool
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-worker")
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+
+    def submit(self, fn, *args, **kwargs):
+        """Submit a callable, returning a concurrent.futures.Future."""
+        with self._lock:
+            self._submitted += 1
+        return self._executor.submit(self._track, fn, *args, **kwargs)
+
+    def _track(self, fn, *args, **kwargs):
+        with self._lock:
+            self._running += 1
+        try:
+            result = fn(*args, **kwargs)
+            with self._lock:
+                self._completed += 1
+            return result
+        except BaseException:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def stats(self):
+        """Return counters for monitoring."""
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                'max_workers': self.max_workers,
+                'threads': len(self._executor._threads),
+                'running': self._running,
+                'queued': self._submitted - finished - self._running,
+                'completed': self._completed,
+                'failed': self._failed
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+def get_executor(name):
+    """
+    Get the process-wide executor with the given name, creating it on first use.
+
+    Executors are created lazily so that they belong to the process that uses them
+    (gunicorn workers fork after the app is imported).
+    """
+    executor = _executors.get(name)
+    if executor is not None:
+        return executor
+
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            setting_name, default_size = EXECUTOR_SIZE_SETTINGS.get(name, (None, 4))
+            max_workers = getattr(settings, setting_name, default_size) if setting_name else default_size
+            executor = NamedExecutor(name, max_workers)
+            _executors[name] = executor
+            logger.info(f"Created '{name}' executor with {max_workers} workers")
+        return executor
+
+
+def executor_stats():
+    """Return thread metrics for this process and each executor created so far."""
+    return {
+        'process_threads': threading.active_count(),
+        'executors': {name: executor.stats() for name, executor in list(_executors.items())}
+    }
@@ -0,0 +1,100 @@
+"""
+Geohash encoding and cell covering.
+
+A geohash names a rectangular cell of the earth; longer hashes name smaller
+cells. LocationService caches Overpass cinema results per cell so that users
+searching a few blocks apart share the same cached cells.
+"""
+
+import math
+from typing import List, Tuple
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Meters per degree of latitude
+METERS_PER_DEGREE = 111320.0
+
+
+def encode(latitude: float, longitude: float, precision: int) -> str:
+    """Return the geohash of a point at the given precision (number of characters)."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value, value_range = (longitude, lon_range) if even else (latitude, lat_range)
+        mid = (value_range[0] + value_range[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            value_range[0] = mid
+        else:
+            value_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """Return the (latitude, longitude) size in degrees of cells at the given precision."""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """Return the (south, west, north, east) bounds of a geohash cell."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        bits = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            value_range = lon_range if even else lat_range
+            mid = (value_range[0] + value_range[1]) / 2
+            if bits >> shift & 1:
+                value_range[0] = mid
+            else:
+                value_range[1] = mid
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def covering_cells(latitude: float, longitude: float, radius_meters: float, precision: int) -> List[str]:
+    """
+    Return the geohash cells that cover a circle, i.e. every cell that overlaps
+    the circle's bounding box.
+
+    Args:
+        latitude: Latitude of the circle's center
+        longitude: Longitude of the circle's center
+        radius_meters: Radius of the circle in meters
+        precision: Geohash precision of the cells
+
+    Returns:
+        Sorted list of geohashes
+    """
+    lat_step, lon_step = cell_size(precision)
+    lat_delta = radius_meters / METERS_PER_DEGREE
+    lon_delta = radius_meters / (METERS_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+
+    south = max(latitude - lat_delta, -90.0)
+    north = min(latitude + lat_delta, 90.0 - lat_step / 2)
+    cells = set()
+    row = math.floor(south / lat_step)
+    while row * lat_step <= north:
+        cell_lat = row * lat_step + lat_step / 2
+        column = math.floor((longitude - lon_delta) / lon_step)
+        while column * lon_step <= longitude + lon_delta:
+            # Wrap around the antimeridian
+            cell_lon = (column * lon_step + lon_step / 2 + 180.0) % 360.0 - 180.0
+            cells.add(encode(cell_lat, cell_lon, precision))
+            column += 1
+        row += 1
+    return sorted(cells)
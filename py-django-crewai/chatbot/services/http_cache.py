@@ -0,0 +1,203 @@
+"""
+HTTP Response Cache
+A requests transport adapter that answers repeated TMDb GET requests from the
+shared pipeline cache, so popular titles cost no TMDb round trips.
+
+- Each endpoint has its own freshness lifetime: movie details and images change
+  rarely and are kept for days, search and discover results for hours, and
+  now-playing lists for minutes (TMDB_CACHE_*_TTL settings).
+- Expired responses are kept for TMDB_CACHE_STALE_TTL more seconds and
+  revalidated with If-None-Match / If-Modified-Since; a 304 answer refreshes
+  the entry without downloading the body again.
+- 404 answers (e.g. an unknown movie id) are cached for NEGATIVE_CACHE_TTL
+  seconds, so lookups of missing titles do not repeat.
+- Entries live in the 'pipeline' Django cache, so they are shared by all
+  workers and survive restarts with a file, db or redis CACHE_BACKEND.
+
+The adapter is mounted for TMDb on the shared session from http_clients, which
+TMDBService uses and which is installed as tmdbsimple's REQUESTS_SESSION, so it
+covers the tmdb.Movies, tmdb.Search and tmdb.Discover calls made by the crew tools.
+The async TMDb client (tmdb_async) reads and writes the same entries through the
+adapter's lookup and store_response methods.
+"""
+
+import logging
+import re
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .cache_backend import get_cache
+
+# Get the logger
+logger = logging.getLogger('chatbot.http_cache')
+
+# Freshness lifetime per endpoint: (path pattern, setting name, default seconds)
+TMDB_TTL_RULES = [
+    (re.compile(r'^/3/movie/(now_playing|upcoming|popular)$'), 'TMDB_CACHE_NOW_PLAYING_TTL', 1800),
+    (re.compile(r'^/3/(search|discover)/'), 'TMDB_CACHE_SEARCH_TTL', 21600),
+    (re.compile(r'^/3/movie/\d+(/images|/release_dates)?$'), 'TMDB_CACHE_DETAILS_TTL', 604800),
+    (re.compile(r'^/3/(genre|configuration)/'), 'TMDB_CACHE_DETAILS_TTL', 604800),
+]
+
+# Query parameters that identify the caller rather than the resource
+_UNCACHED_PARAMS = {'api_key', 'session_id'}
+# Headers that describe the encoded body, which is stored decoded
+_DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+
+def endpoint_ttl(url):
+    """Return the freshness lifetime in seconds for a TMDb URL, or None if it is not cached."""
+    path = urlsplit(url).path
+    for pattern, setting_name, default_ttl in TMDB_TTL_RULES:
+        if pattern.search(path):
+            return getattr(settings, setting_name, default_ttl)
+    return None
+
+
+def _cache_key(url):
+    """Canonical URL without credentials, with sorted query parameters."""
+    parts = urlsplit(url)
+    params = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in _UNCACHED_PARAMS)
+    return f"{parts.netloc}{parts.path}?{urlencode(params)}"
+
+
+def is_fresh(entry):
+    """Whether a cached entry can be served without asking TMDb."""
+    return bool(entry) and entry['expires_at'] > time.time()
+
+
+def revalidation_headers(entry):
+    """Conditional request headers for revalidating a stale entry."""
+    headers = {}
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+
+class CachingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that serves fresh GET responses from the cache and revalidates stale ones."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache = get_cache('tmdb_http', getattr(settings, 'TMDB_CACHE_STALE_TTL', 604800))
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._revalidated = 0
+        self._misses = 0
+
+    def send(self, request, **kwargs):
+        if request.method != 'GET':
+            return super().send(request, **kwargs)
+
+        key, ttl, entry = self.lookup(request.url)
+        if not ttl:
+            return super().send(request, **kwargs)
+        if is_fresh(entry):
+            return self._build_response(request, entry)
+
+        if entry:
+            # Stale: ask TMDb whether our copy is still current
+            request = request.copy()
+            request.headers.update(revalidation_headers(entry))
+
+        response = super().send(request, **kwargs)
+        cached = self.store_response(key, ttl, entry, response.status_code, response.reason,
+                                     response.headers, response.content)
+        if response.status_code == 304 and cached:
+            response.close()
+            return self._build_response(request, cached)
+        return response
+
+    def lookup(self, url):
+        """
+        Look up a GET request in the cache.
+
+        Args:
+            url: Full request URL
+
+        Returns:
+            Tuple of the cache key, the URL's freshness lifetime (None if it is not
+            cached) and the cached entry (None on a miss); fresh entries count as hits
+        """
+        ttl = endpoint_ttl(url)
+        if not ttl or not getattr(settings, 'TMDB_CACHE_ENABLED', True):
+            return None, None, None
+        key = _cache_key(url)
+        entry = self.cache.get(key)
+        if is_fresh(entry):
+            self._record('_hits')
+        return key, ttl, entry
+
+    def store_response(self, key, ttl, entry, status, reason, headers, content):
+        """
+        Cache the answer to a request that missed or revalidated a stale entry.
+
+        Args:
+            key: Cache key from lookup
+            ttl: Freshness lifetime from lookup
+            entry: Stale entry from lookup, if the request was conditional
+            status, reason, headers, content: The response
+
+        Returns:
+            The refreshed entry to answer with if the response is a 304, otherwise None
+        """
+        if entry and status == 304:
+            self._record('_revalidated')
+            entry['expires_at'] = time.time() + ttl
+            self._store(key, entry, ttl)
+            return entry
+
+        self._record('_misses')
+        if status == 200 and 'no-store' not in headers.get('Cache-Control', ''):
+            self._store(key, self._entry(status, reason, headers, content, ttl), ttl)
+        elif status == 404:
+            # Remember missing resources briefly, without keeping them for revalidation
+            negative_ttl = getattr(settings, 'NEGATIVE_CACHE_TTL', 900)
+            self.cache.set(key, self._entry(status, reason, headers, content, negative_ttl), negative_ttl)
+        return None
+
+    def _entry(self, status, reason, headers, content, ttl):
+        return {
+            'status': status,
+            'reason': reason,
+            'headers': {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS},
+            'content': content,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'expires_at': time.time() + ttl
+        }
+
+    def _store(self, key, entry, ttl):
+        # Keep the entry past its freshness so that it can be revalidated
+        self.cache.set(key, entry, ttl + self.cache.default_ttl)
+
+    def _build_response(self, request, entry):
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = entry.get('reason') or 'OK'
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.headers['X-Cache'] = 'HIT'
+        response._content = entry['content']
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def _record(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self):
+        """Return response cache counters for this process."""
+        with self._lock:
+            return {'hits': self._hits, 'revalidated': self._revalidated, 'misses': self._misses}
+
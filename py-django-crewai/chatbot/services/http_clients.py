@@ -0,0 +1,114 @@
+"""
+HTTP Clients
+The process-wide requests session used for every outbound provider call, so
+that connections (and their TCP and TLS setup) are kept alive and reused
+instead of being opened per request or per service instance.
+
+Each provider gets its own transport adapter, mounted on its base URL, with a
+connection pool per host of HTTP_POOL_MAXSIZE connections and a default
+timeout (HTTP_TIMEOUT_* settings) applied when the caller does not pass one.
+TMDb's adapter also caches responses (see http_cache). Nominatim is reached
+through geopy, which gets one shared adapter with the same pooling; its timeout
+(HTTP_TIMEOUT_NOMINATIM) is passed by LocationService.
+"""
+
+import logging
+import threading
+
+import requests
+import tmdbsimple as tmdb
+from django.conf import settings
+from geopy.adapters import RequestsAdapter
+from requests.adapters import HTTPAdapter
+
+from .http_cache import CachingHTTPAdapter
+
+# Get the logger
+logger = logging.getLogger('chatbot.http_clients')
+
+# Base URL of each provider, with the setting for its default timeout and that setting's default
+PROVIDERS = {
+    'tmdb': ('https://api.themoviedb.org/', 'HTTP_TIMEOUT_TMDB', 10),
+    'overpass': ('https://overpass-api.de/', 'HTTP_TIMEOUT_OVERPASS', 60),
+    'ipinfo': ('https://ipinfo.io/', 'HTTP_TIMEOUT_IPINFO', 5),
+}
+
+
+class DefaultTimeoutMixin:
+    """Applies a default timeout to requests sent without one."""
+
+    def __init__(self, *args, timeout=None, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class ProviderHTTPAdapter(DefaultTimeoutMixin, HTTPAdapter):
+    """Pooled adapter with a default timeout."""
+
+
+class CachingProviderHTTPAdapter(DefaultTimeoutMixin, CachingHTTPAdapter):
+    """Pooled adapter with a default timeout that also caches TMDb responses."""
+
+
+def _pool_options():
+    return {
+        'pool_connections': getattr(settings, 'HTTP_POOL_CONNECTIONS', 10),
+        'pool_maxsize': getattr(settings, 'HTTP_POOL_MAXSIZE', 16)
+    }
+
+
+_session = None
+_geopy_adapter = None
+_lock = threading.Lock()
+
+
+def shared_session():
+    """Get the process-wide requests session, with an adapter mounted for each provider."""
+    global _session
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            default_timeout = getattr(settings, 'HTTP_TIMEOUT_DEFAULT', 30)
+            session.mount('https://', ProviderHTTPAdapter(timeout=default_timeout, **_pool_options()))
+            session.mount('http://', ProviderHTTPAdapter(timeout=default_timeout, **_pool_options()))
+            for name, (base_url, timeout_setting, timeout_default) in PROVIDERS.items():
+                adapter_class = CachingProviderHTTPAdapter if name == 'tmdb' else ProviderHTTPAdapter
+                session.mount(base_url, adapter_class(timeout=getattr(settings, timeout_setting, timeout_default),
+                                                      **_pool_options()))
+            _session = session
+            logger.info("Created shared HTTP session")
+        return _session
+
+
+def tmdb_session():
+    """Get the session for TMDb requests, whose adapter caches responses."""
+    return shared_session()
+
+
+def install_tmdb_session():
+    """Route tmdbsimple's requests through the shared session."""
+    tmdb.REQUESTS_SESSION = shared_session()
+
+
+def geopy_adapter_factory(proxies=None, ssl_context=None):
+    """
+    geopy adapter_factory returning one shared RequestsAdapter, so geocoders
+    created per request reuse its connections instead of opening their own.
+    """
+    global _geopy_adapter
+    with _lock:
+        if _geopy_adapter is None:
+            _geopy_adapter = RequestsAdapter(proxies=proxies, ssl_context=ssl_context, **_pool_options())
+        return _geopy_adapter
+
+
+def http_cache_stats():
+    """Return TMDb response cache counters, or None if no session was created in this process."""
+    if _session is None:
+        return None
+    return _session.get_adapter(PROVIDERS['tmdb'][0]).stats()
@@ -0,0 +1,130 @@
+"""
+Crew Job Events
+Records progress events for crew jobs (queued, crew started, each task finished,
+recommendations and theaters ready, finished) and formats them as Server-Sent Events.
+
+Events are stored in the database so that a stream served by any process sees
+them. Streams in the process that recorded an event are woken immediately;
+streams in other processes pick it up on their next check.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+from ..models import CrewJobEvent
+
+# Get the logger
+logger = logging.getLogger('chatbot.job_events')
+
+# Wakes event streams in this process as soon as an event is recorded
+_condition = threading.Condition()
+
+
+def record_event(job_id, event, data=None):
+    """
+    Record a progress event for a job.
+
+    Recording is best effort: a failure is logged but never fails the job.
+
+    Args:
+        job_id: ID of the CrewJob
+        event: One of the CrewJobEvent.EVENT_* names
+        data: Optional JSON-serializable payload
+    """
+    try:
+        CrewJobEvent.objects.create(job_id=job_id, event=event, data=data or {})
+    except Exception as e:
+        logger.error(f"Could not record {event} event for job {job_id}: {str(e)}")
+        return
+
+    with _condition:
+        _condition.notify_all()
+
+
+def events_after(job_id, last_event_id=0):
+    """Return the events for a job recorded after last_event_id, oldest first."""
+    return list(CrewJobEvent.objects.filter(job_id=job_id, id__gt=last_event_id).order_by('id'))
+
+
+def wait_for_event(timeout):
+    """Block until an event is recorded in this process or the timeout elapses."""
+    with _condition:
+        _condition.wait(timeout)
+
+
+def format_sse(event):
+    """Format a CrewJobEvent as a Server-Sent Events message."""
+    return f"id: {event.id}\nevent: {event.event}\ndata: {json.dumps(event.data)}\n\n"
+
+
+def stream_events(job_id, last_event_id=0):
+    """
+    Generate Server-Sent Events for a job until it finishes.
+
+    The stream ends after the job's terminal event or after
+    JOB_EVENT_STREAM_MAX_SECONDS, in which case the browser reconnects and
+    resumes from the Last-Event-ID it received.
+
+    Args:
+        job_id: ID of the CrewJob
+        last_event_id: ID of the last event the client has already received
+
+    Yields:
+        SSE-formatted strings
+    """
+    check_interval = getattr(settings, 'JOB_EVENT_POLL_INTERVAL', 0.5)
+    heartbeat_seconds = getattr(settings, 'JOB_EVENT_HEARTBEAT_SECONDS', 15)
+    deadline = time.monotonic() + getattr(settings, 'JOB_EVENT_STREAM_MAX_SECONDS', 300)
+    last_sent = time.monotonic()
+
+    # Ask the browser to wait a little before reconnecting
+    yield "retry: 2000\n\n"
+
+    while time.monotonic() < deadline:
+        for event in events_after(job_id, last_event_id):
+            last_event_id = event.id
+            last_sent = time.monotonic()
+            yield format_sse(event)
+            if event.event in CrewJobEvent.TERMINAL_EVENTS:
+                return
+
+        # Comment lines keep proxies from closing an idle connection
+        if time.monotonic() - last_sent >= heartbeat_seconds:
+            last_sent = time.monotonic()
+            yield ": keep-alive\n\n"
+
+        wait_for_event(check_interval)
+
+
+async def astream_events(job_id, last_event_id=0):
+    """
+    Async variant of stream_events for ASGI servers.
+
+    Checks for new events every JOB_EVENT_POLL_INTERVAL seconds on the event loop,
+    so an open stream does not hold a thread.
+    """
+    check_interval = getattr(settings, 'JOB_EVENT_POLL_INTERVAL', 0.5)
+    heartbeat_seconds = getattr(settings, 'JOB_EVENT_HEARTBEAT_SECONDS', 15)
+    deadline = time.monotonic() + getattr(settings, 'JOB_EVENT_STREAM_MAX_SECONDS', 300)
+    last_sent = time.monotonic()
+
+    yield "retry: 2000\n\n"
+
+    while time.monotonic() < deadline:
+        async for event in CrewJobEvent.objects.filter(job_id=job_id, id__gt=last_event_id).order_by('id'):
+            last_event_id = event.id
+            last_sent = time.monotonic()
+            yield format_sse(event)
+            if event.event in CrewJobEvent.TERMINAL_EVENTS:
+                return
+
+        if time.monotonic() - last_sent >= heartbeat_seconds:
+            last_sent = time.monotonic()
+            yield ": keep-alive\n\n"
+
+        await asyncio.sleep(check_interval)
@@ -0,0 +1,563 @@
+"""
+Crew Job Runner
+Executes queued CrewJob rows outside the request cycle. Request handlers only
+enqueue jobs and poll endpoints only read job state, so a slow crew run never
+ties up a web worker and any instance can answer a poll.
+
+Jobs are claimed with a conditional UPDATE, which makes it safe to run worker
+threads in several web processes and/or the `run_crew_worker` management
+command against the same database.
+
+Jobs are scheduled in lanes named after their mode. Casual jobs have priority,
+and dedicated casual workers never pick up slow first run jobs. Casual queries
+whose result is already cached take the fast lane: they complete while being
+enqueued, without waiting for a worker.
+
+Identical jobs (same flight key) share one crew run: while one is running the
+others stay queued, and the running job completes them with its result.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import CrewJob, CrewJobEvent
+from .admission import LANE_CASUAL, LANE_FIRST_RUN, AdmissionRejected
+from .job_events import record_event
+from .movie_crew_integration import MovieCrewService
+from .recommendation_store import (
+    find_recommendation, movie_keys, save_pipeline_result, save_recommendation,
+    save_theaters, serialize_recommendation
+)
+from .single_flight import flight_key
+
+# Get the logger
+logger = logging.getLogger('chatbot.job_runner')
+
+# Wakes idle workers in this process as soon as a job is enqueued
+_wakeup = threading.Event()
+
+# In-process worker threads, tracked per pid so forked processes start their own
+_workers = []
+_workers_pid = None
+_workers_lock = threading.Lock()
+_stop_event = threading.Event()
+
+# Stale job recovery runs at most once per interval per process
+_last_stale_check = 0.0
+STALE_CHECK_INTERVAL = 60
+
+# Lanes claimed by general workers, in priority order, and by dedicated casual workers
+GENERAL_LANES = (LANE_CASUAL, LANE_FIRST_RUN)
+CASUAL_LANES = (LANE_CASUAL,)
+
+# Worker ID recorded on jobs completed in the fast lane
+FAST_LANE_WORKER = 'fast-lane'
+
+ERROR_MESSAGE = 'An error occurred while processing your request.'
+PARTIAL_MESSAGE = 'Here are my recommendations. Theaters and showtimes will appear as soon as they are found.'
+
+
+def enqueue_job(conversation, query, first_run_mode, user_location='', user_ip='', timezone_str=''):
+    """
+    Queue a crew execution for a conversation query.
+
+    A query whose result is cached (for First Run, at the user's location) is
+    completed immediately (fast lane); the returned job is then already finished.
+
+    Args:
+        conversation: Conversation the query belongs to
+        query: The user's query
+        first_run_mode: Whether to search theaters and showtimes
+        user_location: Optional user location for theater search
+        user_ip: Optional user IP address
+        timezone_str: Optional timezone string
+
+    Returns:
+        The created CrewJob
+    """
+    conversation_history = _conversation_history(conversation)
+    cached_response = None
+    try:
+        cached_response = MovieCrewService.cached_response(
+            query, conversation_history, first_run_mode, user_location, user_ip, timezone_str
+        )
+    except Exception as e:
+        logger.error(f"Error checking the result cache: {str(e)}")
+
+    # Fast lane jobs start out running, so workers never see them as pending
+    fast_lane_fields = {}
+    if cached_response is not None:
+        fast_lane_fields = {
+            'status': CrewJob.STATUS_RUNNING,
+            'worker_id': FAST_LANE_WORKER,
+            'started_at': timezone.now(),
+            'attempts': 1
+        }
+
+    job = CrewJob.objects.create(
+        conversation=conversation,
+        mode=LANE_FIRST_RUN if first_run_mode else LANE_CASUAL,
+        query=query,
+        flight_key=flight_key(
+            query,
+            conversation_history,
+            first_run_mode,
+            user_location,
+            user_ip
+        ),
+        user_location=user_location or '',
+        user_ip=user_ip or '',
+        timezone=timezone_str or '',
+        **fast_lane_fields
+    )
+    record_event(job.id, CrewJobEvent.EVENT_QUEUED)
+
+    if cached_response is not None:
+        logger.info(f"Completing {job.mode} job {job.id} in the fast lane from cache")
+        record_event(job.id, CrewJobEvent.EVENT_STARTED, {'attempt': 1, 'lane': 'fast'})
+        try:
+            _complete_job(job, cached_response, JobProgress(job), time.time())
+            return job
+        except Exception as e:
+            # Fall back to running the crew on a worker
+            logger.error(f"Fast lane completion of job {job.id} failed: {str(e)}")
+            job.status = CrewJob.STATUS_PENDING
+            job.worker_id = ''
+            job.attempts = 0
+            job.save(update_fields=['status', 'worker_id', 'attempts'])
+
+    logger.info(f"Enqueued {job.mode} job {job.id} for conversation {conversation.id}")
+
+    ensure_workers()
+    _wakeup.set()
+    return job
+
+
+def _conversation_history(conversation):
+    """Build the conversation history passed to the crew."""
+    return [{
+        'sender': msg.sender,
+        'content': msg.content
+    } for msg in conversation.messages.all()]
+
+
+def claim_next_job(worker_id, lanes=GENERAL_LANES):
+    """
+    Atomically claim the oldest pending job of the highest-priority lane that has one.
+
+    Args:
+        worker_id: ID recorded on the claimed job
+        lanes: Lanes (job modes) this worker serves, in priority order
+
+    Returns:
+        The claimed CrewJob, or None if no job is pending
+    """
+    _maybe_requeue_stale_jobs()
+
+    for lane in lanes:
+        pending = CrewJob.objects.filter(status=CrewJob.STATUS_PENDING, mode=lane)
+        if getattr(settings, 'SINGLE_FLIGHT_ENABLED', True):
+            # Jobs identical to a running one stay queued; the running job completes them
+            pending = pending.exclude(flight_key__in=_leading_jobs().values('flight_key'))
+        candidate_ids = list(pending.order_by('created_at').values_list('id', flat=True)[:5])
+        for job_id in candidate_ids:
+            if _claim_job(job_id, worker_id):
+                return CrewJob.objects.select_related('conversation').get(pk=job_id)
+    return None
+
+
+def _claim_job(job_id, worker_id):
+    """Move a pending job to running; only one worker can move a given row out of pending."""
+    return CrewJob.objects.filter(pk=job_id, status=CrewJob.STATUS_PENDING).update(
+        status=CrewJob.STATUS_RUNNING,
+        worker_id=worker_id,
+        started_at=timezone.now(),
+        attempts=F('attempts') + 1
+    )
+
+
+def requeue_stale_jobs():
+    """
+    Recover jobs whose worker died mid-run.
+
+    Running jobs older than CREW_JOB_STALE_SECONDS are put back in the queue,
+    or marked failed once they have used up CREW_JOB_MAX_ATTEMPTS.
+
+    Returns:
+        Tuple of (requeued, failed) job counts
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=getattr(settings, 'CREW_JOB_STALE_SECONDS', 900))
+    max_attempts = getattr(settings, 'CREW_JOB_MAX_ATTEMPTS', 2)
+
+    stale = CrewJob.objects.filter(status=CrewJob.STATUS_RUNNING, started_at__lt=cutoff)
+    requeued = stale.filter(attempts__lt=max_attempts).update(
+        status=CrewJob.STATUS_PENDING,
+        worker_id=''
+    )
+    failed_ids = list(stale.values_list('pk', flat=True))
+    failed = CrewJob.objects.filter(pk__in=failed_ids, status=CrewJob.STATUS_RUNNING).update(
+        status=CrewJob.STATUS_FAILED,
+        error='Job did not finish before the stale timeout',
+        result={'status': 'error', 'message': ERROR_MESSAGE},
+        finished_at=now
+    )
+    for job_id in failed_ids:
+        record_event(job_id, CrewJobEvent.EVENT_FAILED, {'status': 'error', 'message': ERROR_MESSAGE})
+    if requeued or failed:
+        logger.warning(f"Recovered stale jobs: {requeued} requeued, {failed} failed")
+    return requeued, failed
+
+
+def _maybe_requeue_stale_jobs():
+    """Run stale job recovery if the check interval has elapsed."""
+    global _last_stale_check
+    if time.time() - _last_stale_check < STALE_CHECK_INTERVAL:
+        return
+    _last_stale_check = time.time()
+    try:
+        requeue_stale_jobs()
+    except Exception as e:
+        logger.error(f"Error recovering stale jobs: {str(e)}")
+
+
+def _leading_jobs():
+    """
+    Running jobs that identical jobs wait for.
+
+    A job stops leading CREW_EXECUTION_TIMEOUT seconds after it started, so jobs
+    waiting on a hung run are picked up and run the crew themselves.
+    """
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'CREW_EXECUTION_TIMEOUT', 180))
+    return CrewJob.objects.filter(status=CrewJob.STATUS_RUNNING, started_at__gte=cutoff).exclude(flight_key='')
+
+
+def _find_leader(job):
+    """
+    Find an identical job that started earlier and is still running.
+
+    Jobs with the same flight key are ordered by (started_at, id); only the first
+    one runs the crew, so concurrent identical queries cost a single execution
+    even when they are claimed by different processes.
+
+    Returns:
+        The leading CrewJob, or None if this job should run the crew itself
+    """
+    if not job.flight_key or not getattr(settings, 'SINGLE_FLIGHT_ENABLED', True):
+        return None
+
+    return (
+        _leading_jobs().filter(flight_key=job.flight_key)
+        .exclude(pk=job.pk)
+        .filter(Q(started_at__lt=job.started_at) | Q(started_at=job.started_at, pk__lt=job.pk))
+        .order_by('started_at', 'pk')
+        .first()
+    )
+
+
+def _complete_identical_jobs(leader, response_data):
+    """
+    Complete the jobs that waited in the queue for an identical job, reusing its pipeline output.
+
+    Args:
+        leader: The job that ran the crew
+        response_data: Its pipeline output
+    """
+    if not leader.flight_key or not getattr(settings, 'SINGLE_FLIGHT_ENABLED', True):
+        return
+
+    follower_ids = list(
+        CrewJob.objects.filter(flight_key=leader.flight_key, status=CrewJob.STATUS_PENDING)
+        .exclude(pk=leader.pk)
+        .values_list('id', flat=True)
+    )
+    for job_id in follower_ids:
+        if not _claim_job(job_id, leader.worker_id):
+            continue
+        job = CrewJob.objects.select_related('conversation').get(pk=job_id)
+        record_event(job.id, CrewJobEvent.EVENT_STARTED, {'attempt': job.attempts, 'leader': leader.id})
+        try:
+            _complete_job(job, response_data, JobProgress(job), time.time())
+            logger.info(f"Job {job.id} reused the result of job {leader.id}")
+        except Exception as e:
+            # Let a worker run the crew for it instead
+            logger.error(f"Completing job {job.id} from job {leader.id} failed: {str(e)}")
+            _return_to_queue(job)
+
+
+def _return_to_queue(job):
+    """Put a claimed job back in the queue without counting the attempt."""
+    CrewJob.objects.filter(pk=job.pk, status=CrewJob.STATUS_RUNNING).update(
+        status=CrewJob.STATUS_PENDING,
+        worker_id='',
+        attempts=F('attempts') - 1
+    )
+
+
+class JobProgress:
+    """
+    Pipeline progress callback for a running job.
+
+    Records every stage as a job event. In first run mode it also persists the
+    recommendations as soon as the recommendation task finishes, publishing them
+    as the job's partial result, and attaches theaters to each movie as the
+    theater search finds them.
+
+    Instances are picklable, so progress is also handled when the crew runs in
+    an isolated worker process; call reload() afterwards to see what it published.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.movies_by_key = {}
+        self.published = False
+        self.theaters_reported = set()
+
+    def __call__(self, event, data=None):
+        try:
+            if event == 'recommendations_ready':
+                self._publish_recommendations(data.get('movies', []))
+            elif event == 'theaters_found':
+                self._attach_theaters(data)
+            else:
+                record_event(self.job.id, event, data)
+        except Exception as e:
+            # Progress is best effort; the final result is saved when the crew finishes
+            logger.error(f"Error handling {event} progress for job {self.job.id}: {str(e)}")
+            logger.error(traceback.format_exc())
+
+    def reload(self):
+        """Reload what was published for this job from its recorded events."""
+        events = self.job.events.filter(
+            event__in=[CrewJobEvent.EVENT_RECOMMENDATIONS_READY, CrewJobEvent.EVENT_THEATERS_READY]
+        ).values_list('event', 'data')
+        for event, data in events:
+            if event == CrewJobEvent.EVENT_RECOMMENDATIONS_READY:
+                self.published = True
+            elif data.get('movie_id'):
+                self.theaters_reported.add(data['movie_id'])
+
+    def _publish_recommendations(self, movies):
+        job = self.job
+        # A retried job reuses the recommendations its earlier attempt published
+        for movie in job.recommendations.all():
+            for key in movie_keys({'tmdb_id': movie.tmdb_id, 'title': movie.title}):
+                self.movies_by_key[key] = movie
+
+        recommendations = []
+        for movie_data in movies:
+            movie = find_recommendation(self.movies_by_key, movie_data)
+            if movie is None:
+                movie = save_recommendation(job.conversation, movie_data, job=job,
+                                            theaters_ready='theaters' in movie_data)
+                for key in movie_keys(movie_data):
+                    self.movies_by_key[key] = movie
+            recommendations.append(serialize_recommendation(movie))
+
+        result = {
+            'status': 'success',
+            'message': PARTIAL_MESSAGE,
+            'recommendations': recommendations,
+            'theaters_pending': True
+        }
+        job.result = result
+        job.save(update_fields=['result'])
+        self.published = True
+        logger.info(f"Job {job.id} published {len(recommendations)} recommendations before theaters")
+        record_event(job.id, CrewJobEvent.EVENT_RECOMMENDATIONS_READY, result)
+
+    def _attach_theaters(self, data):
+        movie = find_recommendation(self.movies_by_key, data)
+        if movie is None or movie.id in self.theaters_reported:
+            return
+
+        theaters = save_theaters(movie, data.get('theaters', []), self.job.timezone or 'America/Los_Angeles')
+        movie.theaters_ready = True
+        movie.save(update_fields=['theaters_ready'])
+        self.theaters_reported.add(movie.id)
+        record_event(self.job.id, CrewJobEvent.EVENT_THEATERS_READY, {
+            'movie_id': movie.id,
+            'theaters': len(theaters)
+        })
+
+
+def run_job(job):
+    """
+    Execute a claimed job and record its outcome.
+
+    Args:
+        job: A CrewJob in the running state
+    """
+    start_time = time.time()
+    conversation = job.conversation
+    first_run_mode = job.mode == LANE_FIRST_RUN
+
+    # Claimed together with an identical job on another worker: wait in the queue
+    # instead of holding this worker, the leader completes it when it finishes
+    leader = _find_leader(job)
+    if leader is not None:
+        logger.info(f"Job {job.id} is waiting on identical job {leader.id}")
+        _return_to_queue(job)
+        return
+
+    logger.info(f"Running {job.mode} job {job.id} (attempt {job.attempts}): {job.query[:100]}")
+    record_event(job.id, CrewJobEvent.EVENT_STARTED, {'attempt': job.attempts})
+
+    progress = JobProgress(job)
+
+    try:
+        response_data = MovieCrewService.process_query(
+            query=job.query,
+            conversation_history=_conversation_history(conversation),
+            first_run_mode=first_run_mode,
+            user_location=job.user_location or None,
+            user_ip=job.user_ip or None,
+            timezone=job.timezone or None,
+            progress_callback=progress
+        )
+        # Pick up progress handled in an isolated worker process
+        progress.reload()
+
+        _complete_job(job, response_data, progress, start_time)
+        _complete_identical_jobs(job, response_data)
+
+    except AdmissionRejected as rejected:
+        # This process is at capacity; let any worker pick the job up again later
+        logger.warning(f"Job {job.id} was not admitted ({str(rejected)}), returning it to the queue")
+        _return_to_queue(job)
+        time.sleep(min(rejected.retry_after, getattr(settings, 'CREW_JOB_POLL_INTERVAL', 1.0) * 5))
+
+    except Exception as e:
+        logger.error(f"Job {job.id} failed: {str(e)}")
+        logger.error(traceback.format_exc())
+        job.status = CrewJob.STATUS_FAILED
+        job.error = str(e)
+        job.result = {'status': 'error', 'message': ERROR_MESSAGE}
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'result', 'finished_at'])
+        # Stop clients waiting on theaters for recommendations published before the failure
+        job.recommendations.filter(theaters_ready=False).update(theaters_ready=True)
+        record_event(job.id, CrewJobEvent.EVENT_FAILED, job.result)
+
+
+def _complete_job(job, response_data, progress, start_time):
+    """Save the pipeline output of a job, mark it succeeded and record its final events."""
+    first_run_mode = job.mode == LANE_FIRST_RUN
+    with transaction.atomic():
+        result = save_pipeline_result(
+            job.conversation,
+            response_data,
+            first_run_mode,
+            job.timezone or 'America/Los_Angeles',
+            job=job
+        )
+        job.status = CrewJob.STATUS_SUCCEEDED
+        job.response_data = response_data
+        job.result = result
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'response_data', 'result', 'finished_at'])
+
+    logger.info(f"Job {job.id} succeeded in {time.time() - start_time:.2f}s "
+                f"with {len(result['recommendations'])} recommendations")
+
+    if not progress.published:
+        record_event(job.id, CrewJobEvent.EVENT_RECOMMENDATIONS_READY, result)
+    if first_run_mode:
+        for movie in result['recommendations']:
+            if movie['id'] not in progress.theaters_reported:
+                record_event(job.id, CrewJobEvent.EVENT_THEATERS_READY, {
+                    'movie_id': movie['id'],
+                    'theaters': len(movie.get('theaters', []))
+                })
+    record_event(job.id, CrewJobEvent.EVENT_SUCCEEDED, result)
+
+
+class CrewJobWorker(threading.Thread):
+    """Worker thread that claims and runs pending crew jobs from its lanes until stopped."""
+
+    def __init__(self, index, poll_interval=None, stop_event=None, lanes=GENERAL_LANES):
+        lane_name = 'casual' if lanes == CASUAL_LANES else 'general'
+        super().__init__(name=f"crew-job-worker-{lane_name}-{index}", daemon=True)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{lane_name}-{index}"
+        self.poll_interval = poll_interval or getattr(settings, 'CREW_JOB_POLL_INTERVAL', 1.0)
+        self.stop_event = stop_event or _stop_event
+        self.lanes = lanes
+
+    def run(self):
+        logger.info(f"Crew job worker {self.worker_id} started")
+        while not self.stop_event.is_set():
+            close_old_connections()
+            try:
+                job = claim_next_job(self.worker_id, self.lanes)
+            except Exception as e:
+                logger.error(f"Worker {self.worker_id} could not claim a job: {str(e)}")
+                job = None
+
+            if job is None:
+                _wakeup.wait(self.poll_interval)
+                _wakeup.clear()
+                continue
+
+            try:
+                run_job(job)
+            finally:
+                close_old_connections()
+
+        logger.info(f"Crew job worker {self.worker_id} stopped")
+
+
+def start_workers(count, poll_interval=None, stop_event=None, start_index=0, lanes=GENERAL_LANES):
+    """
+    Start crew job worker threads.
+
+    Args:
+        count: Number of threads to start
+        lanes: Lanes the threads serve, in priority order
+
+    Returns:
+        List of started CrewJobWorker threads
+    """
+    workers = [CrewJobWorker(start_index + i, poll_interval, stop_event, lanes) for i in range(count)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def ensure_workers():
+    """
+    Lazily start in-process worker threads when CREW_JOB_WORKER_MODE is 'thread'.
+
+    Threads are started on first use rather than at import time so that they
+    are created after gunicorn forks, and management commands such as
+    `migrate` never start them.
+    """
+    global _workers, _workers_pid
+
+    if getattr(settings, 'CREW_JOB_WORKER_MODE', 'thread') != 'thread':
+        return
+
+    with _workers_lock:
+        if _workers_pid != os.getpid():
+            _workers = []
+            _workers_pid = os.getpid()
+
+        _workers = [worker for worker in _workers if worker.is_alive()]
+        for lanes, setting_name, default_count in (
+            (GENERAL_LANES, 'CREW_JOB_WORKER_THREADS', 2),
+            (CASUAL_LANES, 'CREW_JOB_CASUAL_WORKER_THREADS', 1),
+        ):
+            running = len([worker for worker in _workers if worker.lanes == lanes])
+            missing = getattr(settings, setting_name, default_count) - running
+            if missing > 0:
+                logger.info(f"Starting {missing} in-process crew job worker(s) for lanes {', '.join(lanes)}")
+                _workers.extend(start_workers(missing, start_index=running, lanes=lanes))
@@ -0,0 +1,123 @@
+"""
+LLM Response Cache
+Answers repeated agent prompts from the shared pipeline cache instead of the
+model, so re-running the Movie Finder or Recommender step for a query the crew
+has already seen skips the multi-second completion.
+
+Responses are keyed by model, temperature, stop words, messages and tool
+schemas; any difference in the prompt (including earlier tool observations in
+the agent's scratchpad) is a different entry. Calls that execute native
+function calls or parse into a response model are never cached, since replaying
+them would skip their side effects.
+
+Entries live in the 'pipeline' Django cache, so they are shared by all workers
+and bounded by its CACHE_MAX_ENTRIES / CACHE_MAX_BYTES limits. Responses longer
+than LLM_RESPONSE_CACHE_MAX_CHARS are not stored.
+"""
+
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+from .cache_backend import get_cache
+
+# Get the logger
+logger = logging.getLogger('chatbot.llm_cache')
+
+
+def response_key(llm, messages, tools=None):
+    """Return the cache key for a completion request."""
+    if isinstance(messages, str):
+        messages = [{'role': 'user', 'content': messages}]
+    request = {
+        'model': getattr(llm, 'model', None),
+        'temperature': getattr(llm, 'temperature', None),
+        'stop': getattr(llm, 'stop', None),
+        'messages': messages,
+        'tools': tools or []
+    }
+    return json.dumps(request, sort_keys=True, default=str)
+
+
+class LLMResponseCache:
+    """Wraps the call method of CrewAI LLM instances with a shared response cache."""
+
+    def __init__(self):
+        self.cache = get_cache('llm_responses', getattr(settings, 'LLM_RESPONSE_CACHE_TTL', 86400))
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._skipped = 0
+        self._seconds_saved = 0.0
+
+    def wrap(self, llm):
+        """
+        Route an LLM's calls through the cache. Wrapping the same instance twice is a no-op.
+
+        Args:
+            llm: CrewAI LLM instance, as found on Agent.llm
+
+        Returns:
+            The same LLM instance
+        """
+        if llm is None or getattr(llm, '_response_cache_wrapped', False):
+            return llm
+
+        uncached_call = llm.call
+
+        def call(messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+            if (not getattr(settings, 'LLM_RESPONSE_CACHE_ENABLED', True)
+                    or available_functions or kwargs.get('response_model')):
+                self._record('_skipped')
+                return uncached_call(messages, tools=tools, callbacks=callbacks,
+                                     available_functions=available_functions, **kwargs)
+
+            key = response_key(llm, messages, tools)
+            entry = self.cache.get(key)
+            if entry is not None:
+                self._record('_hits', entry['seconds'])
+                logger.info(f"LLM response cache hit for {getattr(llm, 'model', 'unknown model')}")
+                return entry['response']
+
+            self._record('_misses')
+            started = time.monotonic()
+            response = uncached_call(messages, tools=tools, callbacks=callbacks,
+                                     available_functions=available_functions, **kwargs)
+            max_chars = getattr(settings, 'LLM_RESPONSE_CACHE_MAX_CHARS', 20000)
+            if isinstance(response, str) and response.strip() and len(response) <= max_chars:
+                self.cache.set(key, {'response': response, 'seconds': time.monotonic() - started})
+            return response
+
+        llm.call = call
+        llm._response_cache_wrapped = True
+        return llm
+
+    def _record(self, counter, seconds=0.0):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+            self._seconds_saved += seconds
+
+    def stats(self):
+        """Return response cache counters for this process."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'skipped': self._skipped,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0,
+                'seconds_saved': round(self._seconds_saved, 1)
+            }
+
+
+LLM_RESPONSE_CACHE = LLMResponseCache()
+
+
+def cache_agent_responses(*agents):
+    """Route the LLM calls of the given CrewAI agents through the response cache."""
+    for agent in agents:
+        if agent is not None:
+            LLM_RESPONSE_CACHE.wrap(agent.llm)
@@ -1,20 +1,58 @@
 """
 Location and geocoding services for the movie chatbot.
+
+Geocoded locations and IP lookups are kept in the shared pipeline cache, keyed
+by the normalized location string and by the client's network (/24 for IPv4,
+/48 for IPv6), so returning users and their neighbours skip Nominatim and
+ipinfo.io entirely. Coordinates are rounded to LOCATION_COORDINATE_PRECISION
+decimal places, which also lets nearby users share theater search results.
+Locations the services could not find are remembered for NEGATIVE_CACHE_TTL
+seconds; failed requests are not cached and are retried on the next lookup.
 """
 
+import ipaddress
 import logging
 import math
-import requests
 from geopy.geocoders import Nominatim
 from geopy.distance import geodesic
 from typing import Dict, List, Tuple, Optional, Any
 from django.conf import settings
 
 from .api_utils import APIRequestHandler
+from . import geohash
+from .cache_backend import get_cache, location_bucket
+from .http_clients import geopy_adapter_factory, shared_session
 
 # Configure logger
 logger = logging.getLogger('chatbot.location_service')
 
+# Geocoded locations, keyed by normalized location string
+GEOCODE_CACHE = get_cache('geocode', getattr(settings, 'GEOCODE_CACHE_TTL', 2592000))
+# IP locations, keyed by network prefix
+IP_LOCATION_CACHE = get_cache('ip_location', getattr(settings, 'IP_LOCATION_CACHE_TTL', 604800))
+# Overpass cinemas, keyed by geohash cell
+THEATER_CELL_CACHE = get_cache('theater_cells', getattr(settings, 'THEATER_CELL_CACHE_TTL', 604800))
+
+# Cached in place of a location that could not be found
+NOT_FOUND = {'not_found': True}
+
+
+def quantize_coordinates(location: Dict[str, Any]) -> Dict[str, Any]:
+    """Round a location's latitude and longitude to LOCATION_COORDINATE_PRECISION decimal places."""
+    precision = getattr(settings, 'LOCATION_COORDINATE_PRECISION', 2)
+    return dict(location, latitude=round(location['latitude'], precision),
+                longitude=round(location['longitude'], precision))
+
+
+def ip_prefix(ip_address: str) -> str:
+    """Return the /24 (IPv4) or /48 (IPv6) network of an IP address, or the address itself if it does not parse."""
+    try:
+        address = ipaddress.ip_address(ip_address)
+    except ValueError:
+        return ip_address
+    prefix_length = 24 if address.version == 4 else 48
+    return str(ipaddress.ip_network(f"{address}/{prefix_length}", strict=False))
+
 class LocationService:
     """Service for geocoding and finding nearby theaters."""
 
@@ -23,12 +61,13 @@ class LocationService:
 
         Args:
             user_agent: User agent string for Nominatim (required by their ToS)
-            timeout: Timeout for Nominatim requests in seconds (defaults to settings.API_REQUEST_TIMEOUT)
+            timeout: Timeout for Nominatim requests in seconds (defaults to settings.HTTP_TIMEOUT_NOMINATIM)
         """
         # Use timeout from parameters or settings
-        timeout = timeout or getattr(settings, 'API_REQUEST_TIMEOUT', 60)
+        timeout = timeout or getattr(settings, 'HTTP_TIMEOUT_NOMINATIM', 10)
         logger.info(f"Initializing LocationService with timeout={timeout}s")
-        self.geolocator = Nominatim(user_agent=user_agent, timeout=timeout)
+        # Geocoders share one pooled adapter, so creating one per request opens no new connections
+        self.geolocator = Nominatim(user_agent=user_agent, timeout=timeout, adapter_factory=geopy_adapter_factory)
 
     def geocode_location(self, location_str: str) -> Optional[Dict[str, Any]]:
         """Convert a location string to coordinates.
@@ -47,6 +86,15 @@ class LocationService:
             # Clean up the location string
             location_str = location_str.strip()
 
+            cache_key = location_bucket(location_str)
+            cached_location = GEOCODE_CACHE.get(cache_key)
+            if cached_location == NOT_FOUND:
+                logger.debug(f"Location recently failed to geocode: {location_str}")
+                return None
+            if cached_location:
+                logger.debug(f"Using cached coordinates for location: {location_str}")
+                return cached_location
+
             # Geocode the location with retry mechanism
             def make_geocode_request(*args, **kwargs):
                 return self.geolocator.geocode(location_str, exactly_one=True)
@@ -54,13 +102,16 @@ class LocationService:
             location = APIRequestHandler.make_request(make_geocode_request)
 
             if location:
-                return {
+                geocoded_location = quantize_coordinates({
                     "latitude": location.latitude,
                     "longitude": location.longitude,
                     "display_name": location.address
-                }
+                })
+                GEOCODE_CACHE.set(cache_key, geocoded_location)
+                return geocoded_location
             else:
                 logger.warning(f"Could not geocode location: {location_str}")
+                GEOCODE_CACHE.set(cache_key, NOT_FOUND, getattr(settings, 'NEGATIVE_CACHE_TTL', 900))
                 return None
 
         except Exception as e:
@@ -82,9 +133,18 @@ class LocationService:
                 logger.info(f"Local IP detected ({ip_address}), skipping geolocation")
                 return None
 
+            cache_key = ip_prefix(ip_address)
+            cached_location = IP_LOCATION_CACHE.get(cache_key)
+            if cached_location == NOT_FOUND:
+                logger.debug(f"Network recently had no IP location: {cache_key}")
+                return None
+            if cached_location:
+                logger.debug(f"Using cached location for network: {cache_key}")
+                return cached_location
+
             # Use ipinfo.io for geolocation with retry mechanism
             def make_ip_request(*args, **kwargs):
-                response = requests.get(f"https://ipinfo.io/{ip_address}/json")
+                response = shared_session().get(f"https://ipinfo.io/{ip_address}/json")
                 response.raise_for_status()
                 return response.json()
 
@@ -114,15 +174,18 @@ class LocationService:
                     timezone = data.get('timezone')
                     utc_offset = data.get('utc_offset')
 
-                    return {
+                    ip_location = quantize_coordinates({
                         "latitude": float(lat),
                         "longitude": float(lon),
                         "display_name": display_name,
                         "timezone": timezone,
                         "utc_offset": utc_offset
-                    }
+                    })
+                    IP_LOCATION_CACHE.set(cache_key, ip_location)
+                    return ip_location
                 else:
                     logger.warning(f"Location data not found in IP info response for: {ip_address}")
+                    IP_LOCATION_CACHE.set(cache_key, NOT_FOUND, getattr(settings, 'NEGATIVE_CACHE_TTL', 900))
             except Exception as e:
                 logger.warning(f"Could not get location from IP: {ip_address}, error: {str(e)}")
 
@@ -135,6 +198,11 @@ class LocationService:
     def search_theaters(self, latitude: float, longitude: float, radius_miles: float = 20) -> List[Dict[str, Any]]:
         """Search for movie theaters within a specified radius.
 
+        Cinemas are cached per geohash cell (THEATER_CELL_PRECISION). The cells
+        covering the search radius are read from the cache, and only the missing
+        cells are fetched from Overpass, in a single query. Cells without cinemas
+        are kept for NEGATIVE_CACHE_TTL seconds only.
+
         Args:
             latitude: Latitude coordinate
             longitude: Longitude coordinate
@@ -144,91 +212,40 @@ class LocationService:
             List of theater dictionaries with name, address, and coordinates
         """
         try:
-            # Convert radius to meters for Overpass API
+            # Convert radius to meters for the cell covering
             radius_meters = radius_miles * 1609.34
+            precision = getattr(settings, 'THEATER_CELL_PRECISION', 4)
+            cells = geohash.covering_cells(latitude, longitude, radius_meters, precision)
+
+            cinemas = []
+            missing_cells = []
+            for cell in cells:
+                cached_cinemas = THEATER_CELL_CACHE.get(cell)
+                if cached_cinemas is None:
+                    missing_cells.append(cell)
+                else:
+                    cinemas.extend(cached_cinemas)
 
-            # Build Overpass API query for movie theaters
-            # amenity=cinema is the OSM tag for movie theaters
-            overpass_url = "https://overpass-api.de/api/interpreter"
-            overpass_query = f"""
-            [out:json];
-            (
-              node["amenity"="cinema"](around:{radius_meters},{latitude},{longitude});
-              way["amenity"="cinema"](around:{radius_meters},{latitude},{longitude});
-              relation["amenity"="cinema"](around:{radius_meters},{latitude},{longitude});
-            );
-            out center;
-            """
-
-            # Execute query with retry mechanism
-            def make_overpass_request(*args, **kwargs):
-                response = requests.post(overpass_url, data=overpass_query)
-                response.raise_for_status()
-                return response.json()
-
-            try:
-                data = APIRequestHandler.make_request(make_overpass_request)
-            except Exception as e:
-                logger.error(f"Error querying Overpass API: {str(e)}")
-                return []
-
-            theaters = []
-            for element in data.get('elements', []):
+            if missing_cells:
+                logger.info(f"Fetching {len(missing_cells)} of {len(cells)} theater cells from Overpass")
                 try:
-                    # Get theater data, handling both nodes and ways/relations with center
-                    if element['type'] == 'node':
-                        theater_lat = element.get('lat')
-                        theater_lon = element.get('lon')
-                    else:  # way or relation
-                        if 'center' in element:
-                            theater_lat = element['center'].get('lat')
-                            theater_lon = element['center'].get('lon')
-                        else:
-                            continue  # Skip if no coordinates
-
-                    # Get theater name and address
-                    tags = element.get('tags', {})
-                    name = tags.get('name', 'Unknown Theater')
-
-                    # Build address components
-                    address_parts = []
-                    if 'addr:housenumber' in tags and 'addr:street' in tags:
-                        address_parts.append(f"{tags['addr:housenumber']} {tags['addr:street']}")
-                    elif 'addr:street' in tags:
-                        address_parts.append(tags['addr:street'])
-
-                    if 'addr:city' in tags:
-                        address_parts.append(tags['addr:city'])
-                    if 'addr:state' in tags:
-                        address_parts.append(tags['addr:state'])
-                    if 'addr:postcode' in tags:
-                        address_parts.append(tags['addr:postcode'])
-
-                    # If no structured address, try with addr:full or check for description
-                    if not address_parts:
-                        if 'addr:full' in tags:
-                            address = tags['addr:full']
-                        else:
-                            address = "No address available"
-                    else:
-                        address = ", ".join(address_parts)
-
-                    # Calculate distance
-                    origin = (latitude, longitude)
-                    theater_coords = (theater_lat, theater_lon)
-                    distance_miles = geodesic(origin, theater_coords).miles
-
-                    theaters.append({
-                        "name": name,
-                        "address": address,
-                        "latitude": theater_lat,
-                        "longitude": theater_lon,
-                        "distance_miles": round(distance_miles, 1)
-                    })
+                    fetched_cells = self._fetch_cinema_cells(missing_cells)
+                except Exception as e:
+                    logger.error(f"Error querying Overpass API: {str(e)}")
+                    return []
+                for cell, cell_cinemas in fetched_cells.items():
+                    # Empty cells are rechecked sooner, in case OpenStreetMap data was missing
+                    ttl = None if cell_cinemas else getattr(settings, 'NEGATIVE_CACHE_TTL', 900)
+                    THEATER_CELL_CACHE.set(cell, cell_cinemas, ttl)
+                    cinemas.extend(cell_cinemas)
 
-                except Exception as detail_e:
-                    logger.error(f"Error processing theater data: {str(detail_e)}")
-                    continue
+            theaters = []
+            origin = (latitude, longitude)
+            for cinema in cinemas:
+                # Calculate distance and drop cinemas outside the radius
+                distance_miles = geodesic(origin, (cinema['latitude'], cinema['longitude'])).miles
+                if distance_miles <= radius_miles:
+                    theaters.append(dict(cinema, distance_miles=round(distance_miles, 1)))
 
             # Sort theaters by distance
             theaters.sort(key=lambda x: x.get('distance_miles', float('inf')))
@@ -240,6 +257,102 @@ class LocationService:
             logger.error(f"Error searching for theaters: {str(e)}")
             return []
 
+    def _fetch_cinema_cells(self, cells: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch the cinemas in the given geohash cells with one Overpass query.
+
+        Args:
+            cells: Geohashes of the cells to fetch
+
+        Returns:
+            Dict of cinema lists by cell, with an empty list for cells without cinemas
+        """
+        # Build Overpass API query for movie theaters
+        # amenity=cinema is the OSM tag for movie theaters
+        overpass_url = "https://overpass-api.de/api/interpreter"
+        statements = []
+        for cell in cells:
+            south, west, north, east = geohash.bounds(cell)
+            bbox = f"{south},{west},{north},{east}"
+            statements.append(f'node["amenity"="cinema"]({bbox});')
+            statements.append(f'way["amenity"="cinema"]({bbox});')
+            statements.append(f'relation["amenity"="cinema"]({bbox});')
+        overpass_query = "[out:json];\n(\n" + "\n".join(statements) + "\n);\nout center;"
+
+        # Execute query with retry mechanism
+        def make_overpass_request(*args, **kwargs):
+            response = shared_session().post(overpass_url, data=overpass_query)
+            response.raise_for_status()
+            return response.json()
+
+        data = APIRequestHandler.make_request(make_overpass_request)
+
+        precision = len(cells[0])
+        fetched_cells = {cell: [] for cell in cells}
+        seen = set()
+        for element in data.get('elements', []):
+            key = (element.get('type'), element.get('id'))
+            if key in seen:
+                continue
+            seen.add(key)
+            try:
+                cinema = self._parse_cinema(element)
+            except Exception as detail_e:
+                logger.error(f"Error processing theater data: {str(detail_e)}")
+                continue
+            if cinema:
+                cell = geohash.encode(cinema['latitude'], cinema['longitude'], precision)
+                # Ways and relations can extend past their cell; file them under their center's cell
+                if cell in fetched_cells:
+                    fetched_cells[cell].append(cinema)
+        return fetched_cells
+
+    def _parse_cinema(self, element: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Convert an Overpass cinema element to a theater dictionary, or None if it has no coordinates."""
+        # Get theater data, handling both nodes and ways/relations with center
+        if element['type'] == 'node':
+            theater_lat = element.get('lat')
+            theater_lon = element.get('lon')
+        else:  # way or relation
+            if 'center' in element:
+                theater_lat = element['center'].get('lat')
+                theater_lon = element['center'].get('lon')
+            else:
+                return None  # Skip if no coordinates
+
+        # Get theater name and address
+        tags = element.get('tags', {})
+        name = tags.get('name', 'Unknown Theater')
+
+        # Build address components
+        address_parts = []
+        if 'addr:housenumber' in tags and 'addr:street' in tags:
+            address_parts.append(f"{tags['addr:housenumber']} {tags['addr:street']}")
+        elif 'addr:street' in tags:
+            address_parts.append(tags['addr:street'])
+
+        if 'addr:city' in tags:
+            address_parts.append(tags['addr:city'])
+        if 'addr:state' in tags:
+            address_parts.append(tags['addr:state'])
+        if 'addr:postcode' in tags:
+            address_parts.append(tags['addr:postcode'])
+
+        # If no structured address, try with addr:full or check for description
+        if not address_parts:
+            if 'addr:full' in tags:
+                address = tags['addr:full']
+            else:
+                address = "No address available"
+        else:
+            address = ", ".join(address_parts)
+
+        return {
+            "name": name,
+            "address": address,
+            "latitude": theater_lat,
+            "longitude": theater_lon
+        }
+
 
     def calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Calculate distance between coordinates in miles."""
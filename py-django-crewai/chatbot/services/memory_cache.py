@@ -0,0 +1,248 @@
+"""
+In-Process Memory Cache
+A thread-safe LRU cache with per-entry time-to-live, used for objects that stay
+in one process (LLM clients) and, through MemoryCacheBackend, as the default
+Django backend of the shared pipeline cache.
+
+- get and set are O(1) apart from a heap push: entries are kept in an
+  OrderedDict in least-recently-used order, and expiry times in a min-heap
+  that is drained lazily, so no write ever scans the whole cache.
+- A single lock guards each cache. The caches are small and every operation
+  is short, so lock striping would add overhead without reducing contention.
+- Caches can be bounded by entry count, by total size in bytes, or both.
+- Hits, misses, evictions and expirations are counted for /api/metrics/.
+"""
+
+import heapq
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Rebuild the expiry heap once it holds this many times more entries than the cache
+HEAP_COMPACT_FACTOR = 4
+
+
+class TTLCache:
+    """Thread-safe LRU cache with time-to-live support"""
+
+    def __init__(self, max_size=1000, default_ttl=3600, max_bytes=None, sizeof=sys.getsizeof):
+        """
+        Initialize the cache
+
+        Args:
+            max_size: Maximum number of items to store in cache
+            default_ttl: Default time-to-live in seconds, or None for no expiry
+            max_bytes: Optional limit on the total size of the stored values
+            sizeof: Callable returning the size in bytes of a value, used with max_bytes
+        """
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._lock = threading.Lock()
+        # key -> (value, expires_at, size), least recently used first
+        self._entries = OrderedDict()
+        # (expires_at, key) pairs; entries that were overwritten or removed are skipped when popped
+        self._expiry_heap = []
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key, default=None):
+        """Get value from cache if it exists and is not expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Set value in cache with specified TTL"""
+        self._put(key, value, ttl, replace=True)
+
+    def add(self, key, value, ttl=None):
+        """Set value only if the key is not already cached, returning True if it was stored"""
+        return self._put(key, value, ttl, replace=False)
+
+    def _put(self, key, value, ttl, replace):
+        if ttl is None:
+            ttl = self.default_ttl
+        size = self.sizeof(value) if self.max_bytes else 0
+
+        with self._lock:
+            now = time.monotonic()
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not replace and (entry[1] is None or entry[1] > now):
+                    return False
+                self._remove(key)
+            if self.max_bytes and size > self.max_bytes:
+                # Would evict everything else and still not fit
+                return False
+
+            expires_at = now + ttl if ttl is not None else None
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            if expires_at is not None:
+                heapq.heappush(self._expiry_heap, (expires_at, key))
+
+            self._purge_expired(now)
+            while len(self._entries) > self.max_size or (self.max_bytes and self._bytes > self.max_bytes):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._evictions += 1
+
+            if len(self._expiry_heap) > HEAP_COMPACT_FACTOR * max(len(self._entries), self.max_size):
+                self._compact_heap()
+            return True
+
+    def delete(self, key):
+        """Remove an item, returning True if it was present"""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (entry[1] is None or entry[1] > time.monotonic())
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        """Clear all items in cache"""
+        with self._lock:
+            self._entries.clear()
+            self._expiry_heap.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _purge_expired(self, now):
+        """Drop expired items from the front of the heap (caller holds the lock)"""
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            # Skip heap entries left behind by an overwrite or removal
+            if entry is not None and entry[1] == expires_at:
+                self._remove(key)
+                self._expirations += 1
+
+    def _compact_heap(self):
+        """Rebuild the heap from the live entries (caller holds the lock)"""
+        self._expiry_heap = [
+            (expires_at, key) for key, (_, expires_at, _) in self._entries.items() if expires_at is not None
+        ]
+        heapq.heapify(self._expiry_heap)
+
+    def stats(self):
+        """Return size and hit/miss/eviction counters for monitoring."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_size,
+                'bytes': self._bytes if self.max_bytes else None,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0
+            }
+
+
+# Stores shared by every MemoryCacheBackend with the same LOCATION in this process
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class MemoryCacheBackend(BaseCache):
+    """
+    Django cache backend on top of TTLCache.
+
+    Like Django's LocMemCache, values are pickled so callers never share mutable
+    objects, but lookups and writes never scan the cache and it can be bounded
+    by size with the MAX_BYTES option.
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        with _stores_lock:
+            store = _stores.get(location)
+            if store is None:
+                store = TTLCache(
+                    max_size=self._max_entries,
+                    default_ttl=None,
+                    max_bytes=options.get('MAX_BYTES') or None,
+                    sizeof=len
+                )
+                _stores[location] = store
+        self._store = store
+
+    def _ttl(self, timeout):
+        timeout = self.get_backend_timeout(timeout)
+        return None if timeout is None else max(timeout - time.time(), 0)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._store.add(key, pickle.dumps(value, self.pickle_protocol), self._ttl(timeout))
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        pickled = self._store.get(key)
+        return default if pickled is None else pickle.loads(pickled)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._store.set(key, pickle.dumps(value, self.pickle_protocol), self._ttl(timeout))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        pickled = self._store.get(key)
+        if pickled is None:
+            return False
+        self._store.set(key, pickled, self._ttl(timeout))
+        return True
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._store.delete(key)
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return key in self._store
+
+    def clear(self):
+        self._store.clear()
+
+    def stats(self):
+        """Return the counters of the underlying store."""
+        return self._store.stats()
@@ -31,27 +31,31 @@ from .utils.logging_middleware import LoggingMiddleware
 from .utils.json_parser import JsonParser
 from .utils.response_formatter import ResponseFormatter
 from .utils.custom_event_listener import CustomEventListener
+from .utils.query_intent import intent_key
+from ..executors import get_executor
+from ..crew_isolation import CancellationToken
+from ..cache_backend import get_cache, location_bucket
+from ..memory_cache import TTLCache
+from ..http_clients import install_tmdb_session
+from ..showtime_cache import first_run_ttl, prune_past_showtimes
+from ..llm_response_cache import cache_agent_responses
 
 # Get the logger
 logger = logging.getLogger('chatbot.movie_crew')
 
 # LLM Instance cache to avoid recreating instances
-LLM_CACHE = {}
+LLM_CACHE = TTLCache(max_size=20, default_ttl=3600)
 
-# Result cache for storing processed data
+# Result cache for storing processed data, shared by all workers
 RESULT_CACHE = {
-    'theaters': {},  # Cache theaters by movie_id
-    'recommendations': {}  # Cache recommendations by query hash
+    'theaters': get_cache('manager_theaters', 7200),  # Cache theaters by movie_id and location
+    'recommendations': get_cache('manager_recommendations', 7200),  # Cache recommendations by query hash
+    'first_run': get_cache('manager_first_run', 1800)  # First Run responses by query hash and location
 }
 
-def query_hash(query, conversation_history=None):
-    """Generate a simple hash for a query to use as cache key"""
-    if conversation_history:
-        # Only use the last 2 messages for context
-        context = [msg.get('content', '') for msg in conversation_history[-2:] if msg.get('content')]
-        query_with_context = query + ''.join(context)
-        return hash(query_with_context)
-    return hash(query)
+def query_hash(query, conversation_history=None, first_run_mode=False):
+    """Generate a deterministic cache key shared by queries with the same intent"""
+    return intent_key(query, first_run_mode)
 
 class MovieCrewManagerOptimized:
     """Optimized Manager for the movie recommendation crew."""
@@ -97,6 +101,7 @@ class MovieCrewManagerOptimized:
         # Configure TMDb API if key is provided
         if tmdb_api_key:
             tmdb.API_KEY = tmdb_api_key
+            install_tmdb_session()
 
         # Configure thread pool for parallel processing
         self.executor = None
@@ -120,9 +125,10 @@ class MovieCrewManagerOptimized:
         cache_key = f"{self.model}|{self.base_url}|{temperature}|{self.llm_provider}"
 
         # Check if we already have this LLM in cache
-        if cache_key in LLM_CACHE:
+        cached_llm = LLM_CACHE.get(cache_key)
+        if cached_llm:
             logger.info(f"Using cached LLM instance for {self.model}")
-            return LLM_CACHE[cache_key]
+            return cached_llm
 
         # Log configuration details
         logger.info(f"Creating new LLM with model: {self.model}")
@@ -197,7 +203,7 @@ class MovieCrewManagerOptimized:
         llm = ChatOpenAI(**config)
 
         # Cache the instance for future use
-        LLM_CACHE[cache_key] = llm
+        LLM_CACHE.set(cache_key, llm)
 
         return llm
 
@@ -214,19 +220,23 @@ class MovieCrewManagerOptimized:
         Returns:
             Dict with response text and movie recommendations
         """
-        # Check cache first for identical queries (with context)
-        query_key = query_hash(query, conversation_history)
-
-        # Only use cache in casual mode as theaters/showtimes could change
-        if not first_run_mode and query_key in RESULT_CACHE['recommendations']:
+        # Check cache first for queries with the same intent
+        # First Run results are cached per location, with showtimes that have started pruned
+        if first_run_mode:
+            query_key = f"{query_hash(query, first_run_mode=True)}|{location_bucket(self.user_location, self.user_ip)}"
+            cached_result = RESULT_CACHE['first_run'].get(query_key)
+            if cached_result:
+                cached_result = prune_past_showtimes(cached_result, self.timezone)
+        else:
+            query_key = query_hash(query, conversation_history)
+            cached_result = RESULT_CACHE['recommendations'].get(query_key)
+        if cached_result:
             logger.info(f"Using cached recommendation for query: {query}")
-            cached_result = RESULT_CACHE['recommendations'][query_key]
             return cached_result
 
-        # Initialize executor if needed
+        # Use the shared, bounded pipeline executor
         if self.executor is None:
-            # Use ThreadPoolExecutor for handling parallel tasks
-            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+            self.executor = get_executor('pipeline')
 
         # Create the LLM with error handling
         try:
@@ -244,10 +254,13 @@ class MovieCrewManagerOptimized:
                 "movies": []
             }
 
+        # Cancelled on timeout so the abandoned kickoff stops at its next agent step or tool call
+        cancel_token = CancellationToken()
+
         # Create agents and tools with optimized approach
         try:
             # 1. Create tools with shared instances
-            search_tool, analyze_tool, theater_finder_tool = self._create_tools(first_run_mode)
+            search_tool, analyze_tool, theater_finder_tool = self._create_tools(first_run_mode, cancel_token)
 
             # 2. Create agents with proper tools
             movie_finder, recommender, theater_finder = self._create_agents(
@@ -260,7 +273,7 @@ class MovieCrewManagerOptimized:
             # 4. Set up the crew based on mode
             crew = self._create_crew(
                 movie_finder, recommender, theater_finder,
-                tasks, first_run_mode
+                tasks, first_run_mode, cancel_token
             )
 
         except Exception as setup_error:
@@ -298,11 +311,11 @@ class MovieCrewManagerOptimized:
                     break
 
                 except concurrent.futures.TimeoutError:
+                    # Don't retry: a new kickoff would run on top of the timed-out one.
+                    # Cancel it instead so it stops at its next agent step or tool call.
                     logger.error(f"Crew execution timed out after {timeout_seconds} seconds")
-                    retry_count += 1
-                    if retry_count > max_retries:
-                        raise TimeoutError(f"Crew execution timed out after {retry_count} attempts")
-                    logger.info(f"Retrying crew execution (attempt {retry_count}/{max_retries})")
+                    cancel_token.cancel(f"timed out after {timeout_seconds} seconds")
+                    raise TimeoutError(f"Crew execution timed out after {timeout_seconds} seconds")
 
                 except Exception as exec_error:
                     logger.error(f"Error in crew execution: {str(exec_error)}")
@@ -349,9 +362,13 @@ class MovieCrewManagerOptimized:
                     "movies": movies_with_theaters
                 }
 
-            # Cache result for casual mode
-            if not first_run_mode:
-                RESULT_CACHE['recommendations'][query_key] = response
+            # Cache the result; First Run results only until their earliest showtime starts
+            if first_run_mode:
+                ttl = first_run_ttl(response, self.timezone)
+                if ttl:
+                    RESULT_CACHE['first_run'].set(query_key, response, ttl)
+            else:
+                RESULT_CACHE['recommendations'].set(query_key, response)
 
             return response
 
@@ -363,11 +380,12 @@ class MovieCrewManagerOptimized:
                 "movies": []
             }
 
-    def _create_tools(self, first_run_mode):
+    def _create_tools(self, first_run_mode, cancel_token=None):
         """Create and configure tools with optimized settings"""
         # Create search tool with mode setting
         search_tool = SearchMoviesTool()
         search_tool.first_run_mode = first_run_mode
+        search_tool.cancel_token = cancel_token
 
         # Create analyze tool
         analyze_tool = AnalyzePreferencesTool()
@@ -376,6 +394,7 @@ class MovieCrewManagerOptimized:
         theater_finder_tool = FindTheatersTool(user_location=self.user_location)
         theater_finder_tool.user_ip = self.user_ip
         theater_finder_tool.timezone = self.timezone
+        theater_finder_tool.cancel_token = cancel_token
 
         # Ensure tool compatibility
         self._ensure_tool_compatibility([search_tool, analyze_tool, theater_finder_tool])
@@ -394,6 +413,9 @@ class MovieCrewManagerOptimized:
         recommender = RecommendationAgent.create(llm, tools=recommender_tools)
         theater_finder = TheaterFinderAgent.create(llm, tools=theater_finder_tools)
 
+        # Answer repeated agent prompts from the shared response cache
+        cache_agent_responses(movie_finder, recommender, theater_finder)
+
         return movie_finder, recommender, theater_finder
 
     def _create_tasks(self, movie_finder, recommender, theater_finder, query):
@@ -422,7 +444,7 @@ class MovieCrewManagerOptimized:
 
         return [find_movies_task, recommend_movies_task, find_theaters_task]
 
-    def _create_crew(self, movie_finder, recommender, theater_finder, tasks, first_run_mode):
+    def _create_crew(self, movie_finder, recommender, theater_finder, tasks, first_run_mode, cancel_token=None):
         """Create and configure the crew based on mode"""
         find_movies_task, recommend_movies_task, find_theaters_task = tasks
 
@@ -432,13 +454,17 @@ class MovieCrewManagerOptimized:
         # Patch event tracking before crew creation
         self._patch_crewai_event_tracking()
 
+        # Check for cancellation after every agent step
+        step_callback = cancel_token.step_callback if cancel_token is not None else None
+
         if first_run_mode:
             # For First Run mode, include all agents and tasks
             crew = Crew(
                 agents=[movie_finder, recommender, theater_finder],
                 tasks=[find_movies_task, recommend_movies_task, find_theaters_task],
                 verbose=False,  # Reduce verbosity for improved performance
-                event_listeners=[event_listener]
+                event_listeners=[event_listener],
+                step_callback=step_callback
             )
         else:
             # For Casual Viewing mode, skip the theater finder
@@ -446,7 +472,8 @@ class MovieCrewManagerOptimized:
                 agents=[movie_finder, recommender],
                 tasks=[find_movies_task, recommend_movies_task],
                 verbose=False,  # Reduce verbosity for improved performance
-                event_listeners=[event_listener]
+                event_listeners=[event_listener],
+                step_callback=step_callback
             )
 
         return crew
@@ -473,14 +500,15 @@ class MovieCrewManagerOptimized:
             if not theaters_data and theater_output.startswith('[') and theater_output.endswith(']'):
                 theaters_data = self._repair_json(theater_output)
 
-            # Cache theaters by movie ID for future requests
+            # Cache theaters by movie ID and location for future requests
             if theaters_data:
+                location = location_bucket(self.user_location)
+                theaters_by_movie_id = {}
                 for theater in theaters_data:
                     if isinstance(theater, dict) and 'movie_id' in theater:
-                        movie_id = str(theater['movie_id'])
-                        if movie_id not in RESULT_CACHE['theaters']:
-                            RESULT_CACHE['theaters'][movie_id] = []
-                        RESULT_CACHE['theaters'][movie_id].append(theater)
+                        theaters_by_movie_id.setdefault(str(theater['movie_id']), []).append(theater)
+                for movie_id, movie_theaters in theaters_by_movie_id.items():
+                    RESULT_CACHE['theaters'].set(f"{movie_id}|{location}", movie_theaters)
 
             # Never use fallback theaters - even if no theaters found
             if not theaters_data:
@@ -616,6 +644,7 @@ class MovieCrewManagerOptimized:
         theaters_by_movie_title = {}
 
         # First check cache for any known theaters
+        location = location_bucket(self.user_location)
         for movie in recommendations:
             if not isinstance(movie, dict):
                 continue
@@ -623,9 +652,9 @@ class MovieCrewManagerOptimized:
             # Check if we have cached theaters for this movie
             if 'tmdb_id' in movie:
                 movie_id = str(movie['tmdb_id'])
-                if movie_id in RESULT_CACHE['theaters']:
+                theaters = RESULT_CACHE['theaters'].get(f"{movie_id}|{location}")
+                if theaters:
                     # Use cached theaters
-                    theaters = RESULT_CACHE['theaters'][movie_id]
                     if not hasattr(movie, 'theaters'):
                         movie['theaters'] = []
                     movie['theaters'].extend(theaters)
@@ -57,7 +57,7 @@ class EnhanceMovieImagesTool(BaseTool):
                 logger.warning("No movies to enhance")
                 return "[]"
 
-            logger.info(f"Enhancing {len(movies)} movies sequentially")
+            logger.info(f"Enhancing {len(movies)} movies concurrently")
 
             # Ensure every movie has a tmdb_id field for proper enhancement
             # This is critical because sometimes the field may be 'id' instead of 'tmdb_id'
@@ -76,7 +76,7 @@ class EnhanceMovieImagesTool(BaseTool):
 
             tmdb_service = TMDBService(api_key=self.tmdb_api_key)
 
-            # Use parallel enhancement for better performance
+            # Enrich the whole batch concurrently through the async TMDb client
             enhanced_movies = tmdb_service.enhance_movies_parallel(movies, max_workers=3)
 
             # Ensure all enhanced movies retain their TMDB ID and poster info
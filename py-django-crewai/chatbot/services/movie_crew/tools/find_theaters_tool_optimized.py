@@ -12,23 +12,26 @@ import logging
 import time
 import concurrent.futures
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Callable
 from pydantic import BaseModel, Field, field_validator
 from django.conf import settings
 from crewai.tools import BaseTool
 
 from ...location_service import LocationService
 from ...serp_service import SerpShowtimeService
+from ...showtime_cache import lookup_location_showtimes, lookup_showtimes, seconds_until_local_midnight
 from ...api_utils import APIRequestHandler
+from ...executors import get_executor
+from ...cache_backend import get_cache
 from ..utils.json_parser_optimized import JsonParserOptimized
 
 # Get the logger
 logger = logging.getLogger('chatbot.movie_crew')
 
-# Cache for theater data
+# Cache for theater data, shared by all workers
 THEATER_CACHE = {
-    'by_movie_id': {},  # Cache theaters by movie ID and location
-    'by_movie_title': {}  # Cache theaters by movie title and location
+    'by_movie_id': get_cache('theaters_by_movie_id', 3600),  # Cache theaters by movie ID and location
+    'by_movie_title': get_cache('theaters_by_movie_title', 3600)  # Cache theaters by movie title and location
 }
 
 class FindTheatersInput(BaseModel):
@@ -51,19 +54,14 @@ class FindTheatersToolOptimized(BaseTool):
     user_location: str = Field(default="Unknown", description="User's location for finding nearby theaters")
     user_ip: Optional[str] = None
     timezone: Optional[str] = None
-
-    # Thread pool for parallel processing
-    _thread_pool = None
-
-    def __init__(self, **kwargs):
-        """Initialize with a thread pool for parallel processing"""
-        super().__init__(**kwargs)
-        self._init_thread_pool()
-
-    def _init_thread_pool(self):
-        """Initialize the thread pool if needed"""
-        if self._thread_pool is None:
-            self._thread_pool = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+    on_theaters: Optional[Callable[[Any, str, List[Dict[str, Any]]], None]] = Field(
+        default=None, exclude=True,
+        description="Called with (movie_id, movie_title, theaters) as each movie's theater search finishes"
+    )
+    cancel_token: Optional[Any] = Field(
+        default=None, exclude=True,
+        description="CancellationToken of the crew run; pending showtime lookups stop once it is cancelled"
+    )
 
     def _run(self, movie_recommendations_json: Union[str, List[Dict[str, Any]], Dict[str, Any]] = "") -> str:
         """
@@ -78,6 +76,9 @@ class FindTheatersToolOptimized(BaseTool):
         # Start performance timer
         start_time = time.time()
 
+        # Don't start SerpAPI calls for a run that has already timed out
+        self._raise_if_cancelled()
+
         try:
             # Parse the input JSON
             if isinstance(movie_recommendations_json, (list, dict)):
@@ -194,6 +195,10 @@ class FindTheatersToolOptimized(BaseTool):
         # Start time for global timeout
         start_time = time.time()
 
+        # Movies still to search, when one location-wide search covers them all
+        location_wide = getattr(settings, 'SERPAPI_SHOWTIME_MODE', 'per_movie') == 'location'
+        uncached_movies = []
+
         # Submit all movie theater searches to the thread pool
         for i, movie in enumerate(movies):
             movie_id = movie.get('tmdb_id')
@@ -203,13 +208,21 @@ class FindTheatersToolOptimized(BaseTool):
                 continue
 
             # Check cache first to avoid redundant API calls
-            cache_key = f"{movie_id}:{movie_title}:{location}"
+            cached_theaters = None
+            if movie_id:
+                cached_theaters = THEATER_CACHE['by_movie_id'].get(f"{movie_id}|{location}")
+            if cached_theaters is None:
+                cached_theaters = THEATER_CACHE['by_movie_title'].get(f"{movie_title}|{location}")
 
-            if movie_id and movie_id in THEATER_CACHE['by_movie_id'] and location in THEATER_CACHE['by_movie_id'][movie_id]:
+            if cached_theaters:
                 # Use cached theater data
-                cached_theaters = THEATER_CACHE['by_movie_id'][movie_id][location]
                 all_theaters.extend(cached_theaters)
                 logger.info(f"Using {len(cached_theaters)} cached theaters for {movie_title}")
+                self._report_theaters(movie_id, movie_title, cached_theaters)
+                continue
+
+            if location_wide:
+                uncached_movies.append(movie)
                 continue
 
             # Check if we're approaching the global timeout
@@ -220,8 +233,8 @@ class FindTheatersToolOptimized(BaseTool):
             retry_count = 2 if i == 0 else 1  # Only retry for the first movie
 
             # Pass settings as an argument to avoid thread issues
-            # Submit task to thread pool with remaining time as timeout
-            future = self._thread_pool.submit(
+            # Submit task to the shared I/O executor with remaining time as timeout
+            future = get_executor('io').submit(
                 self._get_movie_showtimes_with_retries,
                 movie_title,
                 movie_id,
@@ -233,38 +246,57 @@ class FindTheatersToolOptimized(BaseTool):
             )
             futures.append((future, movie_id, movie_title))
 
-        # Process results as they complete with respect to global timeout
-        for future, movie_id, movie_title in futures:
-            try:
-                # Calculate remaining time for this result
-                elapsed = time.time() - start_time
-                remaining = max(global_timeout - elapsed, 1)
-
-                # Get result with timeout
-                theaters = future.result(timeout=remaining)  # Dynamic timeout based on remaining time
-
-                if theaters:
-                    # Update cache
-                    if movie_id:
-                        if movie_id not in THEATER_CACHE['by_movie_id']:
-                            THEATER_CACHE['by_movie_id'][movie_id] = {}
-                        THEATER_CACHE['by_movie_id'][movie_id][location] = theaters
-
-                    if movie_title:
-                        if movie_title not in THEATER_CACHE['by_movie_title']:
-                            THEATER_CACHE['by_movie_title'][movie_title] = {}
-                        THEATER_CACHE['by_movie_title'][movie_title][location] = theaters
-
-                    # Add to results
-                    all_theaters.extend(theaters)
-                    logger.info(f"Added {len(theaters)} theaters for {movie_title}")
-                else:
-                    logger.warning(f"No theaters found for {movie_title}")
-
-            except concurrent.futures.TimeoutError:
-                logger.error(f"Timeout while searching for theaters for {movie_title}")
-            except Exception as e:
-                logger.error(f"Error processing theaters for {movie_title}: {str(e)}")
+        if uncached_movies:
+            # One search for the location's showtimes listing, split into each movie's theaters
+            location_future = get_executor('io').submit(
+                self._get_location_showtimes_with_retries,
+                location,
+                2,
+                max(global_timeout - (time.time() - start_time), 5),
+                settings_instance
+            )
+            futures.extend(self._split_location_showtimes(location_future, uncached_movies))
+
+        # Process results in the order they complete, with respect to the global timeout
+        movies_by_future = {future: (movie_id, movie_title) for future, movie_id, movie_title in futures}
+        remaining = max(global_timeout - (time.time() - start_time), 1)
+        try:
+            for future in concurrent.futures.as_completed(movies_by_future, timeout=remaining):
+                if self._is_cancelled():
+                    # Drop lookups that have not started yet and stop the run
+                    for pending in movies_by_future:
+                        pending.cancel()
+                    self._raise_if_cancelled()
+
+                movie_id, movie_title = movies_by_future[future]
+                try:
+                    theaters = future.result()
+
+                    if theaters:
+                        # Update cache, dropping entries at local midnight with the day's showtimes
+                        ttl = min(THEATER_CACHE['by_movie_id'].default_ttl, seconds_until_local_midnight(self.timezone))
+                        if movie_id:
+                            THEATER_CACHE['by_movie_id'].set(f"{movie_id}|{location}", theaters, ttl)
+
+                        if movie_title:
+                            THEATER_CACHE['by_movie_title'].set(f"{movie_title}|{location}", theaters, ttl)
+
+                        # Add to results
+                        all_theaters.extend(theaters)
+                        logger.info(f"Added {len(theaters)} theaters for {movie_title}")
+                    else:
+                        logger.warning(f"No theaters found for {movie_title}")
+
+                    # Hand this movie's theaters over without waiting for the other movies
+                    self._report_theaters(movie_id, movie_title, theaters or [])
+
+                except Exception as e:
+                    logger.error(f"Error processing theaters for {movie_title}: {str(e)}")
+
+        except concurrent.futures.TimeoutError:
+            for future, (movie_id, movie_title) in movies_by_future.items():
+                if not future.done():
+                    logger.error(f"Timeout while searching for theaters for {movie_title}")
 
         # Sort theaters by distance
         all_theaters.sort(key=lambda x: x.get('distance_miles', float('inf')))
@@ -276,64 +308,165 @@ class FindTheatersToolOptimized(BaseTool):
 
         return all_theaters
 
+    def _is_cancelled(self) -> bool:
+        """Whether the crew run this tool belongs to has been cancelled"""
+        return self.cancel_token is not None and self.cancel_token.cancelled
+
+    def _raise_if_cancelled(self) -> None:
+        """Stop the crew run if it has been cancelled"""
+        if self.cancel_token is not None:
+            self.cancel_token.raise_if_cancelled()
+
+    def _report_theaters(self, movie_id: Any, movie_title: str, theaters: List[Dict[str, Any]]) -> None:
+        """Pass one movie's theaters to the on_theaters callback, if one is set"""
+        if self.on_theaters is None:
+            return
+        try:
+            self.on_theaters(movie_id, movie_title, theaters)
+        except Exception as e:
+            logger.error(f"Error reporting theaters for {movie_title}: {str(e)}")
+
     def _get_movie_showtimes_with_retries(self, movie_title: str, movie_id: Any, location: str,
                                         user_coords: Dict[str, Any], max_retries: int = 1,
                                         timeout: int = 30, settings_obj = None) -> List[Dict[str, Any]]:
         """Get showtimes for a movie with automatic retries and timeout"""
-        # Start timer for timeout
-        start_time = time.time()
-        # Use passed settings if available, otherwise try to import
-        if settings_obj:
-            settings_to_use = settings_obj
-        else:
-            from django.conf import settings as settings_to_use
+        settings_to_use = self._settings(settings_obj)
+        showtime_service = self._showtime_service()
+        if showtime_service is None:
+            return []
 
-        retry_delay = getattr(settings_to_use, 'SERPAPI_BASE_RETRY_DELAY', 3.0)
-        retry_multiplier = getattr(settings_to_use, 'SERPAPI_RETRY_MULTIPLIER', 1.5)
+        # Use a larger search radius to find more theaters
+        radius_miles = getattr(settings_to_use, 'THEATER_SEARCH_RADIUS_MILES', 25)  # Increased from 15 to 25
+
+        # Served from the shared showtime cache when another request already searched today
+        real_theaters_with_showtimes = self._search_with_retries(
+            lambda: lookup_showtimes(
+                lambda: showtime_service.fetch_showtimes(
+                    movie_title=movie_title,
+                    location=location,
+                    radius_miles=radius_miles,
+                    timezone=self.timezone
+                ),
+                movie_title,
+                location,
+                self.timezone
+            ),
+            movie_title, location, max_retries, timeout, settings_to_use
+        )
+
+        # Format theaters and return
+        if real_theaters_with_showtimes:
+            return self._format_serpapi_showtimes(real_theaters_with_showtimes, movie_title, movie_id)
+        return []
 
-        # Initialize SerpAPI service
+    def _get_location_showtimes_with_retries(self, location: str, max_retries: int = 1, timeout: int = 30,
+                                             settings_obj = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the showtimes of every movie in the location with one search, with retries and timeout"""
+        settings_to_use = self._settings(settings_obj)
+        showtime_service = self._showtime_service()
+        if showtime_service is None:
+            return {}
+
+        radius_miles = getattr(settings_to_use, 'THEATER_SEARCH_RADIUS_MILES', 25)
+        return self._search_with_retries(
+            lambda: lookup_location_showtimes(
+                lambda: showtime_service.fetch_location_showtimes(
+                    location=location,
+                    radius_miles=radius_miles,
+                    timezone=self.timezone
+                ),
+                location,
+                self.timezone
+            ),
+            "all movies", location, max_retries, timeout, settings_to_use
+        ) or {}
+
+    def _split_location_showtimes(self, location_future: concurrent.futures.Future,
+                                  movies: List[Dict[str, Any]]) -> List[tuple]:
+        """
+        Turn the future of a location-wide showtimes search into one future per movie,
+        resolved with that movie's formatted theaters when the search finishes
+        """
+        showtime_service = self._showtime_service()
+        futures = [(concurrent.futures.Future(), movie.get('tmdb_id'), movie.get('title')) for movie in movies]
+
+        def resolve(done):
+            for future, movie_id, movie_title in futures:
+                # Skip movies whose futures were cancelled along with the run
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    showtimes_by_title = done.result()
+                    theaters = showtime_service.showtimes_for_movie(showtimes_by_title, movie_title) if showtime_service else []
+                    future.set_result(self._format_serpapi_showtimes(theaters, movie_title, movie_id) if theaters else [])
+                except Exception as e:
+                    future.set_exception(e)
+
+        location_future.add_done_callback(resolve)
+        return futures
+
+    def _settings(self, settings_obj=None):
+        """Use passed settings if available, otherwise Django's"""
+        if settings_obj:
+            return settings_obj
+        from django.conf import settings as settings_to_use
+        return settings_to_use
+
+    def _showtime_service(self) -> Optional[SerpShowtimeService]:
+        """Create the SerpAPI service, or None without a valid API key"""
         try:
             from django.conf import settings
             serp_api_key = settings.SERPAPI_API_KEY
             if not serp_api_key or serp_api_key == 'your_serpapi_key_here':
                 logger.warning("No valid SerpAPI key configured")
-                return []
+                return None
 
-            showtime_service = SerpShowtimeService(api_key=serp_api_key)
+            return SerpShowtimeService(api_key=serp_api_key)
 
         except Exception as e:
             logger.error(f"Error initializing SerpAPI service: {str(e)}")
-            return []
+            return None
+
+    def _search_with_retries(self, search: Callable[[], tuple], label: str, location: str,
+                             max_retries: int = 1, timeout: int = 30, settings_obj = None) -> Any:
+        """
+        Run a showtime search returning (result, definitive) with automatic retries and timeout.
+        Returns the first non-empty result, or None.
+        """
+        # Start timer for timeout
+        start_time = time.time()
+        settings_to_use = self._settings(settings_obj)
+
+        retry_delay = getattr(settings_to_use, 'SERPAPI_BASE_RETRY_DELAY', 3.0)
+        retry_multiplier = getattr(settings_to_use, 'SERPAPI_RETRY_MULTIPLIER', 1.5)
 
         # Search for showtimes with retries
         retry_count = 0
         while retry_count <= max_retries:
             try:
+                # Stop retrying once the crew run is cancelled
+                if self._is_cancelled():
+                    logger.warning(f"Crew run cancelled, skipping showtime search for {label}")
+                    break
+
                 # Check if we've exceeded the timeout
                 if time.time() - start_time > timeout:
-                    logger.warning(f"Timeout reached for {movie_title}, returning early")
+                    logger.warning(f"Timeout reached for {label}, returning early")
                     break
 
-                # Use a larger search radius to find more theaters
-                radius_miles = getattr(settings_to_use, 'THEATER_SEARCH_RADIUS_MILES', 25)  # Increased from 15 to 25
-
-                real_theaters_with_showtimes = APIRequestHandler.make_request(
-                    lambda: showtime_service.search_showtimes(
-                        movie_title=movie_title,
-                        location=location,
-                        radius_miles=radius_miles,
-                        timezone=self.timezone
-                    )
-                )
+                result, definitive = APIRequestHandler.make_request(search)
 
                 # Check if we found theaters
-                if real_theaters_with_showtimes:
-                    # Format theaters and return
-                    theaters = self._format_serpapi_showtimes(real_theaters_with_showtimes, movie_title, movie_id)
-                    return theaters
+                if result:
+                    return result
+
+                # SerpAPI answered that there are no showtimes; retrying would not change that
+                if definitive:
+                    logger.info(f"No showtimes for {label} in {location}, not retrying")
+                    break
 
             except Exception as e:
-                logger.error(f"Error in attempt {retry_count+1} for {movie_title}: {str(e)}")
+                logger.error(f"Error in attempt {retry_count+1} for {label}: {str(e)}")
 
             # Increment retry count
             retry_count += 1
@@ -348,29 +481,25 @@ class FindTheatersToolOptimized(BaseTool):
 
             # Skip retry if we don't have enough time
             if remaining < 5:  # Need at least 5 seconds
-                logger.warning(f"Not enough time for retry #{retry_count} of {movie_title}, skipping")
+                logger.warning(f"Not enough time for retry #{retry_count} of {label}, skipping")
                 break
 
             # Shorter delay for retries to improve responsiveness
             delay = min(retry_delay * (retry_multiplier ** (retry_count - 1)), remaining / 2)
             logger.info(f"Retrying in {delay:.1f} seconds (attempt {retry_count}/{max_retries})")
-            time.sleep(delay)
+            if self.cancel_token is not None:
+                # Wake up early if the run is cancelled during the delay
+                self.cancel_token.wait(delay)
+            else:
+                time.sleep(delay)
 
-        # Return empty list if all retries failed
-        return []
+        # Return None if all retries failed
+        return None
 
     def _get_user_coordinates(self, location_service: LocationService) -> Dict[str, Any]:
-        """Get user coordinates efficiently with caching"""
-        if not hasattr(self.__class__, '_coord_cache'):
-            self.__class__._coord_cache = {}
-
+        """Get user coordinates; LocationService serves repeat lookups from its caches"""
         location = self.user_location
 
-        # Check cache first
-        cache_key = f"{location}:{self.user_ip}"
-        if cache_key in self.__class__._coord_cache:
-            return self.__class__._coord_cache[cache_key]
-
         # Try to geocode the user's location
         user_coords = None
         if location and location.lower() != 'unknown':
@@ -390,16 +519,13 @@ class FindTheatersToolOptimized(BaseTool):
 
         # Use default if all else fails
         if not user_coords:
-            # Default to a US location (Seattle)
-            user_coords = {
+            # Default to a US location (Seattle); not cached, so the next request retries the lookup
+            return {
                 'latitude': 47.60621,
                 'longitude': -122.33207,
                 'display_name': 'Seattle, WA, USA'
             }
 
-        # Cache the result
-        self.__class__._coord_cache[cache_key] = user_coords
-
         return user_coords
 
     def _format_serpapi_showtimes(self, serp_theaters: List[Dict[str, Any]], movie_title: str, movie_id: Any) -> List[Dict[str, Any]]:
@@ -573,8 +699,3 @@ class FindTheatersToolOptimized(BaseTool):
             fallback_theaters.append(theater_entry)
 
         return fallback_theaters
-
-    def __del__(self):
-        """Cleanup thread pool on deletion"""
-        if self._thread_pool:
-            self._thread_pool.shutdown(wait=False)
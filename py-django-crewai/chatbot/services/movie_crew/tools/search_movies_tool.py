@@ -4,12 +4,15 @@ Tool for searching movies based on user criteria.
 import json
 import logging
 from datetime import datetime
-from typing import Dict, Any, Union
+from typing import Dict, Any, Optional, Union
 import tmdbsimple as tmdb
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field, field_validator
 from django.conf import settings
 
+from ..utils.query_intent import extract_genres, extract_year_ranges, parse_intent, wants_now_playing
+from ...catalog_service import get_catalog
+
 # Get the logger
 logger = logging.getLogger('chatbot.movie_crew')
 
@@ -43,6 +46,10 @@ class SearchMoviesTool(BaseTool):
     description: str = "Search for movies based on user criteria."
     args_schema: type[SearchMoviesInput] = SearchMoviesInput
     first_run_mode: bool = True  # Default to First Run mode (theater search)
+    cancel_token: Optional[Any] = Field(
+        default=None, exclude=True,
+        description="CancellationToken of the crew run; the search is skipped once it is cancelled"
+    )
 
     def _run(self, query: Union[str, Dict[str, Any]] = "") -> str:
         """
@@ -54,6 +61,10 @@ class SearchMoviesTool(BaseTool):
         Returns:
             JSON string containing movie results
         """
+        # Don't start TMDb calls for a run that has already timed out
+        if self.cancel_token is not None:
+            self.cancel_token.raise_if_cancelled()
+
         try:
             # Handle dictionary input if passed directly
             if isinstance(query, dict):
@@ -136,43 +147,15 @@ class SearchMoviesTool(BaseTool):
                     # Continue with TMDB search as fallback
 
             # Check for currently playing movies in TMDB (as fallback or for casual viewing)
-            search_for_now_playing = any(term in search_query.lower() for term in
-                                       ['now playing', 'playing now', 'current', 'in theaters', 'theaters now',
-                                        'showing now', 'showing at', 'playing at', 'weekend', 'this week'])
+            search_for_now_playing = wants_now_playing(search_query)
 
             # Always prioritize now_playing search in First Run mode
             if self.first_run_mode:
                 search_for_now_playing = True
                 logger.info("Forcing now_playing search in First Run mode")
 
-            # Check if looking for specific genres
-            genre_terms = {
-                'action': 28,
-                'adventure': 12,
-                'animation': 16,
-                'comedy': 35,
-                'crime': 80,
-                'documentary': 99,
-                'drama': 18,
-                'family': 10751,
-                'fantasy': 14,
-                'history': 36,
-                'horror': 27,
-                'music': 10402,
-                'mystery': 9648,
-                'romance': 10749,
-                'sci fi': 878,
-                'science fiction': 878,
-                'thriller': 53,
-                'war': 10752,
-                'western': 37
-            }
-
             # Extract genre IDs from the query
-            genres = []
-            for genre, genre_id in genre_terms.items():
-                if genre in search_query.lower():
-                    genres.append(genre_id)
+            genres = extract_genres(search_query)
 
             movies = []
 
@@ -182,18 +165,26 @@ class SearchMoviesTool(BaseTool):
             # If looking for now playing movies
             if search_for_now_playing:
                 try:
-                    now_playing = tmdb.Movies()
-                    response = now_playing.now_playing()
+                    results_limit = getattr(settings, 'MOVIE_RESULTS_LIMIT', 5)
+
+                    # Answer from the in-memory catalog when it has loaded
+                    catalog = get_catalog()
+                    results = catalog.now_playing(genres, limit=results_limit) if catalog else None
+                    if results is not None:
+                        logger.info(f"Found {len(results)} now playing movies in the catalog")
+                    else:
+                        now_playing = tmdb.Movies()
+                        response = now_playing.now_playing()
+                        results = response.get('results', []) if response else []
 
-                    if response and 'results' in response and response['results']:
                         # Filter by genre if specified
-                        results = response['results']
                         if genres:
                             results = [movie for movie in results if any(genre_id in movie.get('genre_ids', []) for genre_id in genres)]
 
                         # Process limited number of results
-                        results_limit = getattr(settings, 'MOVIE_RESULTS_LIMIT', 5)
                         results = results[:results_limit]
+
+                    if results:
                         for movie in results:
                             movie_id = movie.get('id')
                             title = movie.get('title', 'Unknown Title')
@@ -201,24 +192,12 @@ class SearchMoviesTool(BaseTool):
                             release_date = movie.get('release_date', '')
                             poster_path = movie.get('poster_path', '')
 
-                            # Get full-size poster image
+                            # Use the listed poster; the best poster is resolved only for the
+                            # movies finally recommended, by EnhanceMovieImagesTool
                             poster_url = ""
                             if poster_path:
                                 poster_url = f"https://image.tmdb.org/t/p/original{poster_path}"
 
-                                # Try to get additional images using the movie images endpoint
-                                try:
-                                    movie_details = tmdb.Movies(movie_id)
-                                    images = movie_details.images()
-
-                                    # If we have additional posters, use the first one at original size
-                                    if images and 'posters' in images and images['posters']:
-                                        best_poster = images['posters'][0]  # Use first poster (usually the best)
-                                        poster_url = f"https://image.tmdb.org/t/p/original{best_poster['file_path']}"
-                                        logger.info(f"Using high-quality poster from images endpoint for movie: {title}")
-                                except Exception as poster_error:
-                                    logger.warning(f"Could not fetch additional images, using standard poster: {str(poster_error)}")
-
                             # Get movie release year
                             release_year = None
                             if release_date and len(release_date) >= 4:
@@ -258,59 +237,25 @@ class SearchMoviesTool(BaseTool):
                     logger.error(f"Error fetching now playing movies: {str(e)}")
 
             # Check for decade or year range in the query
-            import re
-            year_ranges = []
-
-            # Check for specific decades (90s, 1990s, etc.)
-            decade_patterns = [
-                (r'1990s|90s|nineties', (1990, 1999)),
-                (r'1980s|80s|eighties', (1980, 1989)),
-                (r'1970s|70s|seventies', (1970, 1979)),
-                (r'1960s|60s|sixties', (1960, 1969)),
-                (r'1950s|50s|fifties', (1950, 1959)),
-                (r'2000s|two thousands', (2000, 2009)),
-                (r'2010s|twenty tens', (2010, 2019)),
-                (r'2020s|twenty twenties', (2020, 2029))
-            ]
-
-            for pattern, (start_year, end_year) in decade_patterns:
-                if re.search(fr'\b{pattern}\b', search_query.lower()):
-                    year_ranges.append((start_year, end_year))
-                    logger.info(f"Detected decade: {start_year}-{end_year} in query: {search_query}")
-
-            # Check for year range patterns like "2000-2010" or "between 2000 and 2010"
-            range_matches = re.findall(r'(\d{4})\s*-\s*(\d{4})', search_query)
-            if range_matches:
-                for start, end in range_matches:
-                    year_ranges.append((int(start), int(end)))
-                    logger.info(f"Detected explicit year range: {start}-{end} in query")
-
-            # Check for "between X and Y" patterns
-            between_matches = re.findall(r'between\s+(\d{4})\s+and\s+(\d{4})', search_query.lower())
-            if between_matches:
-                for start, end in between_matches:
-                    year_ranges.append((int(start), int(end)))
-                    logger.info(f"Detected 'between' year range: {start}-{end} in query")
-
-            # Check for from/before/after year patterns
-            from_year_match = re.search(r'from\s+(\d{4})', search_query.lower())
-            if from_year_match:
-                year = int(from_year_match.group(1))
-                year_ranges.append((year, datetime.now().year))
-                logger.info(f"Detected 'from year' pattern: {year}-present in query")
-
-            before_year_match = re.search(r'before\s+(\d{4})', search_query.lower())
-            if before_year_match:
-                year = int(before_year_match.group(1))
-                default_start_year = getattr(settings, 'DEFAULT_SEARCH_START_YEAR', 1900)
-                year_ranges.append((default_start_year, year))
-                logger.info(f"Detected 'before year' pattern: {default_start_year}-{year} in query")
-
-            after_year_match = re.search(r'after\s+(\d{4})', search_query.lower())
-            if after_year_match:
-                year = int(after_year_match.group(1))
-                year_ranges.append((year, datetime.now().year))
-                logger.info(f"Detected 'after year' pattern: {year}-present in query")
+            year_ranges = extract_year_ranges(search_query)
+            if year_ranges:
+                logger.info(f"Detected year ranges {year_ranges} in query: {search_query}")
+
+            # Casual queries that only name genres and year ranges can be answered from the catalog;
+            # a bare year is part of the free text, so those queries go to TMDb search
+            if not movies and not self.first_run_mode and (genres or year_ranges) and not parse_intent(search_query)['text']:
+                catalog = get_catalog()
+                results_limit = getattr(settings, 'MOVIE_RESULTS_LIMIT', 5)
+                results = catalog.search(genres, year_ranges, limit=results_limit) if catalog else None
+                if results and len(results) >= results_limit:
+                    logger.info(f"Found {len(results)} matching movies in the catalog")
+                    if year_ranges:
+                        # The catalog matches any of the ranges, so tag each movie with the one it falls in
+                        return json.dumps([
+                            self._process_movie_result(movie, *self._matching_year_range(movie, year_ranges))
+                            for movie in results
+                        ])
+                    return json.dumps([self._movie_result_dict(movie) for movie in results])
 
             # If no movies found or not looking for now playing, do a regular search
             if not movies:
@@ -525,6 +470,68 @@ class SearchMoviesTool(BaseTool):
             logger.error(f"Error searching for movies: {str(e)}")
             return json.dumps([])
 
+    def _movie_result_dict(self, movie) -> Dict[str, Any]:
+        """
+        Process a movie result from the TMDB API or the catalog.
+
+        Args:
+            movie: Movie data from TMDB API
+
+        Returns:
+            Processed movie dictionary
+        """
+        movie_id = movie.get('id')
+        poster_path = movie.get('poster_path', '')
+        release_year = None
+        try:
+            release_year = int((movie.get('release_date') or '')[:4])
+        except ValueError:
+            pass
+
+        movie_dict = self._create_movie_dict(
+            title=movie.get('title', 'Unknown Title'),
+            overview=movie.get('overview', ''),
+            release_date=movie.get('release_date', ''),
+            poster_url=f"https://image.tmdb.org/t/p/original{poster_path}" if poster_path else "",
+            tmdb_id=movie_id,
+            rating=movie.get('vote_average', 0),
+            is_current_release=release_year is not None and release_year >= (datetime.now().year - 1)
+        )
+
+        # Ensure both id and tmdb_id fields are present for compatibility
+        movie_dict['id'] = movie_id
+
+        # Add additional poster size options
+        if poster_path:
+            movie_dict['poster_urls'] = {
+                'small': f"https://image.tmdb.org/t/p/w200{poster_path}",
+                'medium': f"https://image.tmdb.org/t/p/w500{poster_path}",
+                'large': f"https://image.tmdb.org/t/p/w780{poster_path}",
+                'original': f"https://image.tmdb.org/t/p/original{poster_path}"
+            }
+
+        return movie_dict
+
+    def _matching_year_range(self, movie, year_ranges):
+        """
+        Find the year range a movie was released in.
+
+        Args:
+            movie: Movie data from TMDB API or the catalog
+            year_ranges: List of (start_year, end_year) tuples
+
+        Returns:
+            The first range containing the movie's release year, or the first range
+        """
+        try:
+            release_year = int((movie.get('release_date') or '')[:4])
+        except ValueError:
+            return year_ranges[0]
+        for start_year, end_year in year_ranges:
+            if start_year <= release_year <= end_year:
+                return start_year, end_year
+        return year_ranges[0]
+
     def _process_movie_result(self, movie, start_year, end_year) -> Dict[str, Any]:
         """
         Process a movie result from the TMDB API with year range information.
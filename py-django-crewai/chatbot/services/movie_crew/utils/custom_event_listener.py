@@ -8,7 +8,7 @@ Performance improvements:
 """
 
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
 import time
 
 # Configure logger
@@ -61,13 +61,35 @@ class CustomEventListener(EventListener):
     useful information for debugging.
     """
 
-    def __init__(self):
-        """Initialize the custom event listener with optimized settings."""
+    def __init__(self, progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        """
+        Initialize the custom event listener with optimized settings.
+
+        Args:
+            progress_callback: Optional callable(event, data) notified as each task finishes
+        """
         super().__init__()
         self.start_times = {}
         self.tool_usage_counts = {}
         self.agent_task_mapping = {}
         self.task_durations = {}
+        self.progress_callback = progress_callback
+        self.last_task_finished = time.time()
+        self.tasks_finished = 0
+
+    def on_task_output(self, output: Any) -> None:
+        """
+        Handle a finished task reported through the crew's task_callback.
+
+        Args:
+            output: The TaskOutput of the finished task
+        """
+        self.tasks_finished += 1
+        self._handle_task_finished({
+            'task_id': f"task_{self.tasks_finished}",
+            'task_description': getattr(output, 'description', None) or 'Unknown Task',
+            'agent_name': getattr(output, 'agent', None) or 'Unknown Agent'
+        })
 
     def on_event(self, event_name: str, data: Optional[Dict[str, Any]] = None) -> None:
         """
@@ -130,19 +152,30 @@ class CustomEventListener(EventListener):
         task_id = data.get('task_id', 'unknown_task')
         task_description = data.get('task_description', 'Unknown Task')
 
-        # Calculate task duration
+        # Calculate task duration, falling back to the time since the previous task finished
         import time
         if task_id in self.start_times:
             duration = time.time() - self.start_times[task_id]
-            self.task_durations[task_id] = duration
-
-            # Log task completion with duration
-            logger.info(f"Task finished: '{task_description}' in {duration:.2f}s")
-
-            # Clean up
             del self.start_times[task_id]
         else:
-            logger.info(f"Task finished: '{task_description}'")
+            duration = time.time() - self.last_task_finished
+        self.task_durations[task_id] = duration
+        self.last_task_finished = time.time()
+
+        # Log task completion with duration
+        logger.info(f"Task finished: '{task_description}' in {duration:.2f}s")
+
+        # Forward progress to the caller (e.g. the job's event stream)
+        if self.progress_callback:
+            try:
+                self.progress_callback('task_finished', {
+                    'task': task_description,
+                    'agent': data.get('agent_name') or self.agent_task_mapping.get(task_id, 'Unknown Agent'),
+                    'index': self.tasks_finished,
+                    'duration_seconds': round(duration, 2)
+                })
+            except Exception as e:
+                logger.error(f"Error reporting task progress: {str(e)}")
 
     def _handle_tool_started(self, data: Dict[str, Any]) -> None:
         """Handle tool started event."""
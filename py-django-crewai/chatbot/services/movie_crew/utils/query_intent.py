@@ -0,0 +1,216 @@
+"""
+Query intent extraction for the movie crew.
+
+Pulls wanted and unwanted genres, year ranges and the now-playing flag out of
+a user's query. The
+search tool uses them to build TMDb requests, and the result caches use them to
+recognize differently worded requests for the same movies ("Sci-fi movies",
+"sci fi movies" and "Show me some sci-fi movies!" share one cache entry).
+"""
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from django.conf import settings
+
+# Get the logger
+logger = logging.getLogger('chatbot.movie_crew')
+
+# TMDb genre IDs by the terms users write for them
+GENRE_TERMS = {
+    'action': 28,
+    'adventure': 12,
+    'animation': 16,
+    'comedy': 35,
+    'comedies': 35,
+    'crime': 80,
+    'documentary': 99,
+    'documentaries': 99,
+    'drama': 18,
+    'family': 10751,
+    'fantasy': 14,
+    'history': 36,
+    'horror': 27,
+    'music': 10402,
+    'mystery': 9648,
+    'mysteries': 9648,
+    'romance': 10749,
+    'sci fi': 878,
+    'science fiction': 878,
+    'thriller': 53,
+    'war': 10752,
+    'western': 37
+}
+
+# Words that turn the genre right after them (at most one word later) into an unwanted one,
+# as in "comedy but not romance" or "without any horror"
+NEGATION_PATTERN = r'\b(?:not|no|without|except|excluding|minus|nothing|skip|avoid)(?:\s+\w+)?\s+$'
+
+# Phrases that ask for movies currently in theaters
+NOW_PLAYING_TERMS = [
+    'now playing', 'playing now', 'current', 'in theaters', 'theaters now',
+    'showing now', 'showing at', 'playing at', 'weekend', 'this week'
+]
+
+# Decades and the years they cover
+DECADE_PATTERNS = [
+    (r'1990s|90s|nineties', (1990, 1999)),
+    (r'1980s|80s|eighties', (1980, 1989)),
+    (r'1970s|70s|seventies', (1970, 1979)),
+    (r'1960s|60s|sixties', (1960, 1969)),
+    (r'1950s|50s|fifties', (1950, 1959)),
+    (r'2000s|two thousands', (2000, 2009)),
+    (r'2010s|twenty tens', (2010, 2019)),
+    (r'2020s|twenty twenties', (2020, 2029))
+]
+
+# Filler words that do not change which movies are recommended
+FILLER_WORDS = {
+    'a', 'an', 'the', 'some', 'any', 'me', 'us', 'i', 'im', 'we', 'you', 'can', 'could', 'would',
+    'please', 'show', 'find', 'give', 'get', 'recommend', 'recommendation', 'recommendations',
+    'suggest', 'suggestion', 'suggestions', 'want', 'looking', 'for', 'to', 'watch', 'see',
+    'movie', 'movies', 'film', 'films', 'something', 'what', 'are', 'is', 'there', 'from', 'in', 'of'
+}
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase a query, unify spellings such as 'sci-fi' and drop punctuation."""
+    text = text.lower()
+    text = re.sub(r'\bsci[\s-]?fi\b', 'sci fi', text)
+    text = re.sub(r"[^\w\s-]", ' ', text)
+    text = text.replace('-', ' ')
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def _genre_mentions(text: str) -> Tuple[List[int], List[int]]:
+    """Return the genre IDs a query asks for and the ones it rules out, in GENRE_TERMS order."""
+    text = normalize_text(text)
+    wanted = []
+    unwanted = []
+    for term, genre_id in GENRE_TERMS.items():
+        for match in re.finditer(fr'\b{term}s?\b', text):
+            if re.search(NEGATION_PATTERN, text[:match.start()]):
+                if genre_id not in unwanted:
+                    unwanted.append(genre_id)
+            elif genre_id not in wanted:
+                wanted.append(genre_id)
+    # A genre that is also asked for outright is not ruled out
+    return wanted, [genre_id for genre_id in unwanted if genre_id not in wanted]
+
+
+def extract_genres(text: str) -> List[int]:
+    """Return the TMDb genre IDs a query asks for, in GENRE_TERMS order; ruled-out genres are left out."""
+    return _genre_mentions(text)[0]
+
+
+def extract_excluded_genres(text: str) -> List[int]:
+    """Return the TMDb genre IDs a query rules out ("but not romance"), in GENRE_TERMS order."""
+    return _genre_mentions(text)[1]
+
+
+def wants_now_playing(text: str) -> bool:
+    """Whether a query asks for movies currently in theaters."""
+    text = text.lower()
+    return any(term in text for term in NOW_PLAYING_TERMS)
+
+
+def _year_range_matches(lowered: str) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """Return (year range, match span) for each year range written with explicit years in a lowercased query."""
+    matches = []
+    for match in re.finditer(r'(\d{4})\s*-\s*(\d{4})', lowered):
+        matches.append(((int(match.group(1)), int(match.group(2))), match.span()))
+        logger.debug(f"Detected explicit year range: {match.group(1)}-{match.group(2)} in query")
+
+    for match in re.finditer(r'between\s+(\d{4})\s+and\s+(\d{4})', lowered):
+        matches.append(((int(match.group(1)), int(match.group(2))), match.span()))
+        logger.debug(f"Detected 'between' year range: {match.group(1)}-{match.group(2)} in query")
+
+    from_year_match = re.search(r'from\s+(\d{4})', lowered)
+    if from_year_match:
+        year = int(from_year_match.group(1))
+        matches.append(((year, datetime.now().year), from_year_match.span()))
+        logger.debug(f"Detected 'from year' pattern: {year}-present in query")
+
+    before_year_match = re.search(r'before\s+(\d{4})', lowered)
+    if before_year_match:
+        year = int(before_year_match.group(1))
+        default_start_year = getattr(settings, 'DEFAULT_SEARCH_START_YEAR', 1900)
+        matches.append(((default_start_year, year - 1), before_year_match.span()))
+        logger.debug(f"Detected 'before year' pattern: {default_start_year}-{year - 1} in query")
+
+    after_year_match = re.search(r'after\s+(\d{4})', lowered)
+    if after_year_match:
+        year = int(after_year_match.group(1))
+        matches.append(((year + 1, datetime.now().year), after_year_match.span()))
+        logger.debug(f"Detected 'after year' pattern: {year + 1}-present in query")
+
+    return matches
+
+
+def extract_year_ranges(text: str) -> List[Tuple[int, int]]:
+    """
+    Return the year ranges a query asks for: decades ("90s"), explicit ranges
+    ("2000-2010", "between 2000 and 2010") and open ranges ("from", "before",
+    "after" a year). "from" includes its year, "before" and "after" do not.
+    A bare year ("action movies 1985") is not a range and stays in the free text.
+    """
+    lowered = text.lower()
+    year_ranges = []
+
+    for pattern, (start_year, end_year) in DECADE_PATTERNS:
+        if re.search(fr'\b{pattern}\b', lowered):
+            year_ranges.append((start_year, end_year))
+            logger.debug(f"Detected decade: {start_year}-{end_year} in query: {text}")
+
+    year_ranges.extend(year_range for year_range, _ in _year_range_matches(lowered))
+    return year_ranges
+
+
+def _free_text(text: str) -> str:
+    """
+    The words of a query left after removing genres, decades, year ranges,
+    now-playing phrases and filler. Years that are not part of a range are kept.
+    """
+    text = text.lower()
+    # Blank out the year ranges in place, so overlapping spans stay valid
+    for _, (start, end) in _year_range_matches(text):
+        text = text[:start] + ' ' * (end - start) + text[end:]
+    text = normalize_text(text)
+    for term in sorted(GENRE_TERMS, key=len, reverse=True):
+        text = re.sub(fr'\b{term}s?\b', ' ', text)
+    for pattern, _ in DECADE_PATTERNS:
+        text = re.sub(fr'\b(?:{pattern})\b', ' ', text)
+    for term in NOW_PLAYING_TERMS:
+        text = re.sub(fr'\b{term}\w*', ' ', text)
+    return ' '.join(word for word in text.split() if word not in FILLER_WORDS)
+
+
+def parse_intent(query: str, first_run_mode: bool = False) -> Dict[str, Any]:
+    """
+    Reduce a query to the parts that decide which movies are recommended.
+
+    Args:
+        query: The user's query
+        first_run_mode: Whether the query is for First Run mode
+
+    Returns:
+        Dict with mode, include_genres, exclude_genres, year_ranges, now_playing and free text
+    """
+    include_genres, exclude_genres = _genre_mentions(query)
+    return {
+        'mode': 'first_run' if first_run_mode else 'casual',
+        'include_genres': sorted(include_genres),
+        'exclude_genres': sorted(exclude_genres),
+        'year_ranges': sorted(set(extract_year_ranges(query))),
+        'now_playing': first_run_mode or wants_now_playing(query),
+        'text': _free_text(query)
+    }
+
+
+def intent_key(query: str, first_run_mode: bool = False) -> str:
+    """Return a cache key shared by all queries with the same intent."""
+    intent = parse_intent(query, first_run_mode)
+    return hashlib.md5(json.dumps(intent, sort_keys=True).encode('utf-8')).hexdigest()
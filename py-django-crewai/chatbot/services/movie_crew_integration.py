@@ -1,18 +1,28 @@
 """
 Movie Crew Integration Service
 This module provides a unified interface to the movie crew functionality,
-delegating to the optimized enhanced implementation.
+delegating to a process-wide instance of the optimized enhanced implementation.
 """
 
+import logging
+import threading
+
 from django.conf import settings
-from .movie_crew_optimized_enhanced import MovieCrewOptimizedEnhanced
+from .cache_backend import is_shared as cache_is_shared, location_bucket
+from .movie_crew_optimized_enhanced import MovieCrewOptimizedEnhanced, cached_response as pipeline_cached_response
+from .single_flight import PIPELINE_FLIGHTS, flight_key
+from .crew_isolation import CrewTimeout, get_isolated_pool, isolation_enabled
+from .admission import get_admission_controller, lane_for
+
+logger = logging.getLogger('chatbot.movie_crew')
 
 # Create a service class that delegates to the optimized implementation
 class MovieCrewService:
     """Service class for movie crew operations that delegates to the optimized implementation."""
 
     @staticmethod
-    def process_query(query, conversation_history, first_run_mode=True, user_location=None, user_ip=None, timezone=None):
+    def process_query(query, conversation_history, first_run_mode=True, user_location=None, user_ip=None, timezone=None,
+                      progress_callback=None):
         """
         Process a user query and return movie recommendations.
 
@@ -23,34 +33,142 @@ class MovieCrewService:
             user_location: Optional user location for theater search
             user_ip: Optional user IP address
             timezone: Optional timezone string
+            progress_callback: Optional callable(event, data) notified as pipeline stages finish;
+                only the caller that runs a shared execution receives progress
 
         Returns:
             Dict with response text and movie recommendations
+
+        Raises:
+            AdmissionRejected: If this process is running its maximum number of crews in the
+                query's lane and the wait queue is full or no slot frees up in time
         """
         # Check if First Run mode is disabled via feature flag
         if first_run_mode and not settings.FEATURES.get('ENABLE_FIRST_RUN_MODE', True):
             # Force casual mode if First Run mode is disabled
             first_run_mode = False
-        # Get configuration from settings
-        api_key = settings.LLM_CONFIG['api_key']
-        base_url = settings.LLM_CONFIG.get('base_url')
-        model = settings.LLM_CONFIG.get('model', 'gpt-4o-mini')
-        tmdb_api_key = settings.TMDB_API_KEY
-
-        # Create the optimized manager
-        manager = MovieCrewOptimizedEnhanced(
-            api_key=api_key,
-            base_url=base_url,
-            model=model,
-            tmdb_api_key=tmdb_api_key,
-            user_location=user_location,
-            user_ip=user_ip,
-            timezone=timezone
+
+        if not getattr(settings, 'SINGLE_FLIGHT_ENABLED', True):
+            return MovieCrewService._run_pipeline(
+                query, conversation_history, first_run_mode, user_location, user_ip, timezone, progress_callback
+            )
+
+        # Identical queries in flight share one crew execution
+        key = flight_key(query, conversation_history, first_run_mode, user_location, user_ip)
+        result, shared = PIPELINE_FLIGHTS.do(
+            key,
+            MovieCrewService._run_pipeline,
+            query, conversation_history, first_run_mode, user_location, user_ip, timezone, progress_callback
         )
+        if shared:
+            logger.info(f"Reused in-flight result for query: {query[:50]}")
+        return result
+
+    @staticmethod
+    def cached_response(query, conversation_history, first_run_mode=False, user_location=None, user_ip=None,
+                        timezone=None):
+        """
+        Return the cached response for a query without running a crew, or None.
 
-        # Process the query using the enhanced implementation
-        return manager.process_query(
-            query=query,
-            conversation_history=conversation_history,
-            first_run_mode=first_run_mode
+        First Run results are cached per location bucket, and returned with the
+        showtimes that have already started removed. With process isolation the crews
+        run in worker processes, so a per-process cache backend (memory, locmem) never
+        holds their results and the lookup is skipped; a shared backend is read directly.
+        """
+        if first_run_mode and not settings.FEATURES.get('ENABLE_FIRST_RUN_MODE', True):
+            first_run_mode = False
+        if isolation_enabled():
+            if not cache_is_shared():
+                return None
+            return pipeline_cached_response(
+                query, conversation_history, first_run_mode, location_bucket(user_location, user_ip), timezone
+            )
+        return get_pipeline().cached_response(
+            query, conversation_history, first_run_mode, user_location, user_ip, timezone
         )
+
+    @staticmethod
+    def _run_pipeline(query, conversation_history, first_run_mode, user_location, user_ip, timezone,
+                      progress_callback=None):
+        """
+        Run the crew pipeline for a single query, in a worker process when isolation is enabled.
+        Waits for a slot in the query's lane first.
+        """
+        with get_admission_controller(lane_for(first_run_mode)).admit():
+            if isolation_enabled():
+                return MovieCrewService._run_isolated(
+                    query, conversation_history, first_run_mode, user_location, user_ip, timezone, progress_callback
+                )
+
+            # Process the query using the process-wide enhanced implementation
+            return get_pipeline().process_query(
+                query=query,
+                conversation_history=conversation_history,
+                first_run_mode=first_run_mode,
+                user_location=user_location,
+                user_ip=user_ip,
+                timezone=timezone,
+                progress_callback=progress_callback
+            )
+
+    @staticmethod
+    def _run_isolated(query, conversation_history, first_run_mode, user_location, user_ip, timezone,
+                      progress_callback=None):
+        """
+        Run the crew pipeline in an isolated worker process.
+
+        The worker is terminated if the run overruns CREW_EXECUTION_TIMEOUT plus
+        CREW_PROCESS_KILL_GRACE, so a stuck run stops calling external APIs.
+        The progress callback must be picklable; it is invoked in the worker.
+        """
+        deadline = getattr(settings, 'CREW_EXECUTION_TIMEOUT', 180) + getattr(settings, 'CREW_PROCESS_KILL_GRACE', 30)
+        try:
+            return get_isolated_pool().run(
+                _process_query_in_worker,
+                timeout=deadline,
+                query=query,
+                conversation_history=conversation_history,
+                first_run_mode=first_run_mode,
+                user_location=user_location,
+                user_ip=user_ip,
+                timezone=timezone,
+                progress_callback=progress_callback
+            )
+        except CrewTimeout:
+            logger.error(f"Terminated crew run after {deadline} seconds: {query[:50]}")
+            return {
+                "response": f"I apologize, but it's taking longer than expected to process your request for '{query}'. Please try a more specific query.",
+                "movies": []
+            }
+
+
+def _process_query_in_worker(**kwargs):
+    """Run the pipeline inside an isolated worker process."""
+    return get_pipeline().process_query(**kwargs)
+
+
+# One long-lived pipeline per worker process
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_pipeline():
+    """
+    Get the process-wide MovieCrewOptimizedEnhanced instance, creating it on first use.
+
+    Returns:
+        The shared pipeline
+    """
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                # Get configuration from settings
+                _pipeline = MovieCrewOptimizedEnhanced(
+                    api_key=settings.LLM_CONFIG['api_key'],
+                    base_url=settings.LLM_CONFIG.get('base_url'),
+                    model=settings.LLM_CONFIG.get('model', 'gpt-4o-mini'),
+                    tmdb_api_key=settings.TMDB_API_KEY
+                )
+                logger.info("Created process-wide movie crew pipeline")
+    return _pipeline
@@ -11,8 +11,7 @@ import logging
 import json
 import re
 import asyncio
-import concurrent.futures
-import hashlib
+import copy
 import time
 import traceback
 from datetime import datetime, timedelta
@@ -34,78 +33,26 @@ from .movie_crew.utils.logging_middleware import LoggingMiddleware
 from .movie_crew.utils.json_parser_optimized import JsonParserOptimized
 from .movie_crew.utils.response_formatter import ResponseFormatter
 from .movie_crew.utils.custom_event_listener import CustomEventListener
+from .movie_crew.utils.query_intent import intent_key
+from .executors import get_executor
+from .crew_isolation import CancellationToken
+from .cache_backend import get_cache, location_bucket
+from .memory_cache import TTLCache
+from .http_clients import install_tmdb_session
+from .showtime_cache import first_run_ttl, prune_past_showtimes
+from .llm_response_cache import cache_agent_responses
 
 # Configure logger
 logger = logging.getLogger('chatbot.movie_crew')
 
-# Enhanced cache with TTL support
-class TTLCache:
-    """Cache with time-to-live support"""
-
-    def __init__(self, max_size=1000, default_ttl=3600):
-        """
-        Initialize the TTL Cache
-
-        Args:
-            max_size: Maximum number of items to store in cache
-            default_ttl: Default time-to-live in seconds
-        """
-        self.cache = {}
-        self.expiry = {}
-        self.max_size = max_size
-        self.default_ttl = default_ttl
-
-    def get(self, key):
-        """Get value from cache if it exists and is not expired"""
-        if key not in self.cache:
-            return None
-
-        # Check if expired
-        if self.expiry[key] < datetime.now():
-            # Remove expired item
-            del self.cache[key]
-            del self.expiry[key]
-            return None
-
-        return self.cache[key]
-
-    def set(self, key, value, ttl=None):
-        """Set value in cache with specified TTL"""
-        if ttl is None:
-            ttl = self.default_ttl
-
-        # Clean up if cache is full
-        if len(self.cache) >= self.max_size:
-            self._cleanup()
-
-        # If still full after cleanup, remove oldest item
-        if len(self.cache) >= self.max_size:
-            oldest_key = min(self.expiry, key=self.expiry.get)
-            del self.cache[oldest_key]
-            del self.expiry[oldest_key]
-
-        # Add new item
-        self.cache[key] = value
-        self.expiry[key] = datetime.now() + timedelta(seconds=ttl)
-
-    def _cleanup(self):
-        """Remove expired items"""
-        now = datetime.now()
-        expired_keys = [k for k, v in self.expiry.items() if v < now]
-        for key in expired_keys:
-            del self.cache[key]
-            del self.expiry[key]
-
-    def clear(self):
-        """Clear all items in cache"""
-        self.cache.clear()
-        self.expiry.clear()
-
 # Create caches for different types of data
+# LLM clients hold connections and credentials, so they stay in this process
 LLM_CACHE = TTLCache(max_size=20, default_ttl=3600)  # 1 hour TTL for LLM instances
+# Results are shared by all workers through the pipeline cache
 RESULT_CACHE = {
-    'theaters': TTLCache(max_size=100, default_ttl=7200),  # 2 hours TTL for theaters
-    'recommendations': TTLCache(max_size=100, default_ttl=7200)  # 2 hours TTL for recommendations
+    'theaters': get_cache('theaters', 7200),  # 2 hours TTL for theaters, keyed by movie ID and location
+    'recommendations': get_cache('recommendations', 7200),  # 2 hours TTL for recommendations
+    'first_run': get_cache('first_run_recommendations', 1800)  # First Run responses, keyed by query and location
 }
 
 # Circuit breaker for external APIs
@@ -175,14 +122,51 @@ THEATER_CIRCUIT = CircuitBreaker(name="theater_service", failure_threshold=5, re
 LLM_CIRCUIT = CircuitBreaker(name="llm_service", failure_threshold=3, recovery_timeout=180)
 TMDB_CIRCUIT = CircuitBreaker(name="tmdb_service", failure_threshold=3, recovery_timeout=180)
 
-def query_hash(query, conversation_history=None):
-    """Generate a deterministic hash for a query to use as cache key"""
-    if conversation_history:
-        # Only use the last 2 messages for context
-        context = [msg.get('content', '') for msg in conversation_history[-2:] if msg.get('content')]
-        query_with_context = query + ''.join(context)
-        return hashlib.md5(query_with_context.encode('utf-8')).hexdigest()
-    return hashlib.md5(query.encode('utf-8')).hexdigest()
+def query_hash(query, conversation_history=None, first_run_mode=False):
+    """
+    Generate a deterministic cache key shared by queries with the same intent
+    (genres, year ranges, mode, now-playing flag and remaining words).
+
+    The crew is built from the query alone, so the conversation history (and
+    the welcome message in it) is not part of the key.
+    """
+    return intent_key(query, first_run_mode)
+
+
+def first_run_key(query, location):
+    """Cache key for a First Run response, which depends on the user's location bucket"""
+    return f"{query_hash(query, first_run_mode=True)}|{location}"
+
+
+def cached_response(query, conversation_history=None, first_run_mode=False, location='unknown', timezone=None):
+    """
+    Return the cached response for a query, or None, without building a pipeline.
+
+    Args:
+        query: The user's query
+        conversation_history: Previous conversation messages
+        first_run_mode: Whether to look up a First Run response
+        location: Location bucket First Run responses are cached under
+        timezone: Timezone used to prune showtimes that have already started
+    """
+    if first_run_mode:
+        return _cached_first_run_response(query, location, timezone)
+    cached_result = RESULT_CACHE['recommendations'].get(query_hash(query, conversation_history))
+    return _reword_cached_response(cached_result, query) if cached_result else None
+
+
+def _cached_first_run_response(query, location, timezone=None):
+    """Return the cached First Run response for a query and location with past showtimes pruned, or None"""
+    cached_result = RESULT_CACHE['first_run'].get(first_run_key(query, location))
+    pruned_result = prune_past_showtimes(cached_result, timezone) if cached_result else None
+    return _reword_cached_response(pruned_result, query) if pruned_result else None
+
+
+def _reword_cached_response(cached_result, query):
+    """Adapt a cached response, possibly stored for a differently worded query, to this query"""
+    if not cached_result.get('movies'):
+        return cached_result
+    return {**cached_result, 'response': ResponseFormatter.format_response(cached_result['movies'], query)}
 
 class MovieCrewOptimizedEnhanced:
     """Enhanced Manager for the movie recommendation crew."""
@@ -206,10 +190,13 @@ class MovieCrewOptimizedEnhanced:
             base_url: Optional custom endpoint URL for the LLM API
             model: Model name to use
             tmdb_api_key: API key for The Movie Database (TMDb)
-            user_location: Optional user location string
-            user_ip: Optional user IP address for geolocation
-            timezone: Optional user timezone string (e.g., 'America/Los_Angeles')
+            user_location: Optional default user location string
+            user_ip: Optional default user IP address for geolocation
+            timezone: Optional default user timezone string (e.g., 'America/Los_Angeles')
             llm_provider: Optional LLM provider name to use with the model (e.g., 'openai')
+
+        A single instance can serve many requests concurrently; per-request context
+        (location, IP, timezone) is passed to process_query rather than stored here.
         """
         self.api_key = api_key
         self.base_url = base_url
@@ -221,25 +208,19 @@ class MovieCrewOptimizedEnhanced:
         self.llm_provider = llm_provider
         self.llm_instance = None
 
-        # Create thread pool executor
-        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=10)
+        # Use the shared, bounded pipeline executor
+        self.executor = get_executor('pipeline')
 
         # Configure TMDb API if key is provided
         if tmdb_api_key:
             tmdb.API_KEY = tmdb_api_key
+            install_tmdb_session()
 
         # Get config values with better defaults
         self.timeout_seconds = getattr(settings, 'API_REQUEST_TIMEOUT', 180)
         self.max_retries = getattr(settings, 'API_MAX_RETRIES', 5)
         self.backoff_factor = getattr(settings, 'API_RETRY_BACKOFF_FACTOR', 1.3)
-
-        # Create asyncio event loop for async operations
-        self.loop = None
-
-    def __del__(self):
-        """Clean up resources when object is destroyed"""
-        if self.executor:
-            self.executor.shutdown(wait=False)
+        self.crew_timeout = getattr(settings, 'CREW_EXECUTION_TIMEOUT', 180)
 
     @LoggingMiddleware.log_method_call
     def create_llm(self, temperature: float = 0.7) -> ChatOpenAI:
@@ -395,15 +376,71 @@ class MovieCrewOptimizedEnhanced:
             logger.error(traceback.format_exc())
             raise
 
-    def process_query(self, query: str, conversation_history: List[Dict[str, str]], first_run_mode: bool = True) -> Dict[str, Any]:
+    def cached_response(self, query: str, conversation_history: List[Dict[str, str]],
+                        first_run_mode: bool = False, user_location: Optional[str] = None,
+                        user_ip: Optional[str] = None, timezone: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return the cached response for a query, or None (First Run results are cached per location)"""
+        location = location_bucket(user_location or self.user_location, user_ip or self.user_ip)
+        return cached_response(query, conversation_history, first_run_mode, location, timezone or self.timezone)
+
+    def process_query(
+        self,
+        query: str,
+        conversation_history: List[Dict[str, str]],
+        first_run_mode: bool = True,
+        user_location: Optional[str] = None,
+        user_ip: Optional[str] = None,
+        timezone: Optional[str] = None,
+        progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Process a user query and return movie recommendations.
+        Synchronous entry point for worker threads; runs aprocess_query on a fresh event loop.
+
+        Args:
+            query: The user's query
+            conversation_history: List of previous messages in the conversation
+            first_run_mode: Whether to operate in first run mode (with theaters)
+            user_location: Optional user location, defaults to the instance value
+            user_ip: Optional user IP address, defaults to the instance value
+            timezone: Optional timezone string, defaults to the instance value
+            progress_callback: Optional callable(event, data) notified when the crew starts and as each task finishes
+
+        Returns:
+            Dict with response text and movie recommendations
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.aprocess_query(
+                query, conversation_history, first_run_mode, user_location, user_ip, timezone, progress_callback
+            ))
+        raise RuntimeError("process_query cannot be called from a running event loop, use aprocess_query instead")
+
+    async def aprocess_query(
+        self,
+        query: str,
+        conversation_history: List[Dict[str, str]],
+        first_run_mode: bool = True,
+        user_location: Optional[str] = None,
+        user_ip: Optional[str] = None,
+        timezone: Optional[str] = None,
+        progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
         """
         Process a user query and return movie recommendations.
         Enhanced with better caching, parallel processing, and error handling.
+        Blocking crew and tool work is offloaded to the shared pipeline executor,
+        so this can be awaited directly from an ASGI event loop.
 
         Args:
             query: The user's query
             conversation_history: List of previous messages in the conversation
             first_run_mode: Whether to operate in first run mode (with theaters)
+            user_location: Optional user location, defaults to the instance value
+            user_ip: Optional user IP address, defaults to the instance value
+            timezone: Optional timezone string, defaults to the instance value
+            progress_callback: Optional callable(event, data) notified when the crew starts and as each task finishes
 
         Returns:
             Dict with response text and movie recommendations
@@ -412,13 +449,14 @@ class MovieCrewOptimizedEnhanced:
         query_key = query_hash(query, conversation_history)
         logger.info(f"Processing query with hash {query_key} (first_run_mode={first_run_mode})")
 
-        # Check cache first for identical queries (with context)
-        # Only use cache in casual mode as theaters/showtimes could change
-        if not first_run_mode:
-            cached_result = RESULT_CACHE['recommendations'].get(query_key)
-            if cached_result:
-                logger.info(f"Using cached recommendation for query: {query}")
-                return cached_result
+        # Check cache first for queries with the same intent
+        # First Run results are cached per location, with showtimes that have started pruned
+        cached_result = self.cached_response(
+            query, conversation_history, first_run_mode, user_location, user_ip, timezone
+        )
+        if cached_result:
+            logger.info(f"Using cached recommendation for query: {query}")
+            return cached_result
 
         try:
             # Create or get LLM from cache with error handling
@@ -426,17 +464,15 @@ class MovieCrewOptimizedEnhanced:
                 self.llm_instance = self.create_llm()
             llm = self.llm_instance
 
-            # Create the event loop if needed
-            if self.loop is None:
-                try:
-                    self.loop = asyncio.get_event_loop()
-                except RuntimeError:
-                    self.loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(self.loop)
-
-            # Use asyncio to run the crew workflow
-            result = self.loop.run_until_complete(
-                self._process_query_async(query, conversation_history, first_run_mode, llm)
+            # Per-request context, falling back to the instance defaults
+            context = {
+                'user_location': user_location or self.user_location,
+                'user_ip': user_ip or self.user_ip,
+                'timezone': timezone or self.timezone
+            }
+
+            result = await self._process_query_async(
+                query, conversation_history, first_run_mode, llm, context, progress_callback
             )
 
             # Log performance metrics
@@ -455,7 +491,9 @@ class MovieCrewOptimizedEnhanced:
                 "movies": []
             }
 
-    async def _process_query_async(self, query: str, conversation_history: List[Dict[str, str]], first_run_mode: bool, llm) -> Dict[str, Any]:
+    async def _process_query_async(self, query: str, conversation_history: List[Dict[str, str]], first_run_mode: bool, llm,
+                                   context: Optional[Dict[str, Any]] = None,
+                                   progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
         """
         Process a query asynchronously with better parallelization.
 
@@ -464,85 +502,76 @@ class MovieCrewOptimizedEnhanced:
             conversation_history: List of previous messages in the conversation
             first_run_mode: Whether to operate in first run mode (with theaters)
             llm: LLM instance to use
+            context: Per-request user_location, user_ip and timezone
+            progress_callback: Optional callable(event, data) notified as the crew progresses
 
         Returns:
             Dict with response text and movie recommendations
         """
         logger.info(f"Processing query async: {query[:50]}...")
+        loop = asyncio.get_running_loop()
+        context = context or {}
+        # Filled in by the recommendation task callback when recommendations are published early
+        run_state = {'location': location_bucket(context.get('user_location'), context.get('user_ip'))}
+        # Cancelled on timeout so the abandoned kickoff stops at its next agent step or tool call
+        cancel_token = CancellationToken()
 
         try:
-            # Create tools and agents
-            search_tool, analyze_tool, theater_finder_tool = self._create_tools(first_run_mode)
-            movie_finder, recommender, theater_finder = self._create_agents(
-                llm, search_tool, analyze_tool, theater_finder_tool
-            )
-
-            # Create tasks
-            tasks = self._create_tasks(movie_finder, recommender, theater_finder, query)
-
-            # Create crew
-            crew = self._create_crew(
-                movie_finder, recommender, theater_finder,
-                tasks, first_run_mode
-            )
-
-            # Execute crew with better timeout handling
-            # We'll use the executor to run this with a timeout
-            crew_task = self.loop.run_in_executor(
+            # Build tools, agents, tasks and crew off the event loop
+            tasks, crew = await loop.run_in_executor(
                 self.executor,
-                self._execute_crew_with_timeout,
-                crew,
-                180  # 3 minutes timeout
+                self._build_crew,
+                query,
+                first_run_mode,
+                llm,
+                context,
+                progress_callback,
+                run_state,
+                cancel_token
             )
 
-            # Wait for crew execution
-            await crew_task
+            # Execute crew on the shared pipeline executor with a timeout
+            if progress_callback:
+                progress_callback('crew_started', {'tasks': len([task for task in tasks if task is not None])})
+            await self._execute_crew_with_timeout(crew, self.crew_timeout, cancel_token)
 
-            # Process recommendations in parallel
-            recommendations_task = self.loop.run_in_executor(
-                self.executor,
-                self._process_recommendations,
-                tasks[1]  # recommend_movies_task
-            )
-
-            # Process theaters in parallel if in first run mode
-            theaters_task = None
-            if first_run_mode:
-                theaters_task = self.loop.run_in_executor(
+            # Process recommendations, unless they were already processed when published
+            recommendations = run_state.get('recommendations')
+            if recommendations is None:
+                recommendations = await loop.run_in_executor(
                     self.executor,
-                    self._process_theaters,
-                    tasks[2],  # find_theaters_task
-                    []  # Empty recommendations until we get the result
+                    self._process_recommendations,
+                    tasks[1]  # recommend_movies_task
                 )
 
-            # Wait for recommendations
-            recommendations = await recommendations_task
-
-            # Now process theaters if needed
+            # Process theaters with the parsed recommendations if in first run mode
             theaters_data = []
-            if first_run_mode and theaters_task:
-                # Update theaters task with the recommendations
-                theaters_task = self.loop.run_in_executor(
+            if first_run_mode:
+                theaters_data = await loop.run_in_executor(
                     self.executor,
                     self._process_theaters,
                     tasks[2],  # find_theaters_task
-                    recommendations
+                    recommendations,
+                    run_state['location']
                 )
-                theaters_data = await theaters_task
 
             # Enhance and prepare final results
-            enhanced_recommendations = await self.loop.run_in_executor(
-                self.executor,
-                self._enhance_recommendations,
-                recommendations
-            )
+            if 'recommendations' in run_state:
+                enhanced_recommendations = recommendations
+            else:
+                enhanced_recommendations = await loop.run_in_executor(
+                    self.executor,
+                    self._enhance_recommendations,
+                    recommendations
+                )
 
-            movies_with_theaters = await self.loop.run_in_executor(
+            movies_with_theaters = await loop.run_in_executor(
                 self.executor,
                 self._prepare_final_movies,
                 enhanced_recommendations,
                 theaters_data,
-                first_run_mode
+                first_run_mode,
+                run_state['location']
             )
 
             # Generate response
@@ -559,10 +588,13 @@ class MovieCrewOptimizedEnhanced:
                     "movies": movies_with_theaters
                 }
 
-            # Cache result for casual mode
-            query_key = query_hash(query, conversation_history)
-            if not first_run_mode:
-                RESULT_CACHE['recommendations'].set(query_key, response)
+            # Cache the result; First Run results only until their earliest showtime starts
+            if first_run_mode:
+                ttl = first_run_ttl(response, context.get('timezone'))
+                if ttl:
+                    RESULT_CACHE['first_run'].set(first_run_key(query, run_state['location']), response, ttl)
+            else:
+                RESULT_CACHE['recommendations'].set(query_hash(query, conversation_history), response)
 
             return response
 
@@ -581,25 +613,105 @@ class MovieCrewOptimizedEnhanced:
                 "movies": []
             }
 
-    def _execute_crew_with_timeout(self, crew, timeout_seconds):
-        """Execute crew with timeout and better error handling"""
+    def _build_crew(self, query, first_run_mode, llm, context, progress_callback=None, run_state=None,
+                    cancel_token=None):
+        """Create the tools, agents, tasks and crew for a query"""
+        # In First Run mode, publish recommendations and each movie's theaters as soon as they are known
+        publish_early = first_run_mode and progress_callback is not None and run_state is not None
+        on_theaters = None
+        if publish_early:
+            def on_theaters(movie_id, movie_title, theaters):
+                progress_callback('theaters_found', {
+                    'tmdb_id': movie_id,
+                    'title': movie_title,
+                    'theaters': theaters
+                })
+
+        search_tool, analyze_tool, theater_finder_tool = self._create_tools(
+            first_run_mode,
+            user_location=context.get('user_location'),
+            user_ip=context.get('user_ip'),
+            timezone=context.get('timezone'),
+            on_theaters=on_theaters,
+            cancel_token=cancel_token
+        )
+        movie_finder, recommender, theater_finder = self._create_agents(
+            llm, search_tool, analyze_tool, theater_finder_tool
+        )
+
+        # Create tasks
+        tasks = self._create_tasks(movie_finder, recommender, theater_finder, query)
+        if publish_early:
+            tasks[1].callback = lambda output: self._publish_recommendations(
+                tasks[1], progress_callback, run_state
+            )
+
+        # Create crew
+        crew = self._create_crew(
+            movie_finder, recommender, theater_finder,
+            tasks, first_run_mode, progress_callback, cancel_token
+        )
+        return tasks, crew
+
+    def _publish_recommendations(self, recommend_task, progress_callback, run_state):
+        """
+        Publish recommendations as soon as the recommendation task finishes,
+        before the theater search starts.
+
+        Movies that will get theaters from the theater search are published
+        without a 'theaters' key; the rest carry their final (possibly empty) list.
+        """
+        try:
+            recommendations = self._enhance_recommendations(self._process_recommendations(recommend_task))
+            run_state['recommendations'] = recommendations
+
+            movies = self._prepare_final_movies(
+                copy.deepcopy(recommendations), [], first_run_mode=True, location=run_state.get('location')
+            )
+            for movie in movies:
+                if movie.get('is_current_release') and not movie.get('theaters'):
+                    movie.pop('theaters', None)
+
+            progress_callback('recommendations_ready', {'movies': movies})
+        except Exception as e:
+            # The recommendations are still returned with the final result
+            logger.error(f"Error publishing recommendations early: {str(e)}")
+            logger.error(traceback.format_exc())
+
+    async def _execute_crew_with_timeout(self, crew, timeout_seconds, cancel_token=None):
+        """
+        Execute crew on the pipeline executor with timeout and better error handling.
+
+        On timeout (or if the caller is cancelled) the cancel token is cancelled, so the
+        kickoff thread stops at its next checkpoint instead of running to completion.
+        """
         try:
-            # Create a future to allow timeout
-            future = concurrent.futures.ThreadPoolExecutor().submit(crew.kickoff)
-            return future.result(timeout=timeout_seconds)
-        except concurrent.futures.TimeoutError:
+            loop = asyncio.get_running_loop()
+            return await asyncio.wait_for(
+                loop.run_in_executor(self.executor, crew.kickoff),
+                timeout=timeout_seconds
+            )
+        except asyncio.TimeoutError:
             logger.error(f"Crew execution timed out after {timeout_seconds} seconds")
-            raise asyncio.TimeoutError(f"Crew execution timed out after {timeout_seconds} seconds")
+            if cancel_token is not None:
+                cancel_token.cancel(f"timed out after {timeout_seconds} seconds")
+            raise
+        except asyncio.CancelledError:
+            if cancel_token is not None:
+                cancel_token.cancel("caller cancelled")
+            raise
         except Exception as e:
             logger.error(f"Error executing crew: {str(e)}")
             logger.error(traceback.format_exc())
             raise
 
-    def _create_tools(self, first_run_mode):
+    def _create_tools(self, first_run_mode, user_location=None, user_ip=None, timezone=None, on_theaters=None,
+                      cancel_token=None):
         """Create and configure tools with optimized settings"""
         # Create search tool with mode setting
         search_tool = SearchMoviesTool()
         search_tool.first_run_mode = first_run_mode
+        search_tool.cancel_token = cancel_token
 
         # Create analyze tool
         analyze_tool = AnalyzePreferencesTool()
@@ -607,9 +719,11 @@ class MovieCrewOptimizedEnhanced:
         # Create enhanced theater finder tool only in First Run mode
         if first_run_mode:
             # Only create and configure theater tool when needed
-            theater_finder_tool = FindTheatersToolOptimized(user_location=self.user_location or "Unknown")
-            theater_finder_tool.user_ip = self.user_ip
-            theater_finder_tool.timezone = self.timezone
+            theater_finder_tool = FindTheatersToolOptimized(user_location=user_location or "Unknown")
+            theater_finder_tool.user_ip = user_ip
+            theater_finder_tool.timezone = timezone
+            theater_finder_tool.on_theaters = on_theaters
+            theater_finder_tool.cancel_token = cancel_token
 
             # Ensure tool compatibility for all tools
             self._ensure_tool_compatibility([search_tool, analyze_tool, theater_finder_tool])
@@ -641,6 +755,9 @@ class MovieCrewOptimizedEnhanced:
             # This won't be used but prevents None access errors
             theater_finder = None
 
+        # Answer repeated agent prompts from the shared response cache
+        cache_agent_responses(movie_finder, recommender, theater_finder)
+
         return movie_finder, recommender, theater_finder
 
     def _create_tasks(self, movie_finder, recommender, theater_finder, query):
@@ -673,12 +790,16 @@ class MovieCrewOptimizedEnhanced:
             # In Casual Viewing mode, don't create theater task
             return [find_movies_task, recommend_movies_task, None]
 
-    def _create_crew(self, movie_finder, recommender, theater_finder, tasks, first_run_mode):
+    def _create_crew(self, movie_finder, recommender, theater_finder, tasks, first_run_mode, progress_callback=None,
+                     cancel_token=None):
         """Create and configure the crew based on mode"""
         find_movies_task, recommend_movies_task, find_theaters_task = tasks
 
-        # Create custom event listener with optimized logging
-        event_listener = CustomEventListener()
+        # Check for cancellation after every agent step
+        step_callback = cancel_token.step_callback if cancel_token is not None else None
+
+        # Create custom event listener with optimized logging, forwarding task progress
+        event_listener = CustomEventListener(progress_callback=progress_callback)
 
         # Optimize task dependencies for better performance
         find_movies_task.context = []
@@ -693,7 +814,9 @@ class MovieCrewOptimizedEnhanced:
                 agents=[movie_finder, recommender, theater_finder],
                 tasks=[find_movies_task, recommend_movies_task, find_theaters_task],
                 verbose=False,  # Reduce verbosity for improved performance
-                event_listeners=[event_listener]
+                event_listeners=[event_listener],
+                task_callback=event_listener.on_task_output,
+                step_callback=step_callback
             )
         else:
             # For Casual Viewing mode, skip the theater finder
@@ -701,7 +824,9 @@ class MovieCrewOptimizedEnhanced:
                 agents=[movie_finder, recommender],
                 tasks=[find_movies_task, recommend_movies_task],
                 verbose=False,  # Reduce verbosity for improved performance
-                event_listeners=[event_listener]
+                event_listeners=[event_listener],
+                task_callback=event_listener.on_task_output,
+                step_callback=step_callback
             )
 
         return crew
@@ -717,7 +842,7 @@ class MovieCrewOptimizedEnhanced:
             logger.error(f"Error processing recommendations: {str(e)}")
             return []
 
-    def _process_theaters(self, theater_task, recommendations):
+    def _process_theaters(self, theater_task, recommendations, location=None):
         """Process theater data with parallel processing and caching"""
         try:
             # Extract theater output
@@ -728,12 +853,14 @@ class MovieCrewOptimizedEnhanced:
             if not theaters_data and theater_output.startswith('[') and theater_output.endswith(']'):
                 theaters_data = self._repair_json(theater_output)
 
-            # Cache theaters by movie ID for future requests
-            if theaters_data:
+            # Cache theaters by movie ID and location for future requests
+            if theaters_data and location:
+                theaters_by_movie_id = {}
                 for theater in theaters_data:
                     if isinstance(theater, dict) and 'movie_id' in theater:
-                        movie_id = str(theater['movie_id'])
-                        RESULT_CACHE['theaters'].set(movie_id, theater)
+                        theaters_by_movie_id.setdefault(str(theater['movie_id']), []).append(theater)
+                for movie_id, movie_theaters in theaters_by_movie_id.items():
+                    RESULT_CACHE['theaters'].set(f"{movie_id}|{location}", movie_theaters)
 
             return theaters_data if theaters_data else []
         except Exception as e:
@@ -804,7 +931,7 @@ class MovieCrewOptimizedEnhanced:
             logger.error(f"Error enhancing recommendations: {str(e)}")
             return recommendations
 
-    def _prepare_final_movies(self, recommendations, theaters_data, first_run_mode):
+    def _prepare_final_movies(self, recommendations, theaters_data, first_run_mode, location=None):
         """Prepare final movie data with theaters for rendering"""
         # Process current releases
         self._process_current_releases(recommendations)
@@ -825,7 +952,7 @@ class MovieCrewOptimizedEnhanced:
 
         # Combine recommendations with theater data
         movies_with_theaters = self._combine_movies_and_theaters(
-            recommendations_to_use, theaters_data
+            recommendations_to_use, theaters_data, location if first_run_mode else None
         )
 
         return movies_with_theaters
@@ -905,28 +1032,12 @@ class MovieCrewOptimizedEnhanced:
             if not is_current:
                 movie['theaters'] = []
 
-    def _combine_movies_and_theaters(self, recommendations, theaters_data):
+    def _combine_movies_and_theaters(self, recommendations, theaters_data, location=None):
         """Combine movie recommendations with theater data efficiently"""
         # Create lookup dictionaries for faster matching
         theaters_by_movie_id = {}
         theaters_by_movie_title = {}
 
-        # First check cache for any known theaters
-        for movie in recommendations:
-            if not isinstance(movie, dict):
-                continue
-
-            # Check if we have cached theaters for this movie
-            if 'tmdb_id' in movie:
-                movie_id = str(movie['tmdb_id'])
-                cached_theater = RESULT_CACHE['theaters'].get(movie_id)
-                if cached_theater:
-                    # Use cached theaters
-                    if not 'theaters' in movie:
-                        movie['theaters'] = []
-                    movie['theaters'].append(cached_theater)
-                    logger.info(f"Using cached theater for movie {movie.get('title')}")
-
         # Process theaters from this request
         for theater in theaters_data:
             if not isinstance(theater, dict):
@@ -991,6 +1102,12 @@ class MovieCrewOptimizedEnhanced:
                     for theater in movie_theaters:
                         theater["movie_id"] = movie_tmdb_id
 
+            # Fall back to theaters cached for this movie and location by an earlier request
+            if not movie_theaters and movie_tmdb_id and location:
+                movie_theaters = RESULT_CACHE['theaters'].get(f"{movie_tmdb_id}|{location}", [])
+                if movie_theaters:
+                    logger.info(f"Using cached theaters for movie {movie_title}")
+
             # Add theaters to the movie
             movie_with_theaters = {**movie, "theaters": movie_theaters}
             movies_with_theaters.append(movie_with_theaters)
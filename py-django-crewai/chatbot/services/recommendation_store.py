@@ -0,0 +1,269 @@
+"""
+Recommendation Store
+Persists crew pipeline output (bot message, recommendations, theaters and showtimes)
+and builds the response payload returned to polling clients.
+"""
+
+import logging
+from datetime import datetime
+
+import pytz
+from django.utils import timezone
+
+from ..models import Message, MovieRecommendation, Theater, Showtime
+
+# Get the logger
+logger = logging.getLogger('chatbot')
+
+DEFAULT_BOT_RESPONSE = 'Sorry, I could not generate a response.'
+
+
+def _parse_release_date(release_date_str):
+    """Convert a YYYY-MM-DD release date string into a date object."""
+    if not release_date_str:
+        return None
+    try:
+        return datetime.strptime(release_date_str, '%Y-%m-%d').date()
+    except ValueError:
+        logger.warning(f"Invalid release date format: {release_date_str}")
+        return None
+
+
+def _parse_showtime(time_str, user_timezone):
+    """
+    Parse a showtime into a timezone-aware datetime.
+
+    Accepts ISO timestamps as well as bare times like "8:00 PM", which are
+    assumed to be today in the user's timezone.
+
+    Raises:
+        ValueError: If the time cannot be parsed
+    """
+    if isinstance(time_str, str) and (":" in time_str and ("AM" in time_str.upper() or "PM" in time_str.upper())):
+        time_obj = datetime.strptime(time_str, "%I:%M %p").time()
+        start_time = pytz.timezone(user_timezone).localize(datetime.combine(datetime.now().date(), time_obj))
+        logger.info(f"Converted time format '{time_str}' to ISO format")
+        return start_time
+
+    try:
+        start_time = datetime.fromisoformat(time_str)
+        if start_time.tzinfo is None:
+            start_time = timezone.make_aware(start_time)
+        return start_time
+    except ValueError:
+        # If ISO parsing fails, try the common non-ISO formats before giving up
+        logger.warning(f"Trying alternative parsing for: {time_str}")
+
+    for fmt in ["%I:%M %p", "%I:%M%p", "%H:%M"]:
+        try:
+            time_obj = datetime.strptime(time_str, fmt).time()
+            start_time = pytz.timezone(user_timezone).localize(datetime.combine(datetime.now().date(), time_obj))
+            logger.info(f"Parsed time with format {fmt}: {time_str}")
+            return start_time
+        except ValueError:
+            continue
+
+    raise ValueError(f"Could not parse time: {time_str}")
+
+
+def serialize_recommendation(movie, theaters_data=None):
+    """
+    Serialize a MovieRecommendation for API responses.
+
+    Movies whose theater search is still running are serialized without a
+    `theaters` key, which tells the client to fetch them from theater_status.
+    """
+    data = {
+        'id': movie.id,
+        'title': movie.title,
+        'overview': movie.overview,
+        'poster_url': movie.poster_url,
+        'release_date': movie.release_date.isoformat() if movie.release_date and hasattr(movie.release_date, 'isoformat') else movie.release_date,
+        'rating': float(movie.rating) if movie.rating else None
+    }
+    if movie.theaters_ready or theaters_data:
+        data['theaters'] = theaters_data or []
+    return data
+
+
+def serialize_saved_theaters(movie):
+    """Serialize the saved showtimes of a movie grouped by theater, nearest first."""
+    theater_map = {}
+    for showtime in movie.showtimes.select_related('theater'):
+        theater = showtime.theater
+        if theater.name not in theater_map:
+            theater_map[theater.name] = {
+                'name': theater.name,
+                'address': theater.address,
+                'distance_miles': float(theater.distance_miles) if theater.distance_miles else None,
+                'showtimes': []
+            }
+        theater_map[theater.name]['showtimes'].append({
+            'start_time': showtime.start_time.isoformat(),
+            'format': showtime.format
+        })
+
+    return sorted(
+        theater_map.values(),
+        key=lambda theater: theater['distance_miles'] if theater['distance_miles'] is not None else float('inf')
+    )
+
+
+def movie_keys(movie_data):
+    """Keys used to match a movie across pipeline stages: its TMDb ID when known, and its title."""
+    keys = []
+    tmdb_id = movie_data.get('tmdb_id')
+    if tmdb_id:
+        keys.append(f"tmdb:{tmdb_id}")
+    title = (movie_data.get('title') or '').strip().lower()
+    if title:
+        keys.append(f"title:{title}")
+    return keys
+
+
+def find_recommendation(movies_by_key, movie_data):
+    """Find the recommendation matching movie_data in an index built with movie_keys."""
+    for key in movie_keys(movie_data):
+        if key in movies_by_key:
+            return movies_by_key[key]
+    return None
+
+
+def save_recommendation(conversation, movie_data, job=None, theaters_ready=True):
+    """
+    Persist a single recommended movie.
+
+    Args:
+        conversation: Conversation the recommendation belongs to
+        movie_data: Movie dict produced by the crew pipeline
+        job: Optional CrewJob that produced the recommendation
+        theaters_ready: False if showtimes for the movie are still being searched
+
+    Returns:
+        The created MovieRecommendation
+    """
+    return MovieRecommendation.objects.create(
+        conversation=conversation,
+        job=job,
+        title=movie_data.get('title', 'Unknown Movie'),
+        overview=movie_data.get('overview', ''),
+        poster_url=movie_data.get('poster_url', ''),
+        release_date=_parse_release_date(movie_data.get('release_date')),
+        tmdb_id=movie_data.get('tmdb_id'),
+        rating=movie_data.get('rating'),
+        theaters_ready=theaters_ready
+    )
+
+
+def save_theaters(movie, theaters, user_timezone='America/Los_Angeles'):
+    """
+    Persist theaters and showtimes for a recommended movie.
+
+    Args:
+        movie: MovieRecommendation the showtimes belong to
+        theaters: List of theater dicts produced by the crew pipeline
+        user_timezone: Timezone used to interpret bare showtimes
+
+    Returns:
+        List of serialized theaters with their saved showtimes
+    """
+    theaters_data = []
+    for theater_data in theaters or []:
+        theater, _ = Theater.objects.get_or_create(
+            name=theater_data.get('name', 'Unknown Theater'),
+            defaults={
+                'address': theater_data.get('address', ''),
+                'latitude': theater_data.get('latitude'),
+                'longitude': theater_data.get('longitude'),
+                'distance_miles': theater_data.get('distance_miles')
+            }
+        )
+
+        showtimes_data = []
+        for showtime_data in theater_data.get('showtimes', []):
+            time_str = showtime_data.get('start_time')
+            try:
+                start_time = _parse_showtime(time_str, user_timezone)
+            except (ValueError, TypeError) as e:
+                # Skip this showtime but keep processing the others
+                logger.warning(f"Invalid datetime format in showtime: {time_str} - {str(e)}")
+                continue
+
+            showtime = Showtime.objects.create(
+                movie=movie,
+                theater=theater,
+                start_time=start_time,
+                format=showtime_data.get('format', 'Standard')
+            )
+            showtimes_data.append({
+                'start_time': showtime.start_time.isoformat(),
+                'format': showtime.format
+            })
+
+        theaters_data.append({
+            'name': theater.name,
+            'address': theater.address,
+            'distance_miles': float(theater.distance_miles) if theater.distance_miles else None,
+            'showtimes': showtimes_data
+        })
+
+    return theaters_data
+
+
+def save_pipeline_result(conversation, response_data, first_run_mode, user_timezone='America/Los_Angeles', job=None):
+    """
+    Persist the output of a crew run and build the poll response payload.
+
+    Recommendations the job already published before the crew finished are
+    updated in place, keeping their IDs and any showtimes saved for them.
+
+    Args:
+        conversation: Conversation the query belongs to
+        response_data: Dict returned by MovieCrewService.process_query
+        first_run_mode: Whether theaters and showtimes should be saved
+        user_timezone: Timezone used to interpret bare showtimes
+        job: Optional CrewJob whose early recommendations should be reused
+
+    Returns:
+        Dict with status, bot message and serialized recommendations
+    """
+    bot_response = response_data.get('response', DEFAULT_BOT_RESPONSE)
+    Message.objects.create(
+        conversation=conversation,
+        sender='bot',
+        content=bot_response
+    )
+
+    published = {}
+    if job is not None:
+        for movie in job.recommendations.all():
+            for key in movie_keys({'tmdb_id': movie.tmdb_id, 'title': movie.title}):
+                published[key] = movie
+
+    recommendations_data = []
+    for movie_data in response_data.get('movies', []):
+        movie = find_recommendation(published, movie_data)
+        if movie is None:
+            movie = save_recommendation(conversation, movie_data, job=job)
+        else:
+            # Keep the published ID, but pick up anything enhanced since (e.g. posters)
+            movie.poster_url = movie_data.get('poster_url') or movie.poster_url
+            movie.theaters_ready = True
+            movie.save(update_fields=['poster_url', 'theaters_ready'])
+
+            if movie.showtimes.exists():
+                # Showtimes were saved as they arrived from the theater search
+                recommendations_data.append(serialize_recommendation(movie, serialize_saved_theaters(movie)))
+                continue
+
+        theaters_data = []
+        if first_run_mode and movie_data.get('theaters'):
+            theaters_data = save_theaters(movie, movie_data['theaters'], user_timezone)
+
+        recommendations_data.append(serialize_recommendation(movie, theaters_data))
+
+    return {
+        'status': 'success',
+        'message': bot_response,
+        'recommendations': recommendations_data
+    }
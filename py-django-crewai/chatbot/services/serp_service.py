@@ -6,7 +6,7 @@ This module provides integration with SerpAPI for fetching real movie showtimes.
 import logging
 import json
 import functools
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from serpapi import GoogleSearch
 from datetime import datetime, timedelta
 import zoneinfo
@@ -16,6 +16,12 @@ from .api_utils import APIRequestHandler
 # Configure logger
 logger = logging.getLogger('chatbot.serp_service')
 
+# SerpAPI error returned when Google has no results for a query, as opposed to a failed request
+NO_RESULTS_ERROR = "hasn't returned any results"
+
+# Query for the showtimes listing of every theater in a location
+LOCATION_SHOWTIMES_QUERY = "movie showtimes"
+
 class SerpShowtimeService:
     """Service for fetching movie showtimes using SerpAPI."""
 
@@ -124,6 +130,24 @@ class SerpShowtimeService:
         Returns:
             List of theater dictionaries with showtimes
         """
+        theaters, _ = self.fetch_showtimes(movie_title, location, radius_miles, timezone)
+        return theaters
+
+    def fetch_showtimes(self, movie_title: str, location: str, radius_miles: int = 25,
+                        timezone: str = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """Search for movie showtimes, telling known-empty results apart from failures.
+
+        Args:
+            movie_title: Title of the movie to search showtimes for
+            location: Location to search showtimes in (city name or zip code)
+            radius_miles: Search radius in miles (default: 25)
+            timezone: User's timezone string (e.g., 'America/Los_Angeles')
+
+        Returns:
+            Tuple of the theaters with showtimes and whether the result is definitive.
+            An empty definitive result means SerpAPI answered and has no showtimes;
+            an empty non-definitive result is an error worth retrying.
+        """
         # Store timezone for use in processing
         self.user_timezone = timezone
         # Add performance measurement
@@ -164,17 +188,117 @@ class SerpShowtimeService:
                 logger.error(f"SerpAPI returned error: {error_message}")
                 sanitized_params = self._sanitize_params(params, sensitive_keys=['api_key', 'location'])
                 logger.error("Request parameters contain sensitive data and have been redacted.")
-                return []
+                return [], NO_RESULTS_ERROR in error_message
 
             # Process and format the results
             theaters = self._parse_serp_results(results, movie_title)
 
             logger.info(f"Found {len(theaters)} theaters with showtimes for '{movie_title}' in {location}")
-            return theaters
+            return theaters, True
 
         except Exception as e:
             logger.error(f"Error searching showtimes: {str(e)}")
-            return []
+            return [], False
+
+    def fetch_location_showtimes(self, location: str, radius_miles: int = 25,
+                                 timezone: str = None) -> Tuple[Dict[str, List[Dict[str, Any]]], bool]:
+        """Fetch the showtimes listing for every theater in a location with one search.
+
+        Args:
+            location: Location to search showtimes in (city name or zip code)
+            radius_miles: Search radius in miles (default: 25)
+            timezone: User's timezone string (e.g., 'America/Los_Angeles')
+
+        Returns:
+            Tuple of the theaters with showtimes for each movie, keyed by normalized
+            title (see showtimes_for_movie), and whether the result is definitive
+        """
+        # Store timezone for use in processing
+        self.user_timezone = timezone
+        try:
+            logger.info(f"Searching showtimes for all movies in {location}")
+
+            params = {
+                "q": LOCATION_SHOWTIMES_QUERY,
+                "location": location,
+                "hl": "en",
+                "gl": "us",
+                "api_key": self.api_key
+            }
+
+            search = GoogleSearch(params)
+
+            # Execute the search with retry mechanism
+            results = APIRequestHandler.make_request(
+                lambda *args, **kwargs: search.get_dict()
+            )
+
+            if 'error' in results:
+                error_message = results.get('error', 'Unknown error')
+                logger.error(f"SerpAPI returned error: {error_message}")
+                return {}, NO_RESULTS_ERROR in error_message
+
+            showtimes_by_title = self._parse_location_results(results)
+            logger.info(f"Found showtimes for {len(showtimes_by_title)} movies in {location}")
+            return showtimes_by_title, True
+
+        except Exception as e:
+            logger.error(f"Error searching location showtimes: {str(e)}")
+            return {}, False
+
+    def showtimes_for_movie(self, showtimes_by_title: Dict[str, List[Dict[str, Any]]],
+                            movie_title: str) -> List[Dict[str, Any]]:
+        """Pick one movie's theaters out of a fetch_location_showtimes result."""
+        return showtimes_by_title.get(self._normalize_title(movie_title), [])
+
+    def _parse_location_results(self, results: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """Parse a location-wide showtimes listing, where each theater lists its movies.
+
+        Args:
+            results: SerpAPI results dictionary
+
+        Returns:
+            Theaters with showtimes for each movie, keyed by normalized title
+        """
+        from django.conf import settings
+        max_radius_miles = getattr(settings, 'THEATER_SEARCH_RADIUS_MILES', 15)
+
+        # Normalized title -> theater name -> theater with showtimes
+        theater_maps = {}
+        for day_data in results.get('showtimes') or []:
+            day_date = self._extract_date_from_day_string(day_data.get('day', 'Today'))
+
+            for theater_data in day_data.get('theaters', []):
+                if 'movies' not in theater_data:
+                    continue
+
+                theater_name = theater_data.get('name', 'Unknown Theater')
+                distance_miles = self._parse_distance(theater_data.get('distance', ''))
+                if distance_miles is not None and distance_miles > max_radius_miles:
+                    continue
+
+                for movie in theater_data.get('movies', []):
+                    showtimes = self._parse_showing(movie.get('showing', []), day_date, theater_name)
+                    if not showtimes:
+                        continue
+
+                    theater_map = theater_maps.setdefault(self._normalize_title(movie.get('name', '')), {})
+                    if theater_name not in theater_map:
+                        theater_map[theater_name] = {
+                            "name": theater_name,
+                            "address": theater_data.get('address', ''),
+                            "link": theater_data.get('link', ''),
+                            "distance_miles": distance_miles,
+                            "showtimes": []
+                        }
+                    theater_map[theater_name]["showtimes"].extend(showtimes)
+
+        showtimes_by_title = {}
+        for title, theater_map in theater_maps.items():
+            for theater_info in theater_map.values():
+                theater_info["showtimes"].sort(key=lambda x: x["start_time"])
+            showtimes_by_title[title] = list(theater_map.values())
+        return showtimes_by_title
 
     def _parse_serp_results(self, results: Dict[str, Any], movie_title: str) -> List[Dict[str, Any]]:
         """Parse the SerpAPI results and format them for our application.
@@ -262,83 +386,7 @@ class SerpShowtimeService:
                         continue
 
                     # Track showtimes for this theater on this day
-                    theater_showtimes = []
-
-                    # Process each showing entry in the array
-                    for showing in showing_array:
-                        # The 'time' field should be an array of time strings (e.g., ["1:30pm", "4:00pm"])
-                        # FIXED: Better handling of missing 'time' key
-                        if 'time' not in showing:
-                            logger.warning(f"Showing for theater '{theater_name}' has no 'time' key")
-                            continue
-
-                        time_array = showing.get('time', [])
-                        if not time_array:
-                            logger.warning(f"Showing for theater '{theater_name}' has empty time array")
-                            continue
-
-                        logger.info(f"Processing {len(time_array)} showtimes for theater '{theater_name}'")
-
-                        # Process each time string
-                        for time_str in time_array:
-                            try:
-                                # FIXED: Try multiple time formats
-                                time_obj = None
-
-                                # Try various time formats (12-hour clock with am/pm)
-                                time_formats = [
-                                    "%I:%M%p",    # 1:30pm
-                                    "%I:%M %p",   # 1:30 pm
-                                    "%I%p",       # 1pm
-                                    "%I %p"       # 1 pm
-                                ]
-
-                                for time_format in time_formats:
-                                    try:
-                                        # Convert to lowercase for consistent am/pm handling
-                                        time_str_lower = time_str.lower().strip()
-                                        time_obj = datetime.strptime(time_str_lower, time_format)
-                                        break
-                                    except ValueError:
-                                        continue
-
-                                if time_obj is None:
-                                    raise ValueError(f"Could not parse time string: {time_str}")
-
-                                # Combine the date with the time
-                                start_time = datetime.combine(day_date, time_obj.time())
-
-                                # If we have timezone info, make datetime timezone-aware
-                                timezone_info = getattr(self, 'user_timezone', None)
-                                if timezone_info:
-                                    try:
-                                        tz = zoneinfo.ZoneInfo(timezone_info)
-                                        start_time = start_time.replace(tzinfo=tz)
-                                        logger.debug("Applied a timezone to the showtime")
-                                    except Exception as tz_error:
-                                        logger.warning(f"Could not apply timezone: {str(tz_error)}")
-
-                                # Create a standardized showtime object with timezone info
-                                showtime_info = {
-                                    "start_time": start_time.isoformat(),  # Will include TZ info if available
-                                    "timezone": timezone_info,  # Store timezone string for reference
-                                    "format": "Standard"  # Default format since API doesn't provide format info
-                                }
-
-                                # Check for special formats in showing info
-                                format_type = showing.get('type', '').strip()
-                                if format_type:
-                                    # FIXED: Better format detection
-                                    format_type = format_type.upper()
-                                    if 'IMAX' in format_type:
-                                        showtime_info["format"] = "IMAX"
-                                    elif '3D' in format_type:
-                                        showtime_info["format"] = "3D"
-
-                                theater_showtimes.append(showtime_info)
-                                logger.debug(f"Added showtime: {start_time.isoformat()} for '{theater_name}'")
-                            except (ValueError, TypeError) as e:
-                                logger.warning(f"Error parsing time '{time_str}': {str(e)}")
+                    theater_showtimes = self._parse_showing(showing_array, day_date, theater_name)
 
                     # If we found any valid showtimes for this theater
                     if theater_showtimes:
@@ -372,6 +420,97 @@ class SerpShowtimeService:
         logger.info(f"Returning {len(theaters)} theaters with showtimes for '{movie_title}'")
         return theaters
 
+    def _parse_showing(self, showing_array: List[Dict[str, Any]], day_date, theater_name: str) -> List[Dict[str, Any]]:
+        """Parse a SerpAPI 'showing' array into showtime dictionaries for one day.
+
+        Args:
+            showing_array: List of showing objects, each with a 'time' array and an optional 'type'
+            day_date: Date the showings are on
+            theater_name: Name of the theater, for logging
+
+        Returns:
+            List of showtime dictionaries
+        """
+        theater_showtimes = []
+
+        # Process each showing entry in the array
+        for showing in showing_array:
+            # The 'time' field should be an array of time strings (e.g., ["1:30pm", "4:00pm"])
+            # FIXED: Better handling of missing 'time' key
+            if 'time' not in showing:
+                logger.warning(f"Showing for theater '{theater_name}' has no 'time' key")
+                continue
+
+            time_array = showing.get('time', [])
+            if not time_array:
+                logger.warning(f"Showing for theater '{theater_name}' has empty time array")
+                continue
+
+            logger.info(f"Processing {len(time_array)} showtimes for theater '{theater_name}'")
+
+            # Process each time string
+            for time_str in time_array:
+                try:
+                    # FIXED: Try multiple time formats
+                    time_obj = None
+
+                    # Try various time formats (12-hour clock with am/pm)
+                    time_formats = [
+                        "%I:%M%p",    # 1:30pm
+                        "%I:%M %p",   # 1:30 pm
+                        "%I%p",       # 1pm
+                        "%I %p"       # 1 pm
+                    ]
+
+                    for time_format in time_formats:
+                        try:
+                            # Convert to lowercase for consistent am/pm handling
+                            time_str_lower = time_str.lower().strip()
+                            time_obj = datetime.strptime(time_str_lower, time_format)
+                            break
+                        except ValueError:
+                            continue
+
+                    if time_obj is None:
+                        raise ValueError(f"Could not parse time string: {time_str}")
+
+                    # Combine the date with the time
+                    start_time = datetime.combine(day_date, time_obj.time())
+
+                    # If we have timezone info, make datetime timezone-aware
+                    timezone_info = getattr(self, 'user_timezone', None)
+                    if timezone_info:
+                        try:
+                            tz = zoneinfo.ZoneInfo(timezone_info)
+                            start_time = start_time.replace(tzinfo=tz)
+                            logger.debug("Applied a timezone to the showtime")
+                        except Exception as tz_error:
+                            logger.warning(f"Could not apply timezone: {str(tz_error)}")
+
+                    # Create a standardized showtime object with timezone info
+                    showtime_info = {
+                        "start_time": start_time.isoformat(),  # Will include TZ info if available
+                        "timezone": timezone_info,  # Store timezone string for reference
+                        "format": "Standard"  # Default format since API doesn't provide format info
+                    }
+
+                    # Check for special formats in showing info
+                    format_type = showing.get('type', '').strip()
+                    if format_type:
+                        # FIXED: Better format detection
+                        format_type = format_type.upper()
+                        if 'IMAX' in format_type:
+                            showtime_info["format"] = "IMAX"
+                        elif '3D' in format_type:
+                            showtime_info["format"] = "3D"
+
+                    theater_showtimes.append(showtime_info)
+                    logger.debug(f"Added showtime: {start_time.isoformat()} for '{theater_name}'")
+                except (ValueError, TypeError) as e:
+                    logger.warning(f"Error parsing time '{time_str}': {str(e)}")
+
+        return theater_showtimes
+
     def _extract_date_from_day_string(self, day_string: str) -> datetime.date:
         """Extract date from a day string like 'TodayApr 16' or 'FriApr 18'.
 
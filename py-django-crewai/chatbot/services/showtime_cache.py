@@ -0,0 +1,227 @@
+"""
+Showtime Cache
+Keeps SerpAPI showtime results in the shared pipeline cache, keyed by the
+normalized movie title, the canonical location and the user's local date, so a
+popular movie in a popular city costs one SerpAPI search for the whole fleet.
+
+- Entries expire at the user's local midnight, when the day's showtimes are over.
+- An entry is fresh for SHOWTIME_CACHE_FRESH_TTL seconds. After that it is still
+  served immediately, and a background refresh on the 'io' executor replaces it
+  (stale-while-revalidate).
+- A definitive "no showtimes" answer is cached for NEGATIVE_CACHE_TTL seconds, so
+  repeat requests skip the search and its retries. Failed searches are not cached.
+
+lookup_location_showtimes caches a location's whole showtimes listing (every
+movie, keyed by title) the same way, for SERPAPI_SHOWTIME_MODE=location.
+
+prune_past_showtimes and first_run_ttl let the crew managers cache whole First
+Run responses without ever serving a showtime that has already started.
+"""
+
+import logging
+import re
+import threading
+import time
+import zoneinfo
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from .cache_backend import get_cache, location_bucket
+from .executors import get_executor
+
+# Get the logger
+logger = logging.getLogger('chatbot.showtime_cache')
+
+SHOWTIME_CACHE = get_cache('showtimes', 86400)
+
+# Keys with a background refresh in flight in this process
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def _local_now(timezone: Optional[str] = None) -> datetime:
+    try:
+        return datetime.now(zoneinfo.ZoneInfo(timezone or settings.TIME_ZONE))
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        logger.warning(f"Unknown timezone '{timezone}', using {settings.TIME_ZONE}")
+        return datetime.now(zoneinfo.ZoneInfo(settings.TIME_ZONE))
+
+
+def seconds_until_local_midnight(timezone: Optional[str] = None) -> int:
+    """Seconds left in the user's local day."""
+    now = _local_now(timezone)
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=now.tzinfo)
+    return max(int((midnight - now).total_seconds()), 1)
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase a movie title and drop punctuation, so 'Dune: Part Two' and 'dune part two' match."""
+    title = re.sub(r"[^\w\s]", ' ', title.lower())
+    return re.sub(r'\s+', ' ', title).strip()
+
+
+def showtime_key(movie_title: str, location: str, timezone: Optional[str] = None) -> str:
+    """Return the cache key for a movie's showtimes in a location on the user's local date."""
+    local_date = _local_now(timezone).date().isoformat()
+    return f"{normalize_title(movie_title)}|{location_bucket(location)}|{local_date}"
+
+
+def location_showtime_key(location: str, timezone: Optional[str] = None) -> str:
+    """Return the cache key for the showtimes of every movie in a location on the user's local date."""
+    local_date = _local_now(timezone).date().isoformat()
+    return f"*|{location_bucket(location)}|{local_date}"
+
+
+ShowtimeResult = Tuple[List[Dict[str, Any]], bool]
+LocationShowtimeResult = Tuple[Dict[str, List[Dict[str, Any]]], bool]
+
+
+def lookup_showtimes(fetch: Callable[[], ShowtimeResult], movie_title: str, location: str,
+                     timezone: Optional[str] = None) -> ShowtimeResult:
+    """
+    Return a movie's showtimes from the cache, or fetch and cache them.
+
+    Args:
+        fetch: Callable that performs the SerpAPI search and returns its theaters and
+            whether the result is definitive (see SerpShowtimeService.fetch_showtimes)
+        movie_title: Title of the movie
+        location: Location the showtimes are for
+        timezone: User's timezone, which decides the local date and midnight expiry
+
+    Returns:
+        Tuple of the theater dictionaries with showtimes and whether the result is
+        definitive; cached results are always definitive
+    """
+    if not getattr(settings, 'SHOWTIME_CACHE_ENABLED', True):
+        return fetch()
+    return _lookup(showtime_key(movie_title, location, timezone), fetch, f"'{movie_title}' in {location}", timezone)
+
+
+def lookup_location_showtimes(fetch: Callable[[], LocationShowtimeResult], location: str,
+                              timezone: Optional[str] = None) -> LocationShowtimeResult:
+    """
+    Return the showtimes of every movie in a location from the cache, or fetch and cache them.
+
+    Args:
+        fetch: Callable that performs the SerpAPI search and returns the theaters per
+            normalized title and whether the result is definitive (see
+            SerpShowtimeService.fetch_location_showtimes)
+        location: Location the showtimes are for
+        timezone: User's timezone, which decides the local date and midnight expiry
+
+    Returns:
+        Tuple of the theaters per normalized title and whether the result is definitive
+    """
+    if not getattr(settings, 'SHOWTIME_CACHE_ENABLED', True):
+        return fetch()
+    return _lookup(location_showtime_key(location, timezone), fetch, f"all movies in {location}", timezone)
+
+
+def _lookup(key: str, fetch: Callable[[], Tuple[Any, bool]], description: str,
+            timezone: Optional[str]) -> Tuple[Any, bool]:
+    entry = SHOWTIME_CACHE.get(key)
+    if entry is not None:
+        age = time.time() - entry['fetched_at']
+        if not entry['theaters']:
+            logger.info(f"No showtimes for {description} (cached {age:.0f}s ago)")
+        elif age > getattr(settings, 'SHOWTIME_CACHE_FRESH_TTL', 14400):
+            logger.info(f"Serving stale showtimes for {description} ({age:.0f}s old) while refreshing")
+            _refresh_in_background(key, fetch, timezone)
+        else:
+            logger.info(f"Using cached showtimes for {description}")
+        return entry['theaters'], True
+
+    return _fetch_and_store(key, fetch, timezone)
+
+
+def _fetch_and_store(key: str, fetch: Callable[[], Tuple[Any, bool]], timezone: Optional[str]) -> Tuple[Any, bool]:
+    theaters, definitive = fetch()
+    if theaters:
+        SHOWTIME_CACHE.set(key, {'theaters': theaters, 'fetched_at': time.time()},
+                           seconds_until_local_midnight(timezone))
+    elif definitive:
+        ttl = min(getattr(settings, 'NEGATIVE_CACHE_TTL', 900), seconds_until_local_midnight(timezone))
+        SHOWTIME_CACHE.set(key, {'theaters': theaters, 'fetched_at': time.time()}, ttl)
+    return theaters, definitive
+
+
+def _refresh_in_background(key: str, fetch: Callable[[], Tuple[Any, bool]], timezone: Optional[str]):
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def refresh():
+        try:
+            _fetch_and_store(key, fetch, timezone)
+        except Exception as e:
+            logger.error(f"Background showtime refresh failed: {str(e)}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    get_executor('io').submit(refresh)
+
+
+def _showtime_datetime(showtime: Dict[str, Any], timezone: Optional[str]) -> Optional[datetime]:
+    """Parse a showtime's start_time as an aware datetime, reading naive times in the user's timezone."""
+    try:
+        start_time = datetime.fromisoformat(showtime['start_time'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if start_time.tzinfo is None:
+        start_time = start_time.replace(tzinfo=_local_now(timezone).tzinfo)
+    return start_time
+
+
+def prune_past_showtimes(response: Dict[str, Any], timezone: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Drop showtimes that have started from a cached First Run response, and theaters left without showtimes.
+
+    Args:
+        response: Response dict with movies, their theaters and showtimes
+        timezone: User's timezone, used for showtimes stored without one
+
+    Returns:
+        A pruned copy of the response, or None if none of its showtimes are still upcoming
+    """
+    now = _local_now(timezone)
+    upcoming_count = 0
+    movies = []
+    for movie in response.get('movies', []):
+        theaters = []
+        for theater in movie.get('theaters') or []:
+            showtimes = [showtime for showtime in theater.get('showtimes', [])
+                         if (_showtime_datetime(showtime, timezone) or now) >= now]
+            if showtimes:
+                theaters.append({**theater, 'showtimes': showtimes})
+                upcoming_count += len(showtimes)
+        movies.append({**movie, 'theaters': theaters})
+    if not upcoming_count:
+        return None
+    return {**response, 'movies': movies}
+
+
+def first_run_ttl(response: Dict[str, Any], timezone: Optional[str] = None) -> int:
+    """
+    Seconds a First Run response can be cached: until its earliest upcoming showtime
+    starts, at most FIRST_RUN_CACHE_TTL and never past local midnight.
+
+    Returns:
+        TTL in seconds, or 0 if the response has no upcoming showtimes and should not be cached
+    """
+    now = _local_now(timezone)
+    upcoming = []
+    for movie in response.get('movies', []):
+        for theater in movie.get('theaters') or []:
+            for showtime in theater.get('showtimes', []):
+                start_time = _showtime_datetime(showtime, timezone)
+                if start_time is not None and start_time > now:
+                    upcoming.append(start_time)
+    if not upcoming:
+        return 0
+    until_showtime = int((min(upcoming) - now).total_seconds())
+    return max(min(until_showtime, getattr(settings, 'FIRST_RUN_CACHE_TTL', 1800),
+                   seconds_until_local_midnight(timezone)), 0)
@@ -0,0 +1,114 @@
+"""
+Single-flight deduplication for crew executions.
+Concurrent callers that submit the same query (same mode and location bucket)
+attach to the execution already in flight and share its result instead of
+each running a full crew.
+"""
+
+import concurrent.futures
+import copy
+import logging
+import threading
+
+from .cache_backend import location_bucket
+from .movie_crew_optimized_enhanced import query_hash
+
+# Get the logger
+logger = logging.getLogger('chatbot.single_flight')
+
+
+def flight_key(query, conversation_history, first_run_mode, user_location=None, user_ip=None):
+    """
+    Build the key that identifies identical crew executions.
+
+    Casual recommendations do not depend on the user's location, so all casual
+    queries share one bucket.
+    """
+    if first_run_mode:
+        return f"first_run:{location_bucket(user_location, user_ip)}:{query_hash(query, conversation_history, True)}"
+    return f"casual:{query_hash(query, conversation_history)}"
+
+
+class _Call:
+    """An execution in flight and the callers waiting on it."""
+
+    def __init__(self):
+        # A concurrent Future can be waited on from threads and awaited from event loops
+        self.future = concurrent.futures.Future()
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapse concurrent calls that share a key into a single execution."""
+
+    def __init__(self, name):
+        """
+        Initialize the single-flight group
+
+        Args:
+            name: Name used in logs and stats
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._executions = 0
+        self._shared = 0
+
+    def _join(self, key):
+        """Register the caller, returning the call and whether it should execute."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self._executions += 1
+                return call, True
+            call.waiters += 1
+            self._shared += 1
+        logger.info(f"[{self.name}] Attaching to in-flight execution for {key}")
+        return call, False
+
+    def _finish(self, key, call, result=None, error=None):
+        """Release the key and hand the outcome to waiting callers."""
+        with self._lock:
+            self._calls.pop(key, None)
+        if call.waiters:
+            logger.info(f"[{self.name}] Shared execution for {key} with {call.waiters} waiting caller(s)")
+        if error is not None:
+            call.future.set_exception(error)
+        else:
+            call.future.set_result(result)
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run fn for key, or wait for the execution already in flight for key.
+
+        Every caller receives its own copy of the result so callers can mutate it freely.
+
+        Returns:
+            Tuple of (result, shared) where shared is True if another caller ran fn
+        """
+        call, leader = self._join(key)
+        if not leader:
+            return copy.deepcopy(call.future.result()), True
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, call, error=e if isinstance(e, Exception) else RuntimeError('Execution was interrupted'))
+            raise
+        self._finish(key, call, result=result)
+        return copy.deepcopy(result), False
+
+    def stats(self):
+        """Return counters for monitoring."""
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'executions': self._executions,
+                'shared': self._shared
+            }
+
+
+# Process-wide group for crew pipeline executions
+PIPELINE_FLIGHTS = SingleFlight('pipeline')
@@ -0,0 +1,159 @@
+"""
+Async TMDb Client
+One process-wide httpx.AsyncClient for TMDb, running on its own event loop
+thread, so a batch of movies is enriched with concurrent requests over a
+single connection pool instead of one blocking request at a time per thread.
+
+- At most TMDB_ASYNC_CONCURRENCY TMDb requests are in flight at once, across
+  every tool and request in the process.
+- Responses are read from and written to the same TMDb response cache as the
+  shared requests session (see http_cache), so sync and async lookups of a
+  movie share one cache entry. Cache reads and writes run in the default
+  executor, so a slow cache backend never stalls the event loop.
+- Sync code waits on run(); async code awaits arun(), from any event loop.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from urllib.parse import urlencode
+
+import httpx
+from django.conf import settings
+
+from .http_cache import is_fresh, revalidation_headers
+from .http_clients import PROVIDERS, shared_session
+
+# Get the logger
+logger = logging.getLogger('chatbot.tmdb_async')
+
+API_URL = 'https://api.themoviedb.org/3/'
+
+
+class AsyncTMDBClient:
+    """httpx-based TMDb client bound to a dedicated event loop thread."""
+
+    def __init__(self, transport=None):
+        """
+        Initialize the client and start its event loop thread
+
+        Args:
+            transport: Optional httpx transport, used instead of the network
+        """
+        self.transport = transport
+        self.concurrency = getattr(settings, 'TMDB_ASYNC_CONCURRENCY', 8)
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='tmdb-async-loop', daemon=True)
+        self._thread.start()
+        # Created on the loop thread by _client()
+        self._http = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._in_flight = 0
+
+    def _client(self):
+        if self._http is None:
+            pool_size = getattr(settings, 'HTTP_POOL_MAXSIZE', 16)
+            self._http = httpx.AsyncClient(
+                timeout=getattr(settings, 'HTTP_TIMEOUT_TMDB', 10),
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+                transport=self.transport
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._http
+
+    async def get_json(self, path, api_key, params=None):
+        """
+        GET a TMDb API path, answering from the response cache when possible.
+
+        Args:
+            path: API path relative to /3/, e.g. 'movie/603'
+            api_key: TMDb API key
+            params: Optional query parameters
+
+        Returns:
+            Parsed response body, or an empty dict if the request failed
+        """
+        client = self._client()
+        url = f"{API_URL}{path}?{urlencode({**(params or {}), 'api_key': api_key})}"
+        cache = shared_session().get_adapter(PROVIDERS['tmdb'][0])
+
+        # The Django cache is blocking, so it is read and written off the loop thread
+        key, ttl, entry = await asyncio.to_thread(cache.lookup, url)
+        if is_fresh(entry):
+            return _json_body(path, entry['status'], entry['content'])
+
+        async with self._semaphore:
+            self._record(requests=1, in_flight=1)
+            try:
+                response = await client.get(url, headers=revalidation_headers(entry) if entry else None)
+            except httpx.HTTPError as e:
+                self._record(errors=1)
+                logger.error(f"TMDb request for {path} failed: {str(e)}")
+                return {}
+            finally:
+                self._record(in_flight=-1)
+
+        if ttl:
+            cached = await asyncio.to_thread(cache.store_response, key, ttl, entry, response.status_code,
+                                             response.reason_phrase, response.headers, response.content)
+            if response.status_code == 304 and cached:
+                return _json_body(path, cached['status'], cached['content'])
+        return _json_body(path, response.status_code, response.content)
+
+    def run(self, coroutine, timeout=None):
+        """Run a coroutine on the client's loop from sync code and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    async def arun(self, coroutine):
+        """Run a coroutine on the client's loop from another event loop and await its result."""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, self.loop))
+
+    def _record(self, requests=0, errors=0, in_flight=0):
+        with self._lock:
+            self._requests += requests
+            self._errors += errors
+            self._in_flight += in_flight
+
+    def stats(self):
+        """Return request counters for this process."""
+        with self._lock:
+            return {
+                'concurrency': self.concurrency,
+                'in_flight': self._in_flight,
+                'requests': self._requests,
+                'errors': self._errors
+            }
+
+
+def _json_body(path, status, content):
+    if status != 200:
+        logger.warning(f"TMDb returned {status} for {path}")
+        return {}
+    try:
+        return json.loads(content)
+    except ValueError:
+        logger.error(f"TMDb returned invalid JSON for {path}")
+        return {}
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_async_client():
+    """Get the process-wide async TMDb client, starting its event loop on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = AsyncTMDBClient()
+            logger.info(f"Started async TMDb client with concurrency {_client.concurrency}")
+        return _client
+
+
+def async_client_stats():
+    """Return async TMDb client counters, or None if the client was not started in this process."""
+    return _client.stats() if _client is not None else None
@@ -1,6 +1,7 @@
 """
 TMDb API service for fetching movie data.
 """
+import asyncio
 import logging
 import tmdbsimple as tmdb
 from typing import Dict, Any, List, Optional
@@ -9,7 +10,12 @@ import time
 import requests
 from urllib.parse import urljoin
 
+from django.conf import settings
+
 from .api_utils import APIRequestHandler
+from .executors import get_executor
+from .http_clients import install_tmdb_session, tmdb_session
+from .tmdb_async import get_async_client
 
 logger = logging.getLogger('chatbot.tmdb_service')
 
@@ -28,6 +34,9 @@ class TMDBService:
         'original': 'original'
     }
 
+    # Language of enriched movie details; its region picks the certification
+    DEFAULT_LANGUAGE = 'en-US'
+
     def __init__(self, api_key: str):
         """Initialize the TMDb API service.
 
@@ -36,7 +45,9 @@ class TMDBService:
         """
         self.api_key = api_key
         tmdb.API_KEY = api_key
-        self.session = requests.Session()
+        # Shared session whose adapter caches TMDb responses, also used by tmdbsimple
+        self.session = tmdb_session()
+        install_tmdb_session()
 
     def enhance_movies_sequential(self, movies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -78,22 +89,59 @@ class TMDBService:
     def enhance_movies_parallel(self, movies: List[Dict[str, Any]], max_workers: int = 3) -> List[Dict[str, Any]]:
         """
         Enhance multiple movies in parallel for better performance.
-        This implementation avoids race conditions by using a thread-safe approach.
+
+        With TMDB_ASYNC_ENABLED the whole batch is enriched concurrently by the async
+        TMDb client, otherwise each movie is enhanced on the shared I/O executor.
 
         Args:
             movies: List of movie dictionaries to enhance
-            max_workers: Maximum number of worker threads
+            max_workers: Unused, concurrency is bounded by TMDB_ASYNC_CONCURRENCY or the I/O executor
 
         Returns:
-            List of enhanced movie dictionaries
+            List of enhanced movie dictionaries, in the original order
         """
-        start_time = time.time()
-        logger.info(f"Starting parallel enhancement of {len(movies)} movies with {max_workers} workers")
-
         # Handle empty list case
         if not movies:
             return []
 
+        if getattr(settings, 'TMDB_ASYNC_ENABLED', True):
+            return get_async_client().run(self.aenhance_movies(movies))
+        return self._enhance_movies_threaded(movies)
+
+    async def aenhance_movies(self, movies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Enhance a batch of movies concurrently. Must run on the async TMDb client's
+        event loop (see AsyncTMDBClient.run and arun).
+
+        Args:
+            movies: List of movie dictionaries to enhance
+
+        Returns:
+            List of enhanced movie dictionaries, in the original order; movies that
+            failed to enhance are returned unchanged
+        """
+        start_time = time.time()
+        logger.info(f"Starting async enhancement of {len(movies)} movies")
+
+        results = await asyncio.gather(*(self.aenhance_movie_data(movie) for movie in movies),
+                                       return_exceptions=True)
+        result_movies = []
+        for idx, (movie, result) in enumerate(zip(movies, results)):
+            if isinstance(result, Exception):
+                logger.error(f"Error enhancing movie at index {idx}: {str(result)}")
+                result_movies.append(movie)
+            else:
+                result_movies.append(result)
+
+        elapsed_time = time.time() - start_time
+        logger.info(f"Async enhancement completed in {elapsed_time:.2f} seconds")
+        return result_movies
+
+    def _enhance_movies_threaded(self, movies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Enhance movies on the shared I/O executor, one blocking enhancement per task."""
+        start_time = time.time()
+        logger.info(f"Starting parallel enhancement of {len(movies)} movies on the shared I/O executor")
+
         # Create a copy of the movies list to avoid modifying the original
         movies_copy = list(movies)
 
@@ -112,18 +160,17 @@ class TMDBService:
                 # Return the original movie on error
                 return idx, movie
 
-        # Use ThreadPoolExecutor for parallel processing
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all tasks
-            future_to_idx = {
-                executor.submit(enhance_movie_task, idx, movie): idx
-                for idx, movie in enumerate(movies_copy)
-            }
+        # Use the shared I/O executor for parallel processing
+        executor = get_executor('io')
+        future_to_idx = {
+            executor.submit(enhance_movie_task, idx, movie): idx
+            for idx, movie in enumerate(movies_copy)
+        }
 
-            # Process results as they complete
-            for future in concurrent.futures.as_completed(future_to_idx):
-                idx, enhanced_movie = future.result()
-                result_dict[idx] = enhanced_movie
+        # Process results as they complete
+        for future in concurrent.futures.as_completed(future_to_idx):
+            idx, enhanced_movie = future.result()
+            result_dict[idx] = enhanced_movie
 
         # Reconstruct the result list in the original order
         result_movies = [result_dict[idx] for idx in range(len(movies_copy))]
@@ -172,6 +219,35 @@ class TMDBService:
             # Return empty dict instead of raising to avoid breaking the application
             return {}
 
+    def _movie_bundle_params(self, language: str) -> Dict[str, str]:
+        """Query parameters for a movie's details with its images and release dates appended."""
+        return {
+            'append_to_response': 'images,release_dates',
+            # Posters in the requested language plus text-free ones
+            'include_image_language': f"{language.split('-')[0]},null",
+            'language': language
+        }
+
+    def get_movie_bundle(self, movie_id, language: str = DEFAULT_LANGUAGE) -> Dict[str, Any]:
+        """
+        Get a movie's details, images and release dates in one request.
+
+        The response is cached by the shared TMDb response cache, whose key is the
+        URL: one entry per movie id and language.
+
+        Args:
+            movie_id: TMDB movie ID
+            language: Language of the details, e.g. 'en-US'
+
+        Returns:
+            Movie details with 'images' and 'release_dates' keys, or an empty dict on error
+        """
+        try:
+            return tmdb.Movies(movie_id).info(**self._movie_bundle_params(language))
+        except Exception as e:
+            logger.error(f"Error getting movie bundle for ID {movie_id}: {str(e)}")
+            return {}
+
     def get_movie_details(self, movie_id) -> Dict[str, Any]:
         """
         Get detailed information about a movie.
@@ -217,16 +293,7 @@ class TMDBService:
             images = movie.images()
 
             # If we have multiple posters, try to filter for English ones
-            if 'posters' in images and images['posters']:
-                # Try to filter to only English language posters
-                en_posters = [p for p in images['posters'] if p.get('iso_639_1') == 'en']
-
-                # If we found English posters, replace the full list with just those
-                if en_posters:
-                    logger.info(f"Filtered {len(images['posters'])} posters to {len(en_posters)} English ones for movie ID {movie_id}")
-                    images['posters'] = en_posters
-
-            return images
+            return self._english_posters_first(images)
         except Exception as e:
             logger.error(f"Error getting movie images for ID {movie_id}: {str(e)}")
             return {'posters': [], 'backdrops': [], 'logos': []}
@@ -297,16 +364,16 @@ class TMDBService:
         size_path = self.POSTER_SIZES[size]
 
         try:
-            # Get movie images
-            images = self.get_movie_images(movie_id)
+            # One request for the movie's details and its posters
+            movie = self.get_movie_bundle(movie_id)
+            images = self._english_posters_first(movie.get('images') or {})
 
             # If we have posters, return the first one (usually the primary poster)
             if images and 'posters' in images and images['posters']:
                 poster = images['posters'][0]  # Use the first poster
                 return f"{self.IMAGE_BASE_URL}{size_path}{poster['file_path']}?language=en"
 
-            # If no posters in images response, try the movie details which should have a poster_path
-            movie = self.get_movie_details(movie_id)
+            # If no posters in images response, use the movie's own poster_path
             if movie and 'poster_path' in movie and movie['poster_path']:
                 return f"{self.IMAGE_BASE_URL}{size_path}{movie['poster_path']}?language=en"
 
@@ -338,50 +405,8 @@ class TMDBService:
         movie_id = enhanced_data['tmdb_id']
 
         try:
-            # Get movie details for additional information
-            movie_details = self.get_movie_details(movie_id)
-
-            # Add additional fields if available
-            if movie_details:
-                # Update poster with high-quality version
-                if 'poster_path' in movie_details and movie_details['poster_path']:
-                    enhanced_data['poster_url'] = f"{self.IMAGE_BASE_URL}original{movie_details['poster_path']}?language=en"
-
-                # Add backdrop if available
-                if 'backdrop_path' in movie_details and movie_details['backdrop_path']:
-                    enhanced_data['backdrop_url'] = f"{self.IMAGE_BASE_URL}original{movie_details['backdrop_path']}?language=en"
-
-                # Add genres if available
-                if 'genres' in movie_details and movie_details['genres']:
-                    enhanced_data['genres'] = [genre['name'] for genre in movie_details['genres']]
-
-                # Add rating if available
-                if 'vote_average' in movie_details:
-                    enhanced_data['rating'] = movie_details['vote_average']
-
-                # Add more detailed information
-                for field in ['tagline', 'runtime', 'vote_count', 'status', 'homepage']:
-                    if field in movie_details and movie_details[field]:
-                        enhanced_data[field] = movie_details[field]
-
-            # Try to get better poster from images endpoint
-            images = self.get_movie_images(movie_id)
-            if images and 'posters' in images and images['posters']:
-                # Use the first poster (usually the primary one)
-                enhanced_data['poster_url'] = f"{self.IMAGE_BASE_URL}original{images['posters'][0]['file_path']}?language=en"
-
-                # Add additional poster URLs at different sizes
-                enhanced_data['poster_urls'] = {
-                    size: f"{self.IMAGE_BASE_URL}{self.POSTER_SIZES[size]}{images['posters'][0]['file_path']}?language=en"
-                    for size in self.POSTER_SIZES
-                }
-
-                # Add a list of all poster URLs if more than one is available
-                if len(images['posters']) > 1:
-                    enhanced_data['all_posters'] = [
-                        f"{self.IMAGE_BASE_URL}original{poster['file_path']}?language=en"
-                        for poster in images['posters'][:5]  # Limit to first 5 posters
-                    ]
+            # Details, posters and release dates in one request
+            self._apply_movie_bundle(enhanced_data, self.get_movie_bundle(movie_id))
 
             # Ensure is_current_release flag is preserved
             if 'is_current_release' in movie_data:
@@ -393,3 +418,93 @@ class TMDBService:
         except Exception as e:
             logger.error(f"Error enhancing movie data for ID {movie_id}: {str(e)}")
             return enhanced_data
+
+    async def aenhance_movie_data(self, movie_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async version of enhance_movie_data, making its one request through the
+        async TMDb client. Must run on the client's event loop.
+
+        Args:
+            movie_data: Movie data dictionary with at least a tmdb_id field
+
+        Returns:
+            Enhanced movie data with additional fields
+        """
+        enhanced_data = dict(movie_data)
+        movie_id = enhanced_data.get('tmdb_id')
+        if not movie_id:
+            logger.warning(f"Movie {enhanced_data.get('title', 'Unknown')} has no TMDB ID, skipping enhancement")
+            return enhanced_data
+
+        bundle = await get_async_client().get_json(f"movie/{movie_id}", self.api_key,
+                                                   self._movie_bundle_params(self.DEFAULT_LANGUAGE))
+        self._apply_movie_bundle(enhanced_data, bundle)
+        return enhanced_data
+
+    def _apply_movie_bundle(self, enhanced_data: Dict[str, Any], bundle: Dict[str, Any],
+                            language: str = DEFAULT_LANGUAGE):
+        """Copy details, the best posters and the certification from a get_movie_bundle response."""
+        self._apply_movie_details(enhanced_data, bundle)
+        self._apply_movie_images(enhanced_data, self._english_posters_first(bundle.get('images') or {}))
+
+        # Certification (e.g. PG-13) for the language's region
+        region = language.split('-')[-1]
+        for country in (bundle.get('release_dates') or {}).get('results', []):
+            if country.get('iso_3166_1') == region:
+                certifications = [release['certification'] for release in country.get('release_dates', [])
+                                  if release.get('certification')]
+                if certifications:
+                    enhanced_data['certification'] = certifications[0]
+
+    def _apply_movie_details(self, enhanced_data: Dict[str, Any], movie_details: Dict[str, Any]):
+        """Copy poster, backdrop, genres, rating and other details from a movie details response."""
+        if not movie_details:
+            return
+
+        # Update poster with high-quality version
+        if 'poster_path' in movie_details and movie_details['poster_path']:
+            enhanced_data['poster_url'] = f"{self.IMAGE_BASE_URL}original{movie_details['poster_path']}?language=en"
+
+        # Add backdrop if available
+        if 'backdrop_path' in movie_details and movie_details['backdrop_path']:
+            enhanced_data['backdrop_url'] = f"{self.IMAGE_BASE_URL}original{movie_details['backdrop_path']}?language=en"
+
+        # Add genres if available
+        if 'genres' in movie_details and movie_details['genres']:
+            enhanced_data['genres'] = [genre['name'] for genre in movie_details['genres']]
+
+        # Add rating if available
+        if 'vote_average' in movie_details:
+            enhanced_data['rating'] = movie_details['vote_average']
+
+        # Add more detailed information
+        for field in ['tagline', 'runtime', 'vote_count', 'status', 'homepage']:
+            if field in movie_details and movie_details[field]:
+                enhanced_data[field] = movie_details[field]
+
+    def _apply_movie_images(self, enhanced_data: Dict[str, Any], images: Dict[str, Any]):
+        """Set poster URLs from an images response."""
+        if images and 'posters' in images and images['posters']:
+            # Use the first poster (usually the primary one)
+            enhanced_data['poster_url'] = f"{self.IMAGE_BASE_URL}original{images['posters'][0]['file_path']}?language=en"
+
+            # Add additional poster URLs at different sizes
+            enhanced_data['poster_urls'] = {
+                size: f"{self.IMAGE_BASE_URL}{self.POSTER_SIZES[size]}{images['posters'][0]['file_path']}?language=en"
+                for size in self.POSTER_SIZES
+            }
+
+            # Add a list of all poster URLs if more than one is available
+            if len(images['posters']) > 1:
+                enhanced_data['all_posters'] = [
+                    f"{self.IMAGE_BASE_URL}original{poster['file_path']}?language=en"
+                    for poster in images['posters'][:5]  # Limit to first 5 posters
+                ]
+
+    def _english_posters_first(self, images: Dict[str, Any]) -> Dict[str, Any]:
+        """Narrow an images response to its English posters, if it has any, over text-free ones."""
+        if 'posters' in images and images['posters']:
+            en_posters = [p for p in images['posters'] if p.get('iso_639_1') == 'en']
+            if en_posters:
+                images['posters'] = en_posters
+        return images
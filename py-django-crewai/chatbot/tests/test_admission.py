@@ -0,0 +1,72 @@
+"""
+Tests for admission control of crew executions.
+"""
+import json
+import threading
+from unittest import mock
+
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from chatbot.models import Conversation, CrewJob
+from chatbot.services import job_runner
+from chatbot.services.admission import AdmissionController, AdmissionRejected
+from chatbot.views import get_movie_recommendations
+
+
+class AdmissionControllerTest(SimpleTestCase):
+    """Test the per-process in-flight limit and bounded wait queue."""
+
+    def test_rejects_when_queue_is_full(self):
+        controller = AdmissionController('test', max_in_flight=1, max_queue=1, max_wait=5)
+        controller.acquire()
+        waiter = threading.Thread(target=controller.acquire)
+        waiter.start()
+        while controller.stats()['queue_depth'] < 1:
+            pass
+
+        with self.assertRaises(AdmissionRejected) as rejected:
+            controller.acquire()
+        self.assertGreater(rejected.exception.retry_after, 0)
+
+        controller.release()
+        waiter.join()
+        stats = controller.stats()
+        self.assertEqual((stats['in_flight'], stats['queue_depth'], stats['admitted'], stats['rejected']), (1, 0, 2, 1))
+
+    def test_rejects_after_max_wait(self):
+        controller = AdmissionController('test', max_in_flight=1, max_queue=5, max_wait=0.05)
+        with controller.admit():
+            with self.assertRaises(AdmissionRejected):
+                controller.acquire()
+        self.assertEqual(controller.stats()['in_flight'], 0)
+
+
+@override_settings(CREW_JOB_WORKER_MODE='external', CREW_JOB_MAX_PENDING=1)
+class JobBacklogTest(TestCase):
+    """Test that requests are turned away once the job queue is full."""
+
+    def test_full_job_queue_returns_429(self):
+        conversation = Conversation.objects.create(mode='casual')
+        job_runner.enqueue_job(conversation, 'heist movies', first_run_mode=False)
+
+        request = RequestFactory().post('/api/movies/', data=json.dumps({'message': 'space movies'}),
+                                        content_type='application/json')
+        request.session = {}
+        response = get_movie_recommendations(request)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '15')
+        self.assertEqual(CrewJob.objects.count(), 1)
+
+    def test_rejected_job_returns_to_queue(self):
+        conversation = Conversation.objects.create(mode='casual')
+        job_runner.enqueue_job(conversation, 'heist movies', first_run_mode=False)
+        job = job_runner.claim_next_job('worker-a')
+
+        rejection = AdmissionRejected('full', retry_after=0)
+        with mock.patch.object(job_runner.MovieCrewService, 'process_query', side_effect=rejection):
+            job_runner.run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, CrewJob.STATUS_PENDING)
+        self.assertEqual(job.attempts, 0)
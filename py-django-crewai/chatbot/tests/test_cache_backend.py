@@ -0,0 +1,66 @@
+"""
+Tests for the shared pipeline cache.
+"""
+import tempfile
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from chatbot.services.cache_backend import PipelineCache, is_shared
+from chatbot.services.movie_crew_integration import MovieCrewService
+from chatbot.services.movie_crew_optimized_enhanced import RESULT_CACHE, query_hash
+
+
+class PipelineCacheTest(SimpleTestCase):
+    """Test that entries are shared through the Django cache and namespaced."""
+
+    def setUp(self):
+        caches['pipeline'].clear()
+
+    def test_entries_are_shared_between_instances(self):
+        writer = PipelineCache('theaters', 60)
+        reader = PipelineCache('theaters', 60)
+        other = PipelineCache('coordinates', 60)
+
+        writer.set('603|seattle, wa', [{'name': 'Cinerama'}])
+
+        self.assertEqual(reader.get('603|seattle, wa'), [{'name': 'Cinerama'}])
+        self.assertIsNone(other.get('603|seattle, wa'))
+        self.assertEqual(reader.stats()['hits'], 1)
+
+        writer.clear()
+        self.assertIsNone(writer.get('603|seattle, wa'))
+
+    def test_backend_errors_are_misses(self):
+        cache = PipelineCache('theaters', 60)
+        with mock.patch.object(caches['pipeline'], 'get', side_effect=ConnectionError('down')):
+            self.assertEqual(cache.get('603|seattle, wa', []), [])
+        self.assertEqual(cache.stats()['errors'], 1)
+
+
+@override_settings(CREW_EXECUTION_ISOLATION='process')
+class IsolatedCachedResponseTest(SimpleTestCase):
+    """Test fast lane lookups when crews run in isolated worker processes."""
+
+    response = {'response': 'Here are some movies.', 'movies': []}
+
+    def test_shared_backend_is_read_directly(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'pipeline': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location},
+        }):
+            self.assertTrue(is_shared())
+            RESULT_CACHE['recommendations'].set(query_hash('heist movies'), self.response)
+
+            with mock.patch('chatbot.services.movie_crew_integration.get_pipeline') as get_pipeline:
+                self.assertEqual(MovieCrewService.cached_response('heist movies', []), self.response)
+            get_pipeline.assert_not_called()
+
+    def test_per_process_backend_is_skipped(self):
+        caches['pipeline'].clear()
+        self.addCleanup(caches['pipeline'].clear)
+        self.assertFalse(is_shared())
+        RESULT_CACHE['recommendations'].set(query_hash('heist movies'), self.response)
+
+        self.assertIsNone(MovieCrewService.cached_response('heist movies', []))
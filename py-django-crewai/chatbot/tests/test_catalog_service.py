@@ -0,0 +1,106 @@
+"""
+Tests for the in-memory movie catalog.
+"""
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from chatbot.services.catalog_service import MovieCatalog
+from chatbot.services.movie_crew.tools.search_movies_tool import SearchMoviesTool
+
+NOW_PLAYING = [
+    {'id': 1, 'title': 'Space Comedy', 'genre_ids': [35, 878], 'release_date': '2026-09-01', 'popularity': 50},
+    {'id': 2, 'title': 'Quiet Drama', 'genre_ids': [18], 'release_date': '2026-08-15', 'popularity': 20},
+]
+POPULAR = [
+    {'id': 3, 'title': 'Old Comedy', 'genre_ids': [35], 'release_date': '1994-05-01', 'popularity': 80},
+    {'id': 1, 'title': 'Space Comedy', 'genre_ids': [35, 878], 'release_date': '2026-09-01', 'popularity': 50},
+]
+
+
+def _pages(results):
+    return mock.Mock(side_effect=lambda page, language: {'results': results, 'total_pages': 1})
+
+
+class MovieCatalogTest(SimpleTestCase):
+    """Test catalog refresh and the genre and year indexes."""
+
+    def setUp(self):
+        self.catalog = MovieCatalog(pages=3, refresh_interval=60)
+        self.movies = mock.Mock(now_playing=_pages(NOW_PLAYING), popular=_pages(POPULAR))
+
+    def test_not_ready_before_refresh(self):
+        self.assertIsNone(self.catalog.now_playing())
+        self.assertIsNone(self.catalog.search(genres=[35]))
+
+    def test_refresh_indexes_titles(self):
+        with mock.patch('chatbot.services.catalog_service.tmdb.Movies', return_value=self.movies):
+            self.assertTrue(self.catalog.refresh())
+
+        self.movies.now_playing.assert_called_once_with(page=1, language='en-US')
+        self.assertEqual([m['id'] for m in self.catalog.now_playing()], [1, 2])
+        self.assertEqual([m['id'] for m in self.catalog.now_playing(genres=[878])], [1])
+        self.assertEqual([m['id'] for m in self.catalog.search(genres=[35])], [3, 1])
+        self.assertEqual([m['id'] for m in self.catalog.search(genres=[35], year_ranges=[(1990, 1999)])], [3])
+        self.assertEqual(self.catalog.stats()['titles'], 3)
+
+    def test_failed_refresh_keeps_previous_catalog(self):
+        with mock.patch('chatbot.services.catalog_service.tmdb.Movies', return_value=self.movies):
+            self.catalog.refresh()
+        with mock.patch('chatbot.services.catalog_service.tmdb.Movies', side_effect=ConnectionError('down')):
+            self.assertFalse(self.catalog.refresh())
+
+        self.assertEqual(len(self.catalog.now_playing()), 2)
+        self.assertEqual(self.catalog.stats()['failures'], 1)
+
+
+class SearchMoviesToolCatalogTest(SimpleTestCase):
+    """Test SearchMoviesTool answers that come from the catalog or the TMDb listings."""
+
+    @override_settings(MOVIE_RESULTS_LIMIT=2)
+    def test_each_movie_is_tagged_with_its_own_year_range(self):
+        catalog = mock.Mock()
+        catalog.search.return_value = [POPULAR[0], NOW_PLAYING[0]]
+        tool = SearchMoviesTool(first_run_mode=False)
+
+        with mock.patch('chatbot.services.movie_crew.tools.search_movies_tool.get_catalog', return_value=catalog):
+            results = json.loads(tool._run('comedies from the 90s, 2020s'))
+
+        catalog.search.assert_called_once_with([35], [(1990, 1999), (2020, 2029)], limit=2)
+        self.assertEqual([movie['decade'] for movie in results], ['1990s', '2020s'])
+        self.assertTrue(all(movie['is_from_requested_period'] for movie in results))
+
+    @override_settings(MOVIE_RESULTS_LIMIT=2)
+    def test_bare_year_query_is_not_answered_from_catalog(self):
+        """A year outside any range is part of the search text, so the query goes to TMDb search."""
+        catalog = mock.Mock()
+        catalog.search.return_value = [POPULAR[0], NOW_PLAYING[0]]
+        search = mock.Mock()
+        search.movie.return_value = {
+            'results': [{'id': 4, 'title': 'Action 1985', 'genre_ids': [28], 'release_date': '1985-06-01'}]
+        }
+        tool = SearchMoviesTool(first_run_mode=False)
+
+        with mock.patch('chatbot.services.movie_crew.tools.search_movies_tool.get_catalog', return_value=catalog), \
+                mock.patch('chatbot.services.movie_crew.tools.search_movies_tool.tmdb.Search', return_value=search):
+            results = json.loads(tool._run('action movies 1985'))
+
+        catalog.search.assert_not_called()
+        self.assertEqual(search.movie.call_args.kwargs['query'], 'action movies 1985')
+        self.assertEqual([movie['title'] for movie in results], ['Action 1985'])
+
+    def test_now_playing_uses_listed_posters(self):
+        """Now playing results use the listing's poster instead of an images() call per movie."""
+        movies = mock.Mock()
+        movies.now_playing.return_value = {'results': [dict(NOW_PLAYING[0], poster_path='/space.jpg')]}
+        tool = SearchMoviesTool(first_run_mode=False)
+
+        with mock.patch('chatbot.services.movie_crew.tools.search_movies_tool.get_catalog', return_value=None), \
+                mock.patch('chatbot.services.movie_crew.tools.search_movies_tool.tmdb.Movies',
+                           return_value=movies) as tmdb_movies:
+            results = json.loads(tool._run('what is now playing'))
+
+        tmdb_movies.assert_called_once_with()
+        movies.images.assert_not_called()
+        self.assertEqual(results[0]['poster_url'], 'https://image.tmdb.org/t/p/original/space.jpg')
@@ -0,0 +1,47 @@
+"""
+Tests for cancelling and terminating timed-out crew runs.
+"""
+import os
+import time
+
+from django.test import SimpleTestCase
+
+from chatbot.services.crew_isolation import CancellationToken, CrewCancelled, CrewTimeout, IsolatedCrewPool
+from chatbot.services.movie_crew.tools.find_theaters_tool_optimized import FindTheatersToolOptimized
+
+
+class CancellationTokenTest(SimpleTestCase):
+    """Test that a cancelled token stops tools at their next checkpoint."""
+
+    def test_cancelled_token_stops_tools(self):
+        token = CancellationToken()
+        tool = FindTheatersToolOptimized(user_location='Seattle, WA')
+        tool.cancel_token = token
+        token.raise_if_cancelled()
+
+        token.cancel('timed out')
+
+        self.assertTrue(token.wait(0))
+        with self.assertRaises(CrewCancelled):
+            tool._run('[]')
+        # Cancellation is not an Exception, so broad handlers in tools and agents don't swallow it
+        self.assertFalse(issubclass(CrewCancelled, Exception))
+
+
+class IsolatedCrewPoolTest(SimpleTestCase):
+    """Test that an overrunning run is terminated and its process replaced."""
+
+    def test_overrunning_run_is_terminated(self):
+        pool = IsolatedCrewPool(1)
+        first_pid = pool.run(os.getpid, timeout=60)
+        self.assertNotEqual(first_pid, os.getpid())
+
+        started = time.monotonic()
+        with self.assertRaises(CrewTimeout):
+            pool.run(time.sleep, 60, timeout=0.5)
+        self.assertLess(time.monotonic() - started, 10)
+
+        replacement_pid = pool.run(os.getpid, timeout=60)
+        self.assertNotEqual(replacement_pid, first_pid)
+        self.assertEqual(pool.stats()['killed'], 1)
+        self.assertEqual(pool.stats()['busy'], 0)
@@ -0,0 +1,35 @@
+"""
+Tests for the shared, bounded executors.
+"""
+import threading
+
+from django.test import SimpleTestCase
+
+from chatbot.services.executors import NamedExecutor, executor_stats, get_executor
+
+
+class NamedExecutorTest(SimpleTestCase):
+    """Test executor reuse, bounds and metrics."""
+
+    def test_get_executor_returns_process_wide_instance(self):
+        self.assertIs(get_executor('io'), get_executor('io'))
+        self.assertIn('io', executor_stats()['executors'])
+
+    def test_pool_is_bounded_and_tracks_tasks(self):
+        executor = NamedExecutor('test', max_workers=2)
+        release = threading.Event()
+        futures = [executor.submit(release.wait, 5) for _ in range(5)]
+
+        stats = executor.stats()
+        self.assertLessEqual(stats['threads'], 2)
+        self.assertEqual(stats['running'] + stats['queued'], 5)
+
+        release.set()
+        for future in futures:
+            future.result()
+        executor.shutdown()
+
+        stats = executor.stats()
+        self.assertEqual(stats['completed'], 5)
+        self.assertEqual(stats['running'], 0)
+        self.assertEqual(stats['queued'], 0)
@@ -0,0 +1,43 @@
+"""
+Tests for geohash encoding and the Overpass cell cache.
+"""
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from chatbot.services import geohash
+from chatbot.services.location_service import LocationService
+
+
+class GeohashTest(SimpleTestCase):
+    """Test encoding and cell covering."""
+
+    def test_encode_and_bounds(self):
+        self.assertEqual(geohash.encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+        south, west, north, east = geohash.bounds('u4pr')
+        self.assertTrue(south <= 57.64911 <= north and west <= 10.40744 <= east)
+
+    def test_covering_cells_include_the_center_cell(self):
+        cells = geohash.covering_cells(47.6062, -122.3321, 30000, 4)
+        self.assertIn(geohash.encode(47.6062, -122.3321, 4), cells)
+        self.assertLess(len(cells), 30)
+
+
+class TheaterCellCacheTest(SimpleTestCase):
+    """Test that nearby searches reuse cached cells."""
+
+    def setUp(self):
+        caches['pipeline'].clear()
+
+    def test_nearby_search_reuses_cells(self):
+        service = LocationService()
+        cinema = {'type': 'node', 'id': 1, 'lat': 47.6101, 'lon': -122.3421, 'tags': {'name': 'Cinerama'}}
+        with mock.patch('chatbot.services.location_service.APIRequestHandler.make_request',
+                        return_value={'elements': [cinema]}) as overpass:
+            first = service.search_theaters(47.6062, -122.3321, radius_miles=5)
+            second = service.search_theaters(47.6070, -122.3330, radius_miles=5)
+
+        overpass.assert_called_once()
+        self.assertEqual([t['name'] for t in first], ['Cinerama'])
+        self.assertEqual([t['name'] for t in second], ['Cinerama'])
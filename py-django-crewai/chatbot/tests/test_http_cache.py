@@ -0,0 +1,70 @@
+"""
+Tests for the TMDb HTTP response cache.
+"""
+import io
+from unittest import mock
+
+import requests
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from requests.adapters import HTTPAdapter
+
+from chatbot.services import http_cache
+from chatbot.services.http_cache import CachingHTTPAdapter
+
+
+def _response(status, body=b'', headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.raw = io.BytesIO(body)
+    response.headers.update(headers or {})
+    return response
+
+
+class CachingHTTPAdapterTest(SimpleTestCase):
+    """Test that TMDb responses are reused while fresh and revalidated once stale."""
+
+    def setUp(self):
+        caches['pipeline'].clear()
+        self.session = requests.Session()
+        self.session.mount('https://api.themoviedb.org/', CachingHTTPAdapter())
+
+    def test_fresh_response_is_served_from_cache(self):
+        network = mock.Mock(return_value=_response(200, b'{"id": 603}', {'ETag': '"v1"'}))
+        with mock.patch.object(HTTPAdapter, 'send', network):
+            first = self.session.get('https://api.themoviedb.org/3/movie/603', params={'api_key': 'a'})
+            # A different API key still reads the same entry
+            second = self.session.get('https://api.themoviedb.org/3/movie/603', params={'api_key': 'b'})
+            self.session.get('https://api.themoviedb.org/3/account', params={'api_key': 'a'})
+
+        self.assertEqual(first.json(), {'id': 603})
+        self.assertEqual(second.json(), {'id': 603})
+        self.assertEqual(second.headers['X-Cache'], 'HIT')
+        # Details once, plus the uncached account endpoint
+        self.assertEqual(network.call_count, 2)
+
+    @override_settings(TMDB_CACHE_NOW_PLAYING_TTL=60)
+    def test_stale_response_is_revalidated(self):
+        url = 'https://api.themoviedb.org/3/movie/now_playing'
+        network = mock.Mock(side_effect=[
+            _response(200, b'{"results": [1]}', {'ETag': '"v1"'}),
+            _response(304),
+        ])
+        with mock.patch.object(HTTPAdapter, 'send', network):
+            self.session.get(url)
+            with mock.patch.object(http_cache.time, 'time', return_value=http_cache.time.time() + 120):
+                revalidated = self.session.get(url)
+
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertEqual(revalidated.json(), {'results': [1]})
+        self.assertEqual(network.call_args_list[1].args[0].headers['If-None-Match'], '"v1"')
+
+    def test_not_found_is_cached_briefly(self):
+        network = mock.Mock(return_value=_response(404, b'{"status_code": 34}'))
+        with mock.patch.object(HTTPAdapter, 'send', network):
+            first = self.session.get('https://api.themoviedb.org/3/movie/999999999')
+            second = self.session.get('https://api.themoviedb.org/3/movie/999999999')
+
+        self.assertEqual((first.status_code, second.status_code), (404, 404))
+        self.assertEqual(network.call_count, 1)
@@ -0,0 +1,37 @@
+"""
+Tests for the shared HTTP session.
+"""
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from requests.adapters import HTTPAdapter
+
+from chatbot.services import http_clients
+from chatbot.services.http_clients import CachingProviderHTTPAdapter, ProviderHTTPAdapter
+
+
+class SharedSessionTest(SimpleTestCase):
+    """Test provider adapters and default timeouts."""
+
+    def setUp(self):
+        http_clients._session = None
+        self.addCleanup(setattr, http_clients, '_session', None)
+
+    @override_settings(HTTP_TIMEOUT_IPINFO=3, HTTP_POOL_MAXSIZE=4)
+    def test_providers_get_pooled_adapters_with_timeouts(self):
+        session = http_clients.shared_session()
+        self.assertIs(http_clients.shared_session(), session)
+
+        tmdb_adapter = session.get_adapter('https://api.themoviedb.org/3/movie/603')
+        ipinfo_adapter = session.get_adapter('https://ipinfo.io/8.8.8.8/json')
+        self.assertIsInstance(tmdb_adapter, CachingProviderHTTPAdapter)
+        self.assertIsInstance(ipinfo_adapter, ProviderHTTPAdapter)
+        self.assertEqual((ipinfo_adapter.timeout, ipinfo_adapter._pool_maxsize), (3, 4))
+
+    def test_default_timeout_applies_only_without_one(self):
+        adapter = ProviderHTTPAdapter(timeout=7)
+        with mock.patch.object(HTTPAdapter, 'send') as send:
+            adapter.send(mock.Mock(), timeout=None)
+            adapter.send(mock.Mock(), timeout=2)
+
+        self.assertEqual([call.kwargs['timeout'] for call in send.call_args_list], [7, 2])
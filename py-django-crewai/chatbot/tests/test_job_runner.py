@@ -0,0 +1,273 @@
+"""
+Tests for the background crew job runner.
+The crew itself is patched out so these tests do not need API keys.
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from chatbot.models import Conversation, CrewJob, MovieRecommendation
+from chatbot.services import job_runner
+from chatbot.views import aget_movie_recommendations, apoll_movie_recommendations
+
+
+@override_settings(CREW_JOB_WORKER_MODE='external')
+class CrewJobRunnerTest(TestCase):
+    """Test enqueueing, claiming and running crew jobs."""
+
+    def setUp(self):
+        self.conversation = Conversation.objects.create(mode='casual')
+        self.response_data = {
+            'response': 'Here are some movies.',
+            'movies': [{
+                'title': 'Heat',
+                'overview': 'A heist thriller.',
+                'release_date': '1995-12-15',
+                'tmdb_id': 949,
+                'rating': 8.2
+            }]
+        }
+
+    def test_job_is_claimed_once(self):
+        """A pending job can only be claimed by one worker."""
+        job = job_runner.enqueue_job(self.conversation, 'heist movies', first_run_mode=False)
+
+        claimed = job_runner.claim_next_job('worker-a')
+        self.assertEqual(claimed.id, job.id)
+        self.assertEqual(claimed.status, CrewJob.STATUS_RUNNING)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(job_runner.claim_next_job('worker-b'))
+
+    def test_run_job_persists_result(self):
+        """A successful run saves recommendations and stores the poll payload."""
+        job_runner.enqueue_job(self.conversation, 'heist movies', first_run_mode=False)
+        job = job_runner.claim_next_job('worker-a')
+
+        with mock.patch.object(job_runner.MovieCrewService, 'process_query', return_value=self.response_data):
+            job_runner.run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, CrewJob.STATUS_SUCCEEDED)
+        self.assertEqual(job.result['status'], 'success')
+        self.assertEqual(job.result['recommendations'][0]['title'], 'Heat')
+        self.assertEqual(MovieRecommendation.objects.filter(conversation=self.conversation).count(), 1)
+
+    def test_run_job_records_failure(self):
+        """A crew error marks the job failed instead of leaving it running."""
+        job_runner.enqueue_job(self.conversation, 'heist movies', first_run_mode=False)
+        job = job_runner.claim_next_job('worker-a')
+
+        with mock.patch.object(job_runner.MovieCrewService, 'process_query', side_effect=RuntimeError('boom')):
+            job_runner.run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, CrewJob.STATUS_FAILED)
+        self.assertEqual(job.error, 'boom')
+
+    def test_identical_job_reuses_leader_result(self):
+        """A job identical to a running one stays queued and is completed with its result."""
+        leader = job_runner.enqueue_job(self.conversation, 'heist movies', first_run_mode=False)
+        follower = job_runner.enqueue_job(self.conversation, 'heist movies', first_run_mode=False)
+        self.assertEqual(leader.flight_key, follower.flight_key)
+
+        leader = job_runner.claim_next_job('worker-a')
+        self.assertIsNone(job_runner.claim_next_job('worker-b'))
+
+        with mock.patch.object(job_runner.MovieCrewService, 'process_query',
+                               return_value=self.response_data) as process_query:
+            job_runner.run_job(leader)
+
+        process_query.assert_called_once()
+        follower.refresh_from_db()
+        self.assertEqual(follower.status, CrewJob.STATUS_SUCCEEDED)
+        self.assertEqual(follower.result['recommendations'][0]['title'], 'Heat')
+
+    def test_identical_job_claimed_concurrently_returns_to_queue(self):
+        """A job claimed alongside an identical earlier one goes back to the queue instead of running."""
+        leader = job_runner.enqueue_job(self.conversation, 'heist movies', first_run_mode=False)
+        follower = job_runner.enqueue_job(self.conversation, 'heist movies', first_run_mode=False)
+        job_runner.claim_next_job('worker-a')
+        # Claimed by another process before the leader started running
+        CrewJob.objects.filter(pk=follower.pk).update(
+            status=CrewJob.STATUS_RUNNING, worker_id='worker-b', started_at=timezone.now(), attempts=1
+        )
+        follower.refresh_from_db()
+
+        with mock.patch.object(job_runner.MovieCrewService, 'process_query') as process_query:
+            job_runner.run_job(follower)
+
+        process_query.assert_not_called()
+        follower.refresh_from_db()
+        self.assertEqual(follower.status, CrewJob.STATUS_PENDING)
+        self.assertEqual(follower.attempts, 0)
+
+    @override_settings(CREW_EXECUTION_TIMEOUT=60)
+    def test_identical_job_stops_waiting_after_execution_timeout(self):
+        """Jobs waiting on a run older than CREW_EXECUTION_TIMEOUT can be claimed again."""
+        leader = job_runner.enqueue_job(self.conversation, 'heist movies', first_run_mode=False)
+        follower = job_runner.enqueue_job(self.conversation, 'heist movies', first_run_mode=False)
+        job_runner.claim_next_job('worker-a')
+        CrewJob.objects.filter(pk=leader.pk).update(started_at=timezone.now() - timedelta(seconds=61))
+
+        claimed = job_runner.claim_next_job('worker-b')
+        self.assertEqual(claimed.id, follower.id)
+
+    def test_poll_reads_job_state(self):
+        """Polls report processing until the job finishes, then return its result."""
+        session = self.client.session
+        session['casual_conversation_id'] = self.conversation.id
+        session.save()
+        job = job_runner.enqueue_job(self.conversation, 'heist movies', first_run_mode=False)
+
+        response = self.client.get('/api/poll-movie-recommendations/', {'job_id': job.id})
+        self.assertEqual(response.json()['status'], 'processing')
+
+        job.status = CrewJob.STATUS_SUCCEEDED
+        job.result = {'status': 'success', 'message': 'done', 'recommendations': []}
+        job.save()
+
+        response = self.client.get('/api/poll-movie-recommendations/', {'job_id': job.id})
+        self.assertEqual(response.json(), job.result)
+
+
+@override_settings(CREW_JOB_WORKER_MODE='external', ASYNC_POLL_WAIT_SECONDS=0)
+class AsyncJobViewsTest(TestCase):
+    """Test the async recommendation and polling views."""
+
+    async def test_async_request_and_poll(self):
+        factory = AsyncRequestFactory()
+        session = SessionStore()
+
+        request = factory.post('/api/movie-recommendations/', {'message': 'heist movies'}, content_type='application/json')
+        request.session = session
+        response = await aget_movie_recommendations(request)
+        self.assertEqual(response.status_code, 200)
+
+        request = factory.get('/api/poll-movie-recommendations/')
+        request.session = session
+        response = await apoll_movie_recommendations(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'"processing"', response.content)
+        self.assertEqual(await CrewJob.objects.filter(status=CrewJob.STATUS_PENDING).acount(), 1)
+
+
+@override_settings(CREW_JOB_WORKER_MODE='external', JOB_EVENT_STREAM_ENABLED=True)
+class JobEventStreamTest(TestCase):
+    """Test that job progress is recorded and streamed as Server-Sent Events."""
+
+    def test_run_job_streams_progress(self):
+        session = self.client.session
+        conversation = Conversation.objects.create(mode='casual')
+        session['casual_conversation_id'] = conversation.id
+        session.save()
+
+        job_runner.enqueue_job(conversation, 'heist movies', first_run_mode=False)
+        job = job_runner.claim_next_job('worker-a')
+
+        def fake_pipeline(**kwargs):
+            kwargs['progress_callback']('task_finished', {'task': 'Find movies'})
+            return {'response': 'Here are some movies.', 'movies': []}
+
+        with mock.patch.object(job_runner.MovieCrewService, 'process_query', side_effect=fake_pipeline):
+            job_runner.run_job(job)
+
+        response = self.client.get(f'/api/jobs/{job.id}/events/')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join(response.streaming_content).decode()
+
+        events = [line.split(': ', 1)[1] for line in body.splitlines() if line.startswith('event: ')]
+        self.assertEqual(events, ['queued', 'started', 'task_finished', 'recommendations_ready', 'succeeded'])
+
+    def test_other_sessions_cannot_stream_job(self):
+        conversation = Conversation.objects.create(mode='casual')
+        job = job_runner.enqueue_job(conversation, 'heist movies', first_run_mode=False)
+
+        response = self.client.get(f'/api/jobs/{job.id}/events/')
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(CREW_JOB_WORKER_MODE='external')
+class EarlyRecommendationsTest(TestCase):
+    """Test that first run recommendations are published before their theaters."""
+
+    def test_recommendations_are_published_before_theaters(self):
+        conversation = Conversation.objects.create(mode='first_run')
+        job_runner.enqueue_job(conversation, 'new sci-fi', first_run_mode=True, user_location='Seattle, WA')
+        job = job_runner.claim_next_job('worker-a')
+        movie_data = {'title': 'Dune', 'overview': 'Spice.', 'release_date': '2099-01-01', 'tmdb_id': 438631}
+        theaters = [{
+            'name': 'Cinerama',
+            'address': '2100 4th Ave',
+            'distance_miles': 1.2,
+            'showtimes': [{'start_time': '2099-01-01T19:00:00', 'format': 'IMAX'}]
+        }]
+        seen = {}
+
+        def fake_pipeline(**kwargs):
+            progress = kwargs['progress_callback']
+            progress('recommendations_ready', {'movies': [movie_data]})
+
+            # Published before the theater search: no theaters key yet
+            job.refresh_from_db()
+            seen['partial'] = job.result
+            seen['status'] = self.client.get(f"/api/theater-status/{job.result['recommendations'][0]['id']}/").json()
+
+            progress('theaters_found', {'tmdb_id': 438631, 'title': 'Dune', 'theaters': theaters})
+            return {'response': 'Try Dune.', 'movies': [dict(movie_data, theaters=theaters)]}
+
+        with mock.patch.object(job_runner.MovieCrewService, 'process_query', side_effect=fake_pipeline):
+            job_runner.run_job(job)
+
+        self.assertTrue(seen['partial']['theaters_pending'])
+        self.assertNotIn('theaters', seen['partial']['recommendations'][0])
+        self.assertEqual(seen['status']['status'], 'processing')
+
+        # The final result reuses the published movie and the showtimes saved for it
+        job.refresh_from_db()
+        movie = MovieRecommendation.objects.get(job=job)
+        self.assertEqual(job.result['recommendations'][0]['id'], movie.id)
+        self.assertEqual(movie.showtimes.count(), 1)
+        self.assertEqual(job.result['recommendations'][0]['theaters'][0]['name'], 'Cinerama')
+
+
+@override_settings(CREW_JOB_WORKER_MODE='external')
+class JobLanesTest(TestCase):
+    """Test lane priorities and the fast lane for cached casual queries."""
+
+    def test_casual_workers_skip_first_run_jobs(self):
+        first_run = job_runner.enqueue_job(Conversation.objects.create(mode='first_run'), 'new releases', True)
+        self.assertIsNone(job_runner.claim_next_job('casual-worker', job_runner.CASUAL_LANES))
+
+        # General workers take casual jobs first, even ones queued later
+        casual = job_runner.enqueue_job(Conversation.objects.create(mode='casual'), 'heist movies', False)
+        self.assertEqual(job_runner.claim_next_job('general-worker').id, casual.id)
+        self.assertEqual(job_runner.claim_next_job('general-worker').id, first_run.id)
+
+    def test_cached_casual_query_completes_in_fast_lane(self):
+        conversation = Conversation.objects.create(mode='casual')
+        cached = {'response': 'From cache.', 'movies': [{'title': 'Heat', 'tmdb_id': 949}]}
+
+        with mock.patch.object(job_runner.MovieCrewService, 'cached_response', return_value=cached):
+            job = job_runner.enqueue_job(conversation, 'heist movies', first_run_mode=False)
+
+        self.assertEqual(job.status, CrewJob.STATUS_SUCCEEDED)
+        self.assertEqual(job.worker_id, job_runner.FAST_LANE_WORKER)
+        self.assertEqual(job.result['recommendations'][0]['title'], 'Heat')
+        self.assertIsNone(job_runner.claim_next_job('general-worker'))
+
+    def test_cached_first_run_request_returns_result(self):
+        """A First Run request served in the fast lane returns its result instead of a processing status."""
+        cached = {'response': 'From cache.', 'movies': [{'title': 'Heat', 'tmdb_id': 949, 'theaters': []}]}
+
+        with mock.patch.object(job_runner.MovieCrewService, 'cached_response', return_value=cached):
+            response = self.client.post('/api/movies-theaters-showtimes/',
+                                        {'message': 'new releases', 'location': 'Seattle, WA'},
+                                        content_type='application/json')
+
+        data = response.json()
+        self.assertEqual(data['status'], 'success')
+        self.assertEqual(data['recommendations'][0]['title'], 'Heat')
+        self.assertIn('job_id', data)
@@ -0,0 +1,53 @@
+"""
+Tests for the LLM response cache.
+"""
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from chatbot.services.llm_response_cache import LLMResponseCache
+
+
+def _llm(response='Final Answer: []'):
+    llm = SimpleNamespace(model='gpt-4o-mini', temperature=0.2, stop=['Observation:'])
+    llm.call = mock.Mock(return_value=response)
+    return llm
+
+
+class LLMResponseCacheTest(SimpleTestCase):
+    """Test that repeated prompts skip the model and tool-executing calls are never cached."""
+
+    def setUp(self):
+        caches['pipeline'].clear()
+        self.cache = LLMResponseCache()
+
+    def test_repeated_prompt_is_served_from_cache(self):
+        llm = _llm()
+        model_call = llm.call
+        self.cache.wrap(llm)
+        self.cache.wrap(llm)
+        messages = [{'role': 'user', 'content': 'Find sci fi movies'}]
+
+        self.assertEqual(llm.call(messages), 'Final Answer: []')
+        self.assertEqual(llm.call(list(messages)), 'Final Answer: []')
+        llm.call([{'role': 'user', 'content': 'Find horror movies'}])
+
+        self.assertEqual(model_call.call_count, 2)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+
+    def test_function_calls_and_disabled_cache_go_to_the_model(self):
+        llm = _llm()
+        model_call = llm.call
+        self.cache.wrap(llm)
+
+        llm.call('Find movies', available_functions={'search': print})
+        llm.call('Find movies', available_functions={'search': print})
+        with override_settings(LLM_RESPONSE_CACHE_ENABLED=False):
+            llm.call('Find movies')
+            llm.call('Find movies')
+
+        self.assertEqual(model_call.call_count, 4)
+        self.assertEqual(self.cache.stats()['skipped'], 4)
@@ -0,0 +1,42 @@
+"""
+Tests for the geocode and IP location caches.
+"""
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from chatbot.services.location_service import LocationService, ip_prefix
+
+
+class LocationCacheTest(SimpleTestCase):
+    """Test that repeat lookups skip Nominatim and ipinfo.io."""
+
+    def setUp(self):
+        caches['pipeline'].clear()
+        self.service = LocationService()
+
+    def test_geocode_is_cached_by_normalized_location(self):
+        place = SimpleNamespace(latitude=47.606209, longitude=-122.332071, address='Seattle, WA')
+        with mock.patch.object(self.service.geolocator, 'geocode', return_value=place) as geocode:
+            first = self.service.geocode_location('Seattle,  WA')
+            second = self.service.geocode_location(' seattle, wa')
+
+        geocode.assert_called_once()
+        self.assertEqual(first, second)
+        self.assertEqual((first['latitude'], first['longitude']), (47.61, -122.33))
+
+    def test_ip_location_is_shared_by_network(self):
+        response = mock.Mock()
+        response.json.return_value = {'loc': '40.7128,-74.0060', 'city': 'New York', 'timezone': 'America/New_York'}
+        session = mock.Mock()
+        session.get.return_value = response
+        with mock.patch('chatbot.services.location_service.shared_session', return_value=session):
+            first = self.service.get_location_from_ip('203.0.113.7')
+            second = self.service.get_location_from_ip('203.0.113.200')
+
+        session.get.assert_called_once()
+        self.assertEqual(first, second)
+        self.assertEqual(ip_prefix('203.0.113.7'), '203.0.113.0/24')
+        self.assertEqual(ip_prefix('2001:db8:1:2::1'), '2001:db8:1::/48')
@@ -0,0 +1,62 @@
+"""
+Tests for the in-process LRU+TTL cache.
+"""
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from chatbot.services import memory_cache
+from chatbot.services.memory_cache import MemoryCacheBackend, TTLCache
+
+
+class TTLCacheTest(SimpleTestCase):
+    """Test LRU eviction, lazy expiry and size limits."""
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(max_size=2, default_ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (1, None, 3))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (3, 1, 1))
+
+    def test_expired_entries_are_dropped(self):
+        cache = TTLCache(max_size=10, default_ttl=60)
+        with mock.patch.object(memory_cache.time, 'monotonic', return_value=1000.0):
+            cache.set('short', 1, ttl=5)
+            cache.set('long', 2)
+        with mock.patch.object(memory_cache.time, 'monotonic', return_value=1010.0):
+            self.assertIsNone(cache.get('short'))
+            cache.set('new', 3)
+            self.assertEqual(cache.get('long'), 2)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_byte_limit(self):
+        cache = TTLCache(max_size=10, default_ttl=60, max_bytes=10, sizeof=len)
+        cache.set('a', 'xxxx')
+        cache.set('b', 'xxxx')
+        cache.set('c', 'xxxx')
+        cache.set('huge', 'x' * 11)
+
+        self.assertEqual((cache.get('a'), cache.get('huge')), (None, None))
+        self.assertEqual(cache.stats()['bytes'], 8)
+
+
+class MemoryCacheBackendTest(SimpleTestCase):
+    """Test the Django backend built on TTLCache."""
+
+    def test_values_are_copied_and_add_respects_existing_keys(self):
+        backend = MemoryCacheBackend('test-backend', {'OPTIONS': {'MAX_ENTRIES': 10}})
+        value = {'theaters': ['Cinerama']}
+        backend.set('movie', value, 60)
+        value['theaters'].append('changed')
+
+        self.assertEqual(backend.get('movie'), {'theaters': ['Cinerama']})
+        self.assertFalse(backend.add('movie', {}, 60))
+        self.assertTrue(backend.delete('movie'))
+        self.assertIsNone(backend.get('movie'))
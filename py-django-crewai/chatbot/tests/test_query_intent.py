@@ -0,0 +1,48 @@
+"""
+Tests for query intent extraction and intent-based cache keys.
+"""
+from django.test import SimpleTestCase
+
+from chatbot.services.movie_crew.utils.query_intent import extract_genres, intent_key, parse_intent
+from chatbot.services.movie_crew_optimized_enhanced import query_hash
+
+
+class QueryIntentTest(SimpleTestCase):
+    """Test that differently worded requests for the same movies share a key."""
+
+    def test_rewordings_share_a_key(self):
+        welcome = [{'sender': 'bot', 'content': 'Welcome! What would you like to watch?'}]
+        keys = {
+            query_hash('Sci-fi movies'),
+            query_hash('sci fi movies', welcome),
+            query_hash('Show me some sci-fi movies!', welcome + [{'sender': 'user', 'content': 'hi'}]),
+        }
+        self.assertEqual(len(keys), 1)
+        self.assertEqual(intent_key('90s action comedies'), intent_key('Action comedy from the 90s'))
+
+    def test_different_intents_get_different_keys(self):
+        self.assertNotEqual(intent_key('movies like Inception'), intent_key('movies like Interstellar'))
+        self.assertNotEqual(intent_key('action movies'), intent_key('action movies', first_run_mode=True))
+        self.assertNotEqual(intent_key('comedies'), intent_key('comedies now playing'))
+        self.assertNotEqual(intent_key('comedy but not romance'), intent_key('romance but not comedy'))
+        self.assertNotEqual(intent_key('comedy'), intent_key('anything but not comedy'))
+        self.assertNotEqual(intent_key('movies from 2020'), intent_key('movies after 2020'))
+        self.assertNotEqual(intent_key('best movies of 1994'), intent_key('best movies of 2010'))
+        self.assertNotEqual(intent_key('action movies 1985'), intent_key('action movies 2019'))
+
+    def test_parse_intent(self):
+        intent = parse_intent('Horror films between 1980 and 1989 like The Thing')
+
+        self.assertEqual(intent['include_genres'], [27])
+        self.assertEqual(intent['exclude_genres'], [])
+        self.assertEqual(intent['year_ranges'], [(1980, 1989)])
+        self.assertFalse(intent['now_playing'])
+        self.assertEqual(intent['text'], 'like thing')
+        self.assertEqual(extract_genres('sci-fi thrillers'), [878, 53])
+
+        bare_year = parse_intent('action movies 1985')
+        self.assertEqual((bare_year['year_ranges'], bare_year['text']), ([], '1985'))
+        self.assertEqual(parse_intent('movies from 1990-2000')['text'], '')
+
+        negated = parse_intent('comedy but not romance')
+        self.assertEqual((negated['include_genres'], negated['exclude_genres']), ([35], [10749]))
@@ -0,0 +1,124 @@
+"""
+Tests for the showtime cache and cached First Run responses.
+"""
+import zoneinfo
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from chatbot.services import showtime_cache
+from chatbot.services.serp_service import SerpShowtimeService
+from chatbot.services.showtime_cache import (
+    first_run_ttl, lookup_location_showtimes, lookup_showtimes, prune_past_showtimes,
+    seconds_until_local_midnight, showtime_key
+)
+
+THEATERS = [{'name': 'Cinerama', 'showtimes': [{'start_time': '2026-10-17T19:30:00'}]}]
+
+
+class ShowtimeCacheTest(SimpleTestCase):
+    """Test keying, reuse and stale-while-revalidate."""
+
+    def setUp(self):
+        caches['pipeline'].clear()
+
+    def test_key_normalizes_title_and_location(self):
+        self.assertEqual(showtime_key('Dune: Part Two', 'Seattle,  WA', 'America/Los_Angeles'),
+                         showtime_key('dune part two', 'seattle, wa', 'America/Los_Angeles'))
+        self.assertLessEqual(seconds_until_local_midnight('Asia/Tokyo'), 86400)
+
+    def test_repeat_lookup_is_served_from_cache(self):
+        fetch = mock.Mock(return_value=(THEATERS, True))
+        self.assertEqual(lookup_showtimes(fetch, 'Dune', 'Seattle', 'America/Los_Angeles'), (THEATERS, True))
+        self.assertEqual(lookup_showtimes(fetch, 'dune', 'seattle', 'America/Los_Angeles'), (THEATERS, True))
+        fetch.assert_called_once()
+
+    def test_only_definitive_empty_results_are_cached(self):
+        failed = mock.Mock(return_value=([], False))
+        lookup_showtimes(failed, 'Dune', 'Seattle')
+        lookup_showtimes(failed, 'Dune', 'Seattle')
+        self.assertEqual(failed.call_count, 2)
+
+        empty = mock.Mock(return_value=([], True))
+        lookup_showtimes(empty, 'Dune', 'Seattle')
+        self.assertEqual(lookup_showtimes(empty, 'Dune', 'Seattle'), ([], True))
+        empty.assert_called_once()
+
+    @override_settings(SHOWTIME_CACHE_FRESH_TTL=0)
+    def test_stale_entry_is_served_while_refreshing(self):
+        lookup_showtimes(mock.Mock(return_value=(THEATERS, True)), 'Dune', 'Seattle')
+        refreshed = [{'name': 'Cinerama', 'showtimes': []}]
+        executor = mock.Mock()
+        with mock.patch.object(showtime_cache, 'get_executor', return_value=executor):
+            result = lookup_showtimes(mock.Mock(return_value=(refreshed, True)), 'Dune', 'Seattle')
+        self.assertEqual(result, (THEATERS, True))
+
+        executor.submit.call_args[0][0]()
+        self.assertEqual(lookup_showtimes(mock.Mock(), 'Dune', 'Seattle'), (refreshed, True))
+
+
+class FirstRunResponseTest(SimpleTestCase):
+    """Test pruning and TTLs of cached First Run responses."""
+
+    def _response(self, *start_times):
+        showtimes = [{'start_time': start_time.isoformat()} for start_time in start_times]
+        return {'response': 'Now playing.', 'movies': [
+            {'title': 'Dune', 'theaters': [{'name': 'Cinerama', 'showtimes': showtimes}]}
+        ]}
+
+    def test_past_showtimes_are_pruned(self):
+        now = datetime.now(zoneinfo.ZoneInfo('America/Los_Angeles'))
+        later = now + timedelta(hours=2)
+        pruned = prune_past_showtimes(self._response(now - timedelta(hours=1), later), 'America/Los_Angeles')
+
+        self.assertEqual(pruned['movies'][0]['theaters'][0]['showtimes'], [{'start_time': later.isoformat()}])
+        self.assertIsNone(prune_past_showtimes(self._response(now - timedelta(minutes=5)), 'America/Los_Angeles'))
+
+    @override_settings(FIRST_RUN_CACHE_TTL=1800)
+    def test_ttl_ends_at_the_earliest_upcoming_showtime(self):
+        now = datetime.now(zoneinfo.ZoneInfo('UTC'))
+        with mock.patch.object(showtime_cache, 'seconds_until_local_midnight', return_value=86400):
+            ttl = first_run_ttl(self._response(now + timedelta(minutes=10), now + timedelta(hours=3)), 'UTC')
+            self.assertTrue(590 <= ttl <= 600)
+            self.assertEqual(first_run_ttl(self._response(now + timedelta(hours=3)), 'UTC'), 1800)
+            self.assertEqual(first_run_ttl(self._response(), 'UTC'), 0)
+
+
+class LocationShowtimesTest(SimpleTestCase):
+    """Test that one location-wide listing serves every movie's showtimes."""
+
+    def setUp(self):
+        caches['pipeline'].clear()
+
+    @override_settings(THEATER_SEARCH_RADIUS_MILES=15)
+    def test_listing_is_indexed_by_title_and_cached(self):
+        listing = {'showtimes': [{'day': 'Today', 'theaters': [
+            {'name': 'Cinerama', 'distance': '2.1 mi', 'movies': [
+                {'name': 'Dune: Part Two', 'showing': [{'time': ['7:30pm'], 'type': 'IMAX'}]},
+                {'name': 'Wicked', 'showing': [{'time': ['6:00pm', '9:00pm']}]}
+            ]},
+            {'name': 'Far Away Cinema', 'distance': '40 mi', 'movies': [
+                {'name': 'Wicked', 'showing': [{'time': ['5:00pm']}]}
+            ]}
+        ]}]}
+        service = SerpShowtimeService(api_key='key')
+        search = mock.Mock()
+        search.return_value.get_dict.return_value = listing
+
+        with mock.patch('chatbot.services.serp_service.GoogleSearch', search):
+            for _ in range(2):
+                showtimes_by_title, definitive = lookup_location_showtimes(
+                    lambda: service.fetch_location_showtimes('Seattle', timezone='America/Los_Angeles'),
+                    'Seattle', 'America/Los_Angeles')
+
+        search.assert_called_once()
+        self.assertTrue(definitive)
+        dune = service.showtimes_for_movie(showtimes_by_title, 'Dune Part Two')
+        wicked = service.showtimes_for_movie(showtimes_by_title, 'Wicked')
+        self.assertEqual([theater['name'] for theater in dune], ['Cinerama'])
+        self.assertEqual(dune[0]['showtimes'][0]['format'], 'IMAX')
+        self.assertEqual(len(wicked), 1)
+        self.assertEqual(len(wicked[0]['showtimes']), 2)
+        self.assertEqual(service.showtimes_for_movie(showtimes_by_title, 'Nosferatu'), [])
@@ -0,0 +1,68 @@
+"""
+Tests for single-flight deduplication of crew executions.
+"""
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from chatbot.services.single_flight import SingleFlight, flight_key
+
+
+class SingleFlightTest(SimpleTestCase):
+    """Test that concurrent identical calls share one execution."""
+
+    def test_concurrent_callers_share_execution(self):
+        group = SingleFlight('test')
+        calls = []
+        started = threading.Event()
+
+        def slow_pipeline():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return {'movies': ['Heat']}
+
+        results = []
+
+        def caller():
+            results.append(group.do('key', slow_pipeline))
+
+        leader = threading.Thread(target=caller)
+        leader.start()
+        started.wait()
+        followers = [threading.Thread(target=caller) for _ in range(3)]
+        for thread in followers:
+            thread.start()
+        for thread in [leader] + followers:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([shared for _, shared in results].count(False), 1)
+        self.assertTrue(all(result == {'movies': ['Heat']} for result, _ in results))
+        self.assertEqual(group.stats()['in_flight'], 0)
+
+    def test_errors_propagate_and_key_is_released(self):
+        group = SingleFlight('test')
+
+        def failing():
+            raise RuntimeError('boom')
+
+        with self.assertRaises(RuntimeError):
+            group.do('key', failing)
+        self.assertEqual(group.do('key', lambda: 42), (42, False))
+
+    def test_flight_key_buckets_location(self):
+        history = [{'sender': 'user', 'content': 'action movies'}]
+        self.assertEqual(
+            flight_key('action movies', history, True, 'Seattle,  WA'),
+            flight_key('action movies', history, True, 'seattle, wa')
+        )
+        self.assertNotEqual(
+            flight_key('action movies', history, True, 'Seattle, WA'),
+            flight_key('action movies', history, True, 'Portland, OR')
+        )
+        self.assertEqual(
+            flight_key('action movies', history, False, 'Seattle, WA'),
+            flight_key('action movies', history, False, 'Portland, OR')
+        )
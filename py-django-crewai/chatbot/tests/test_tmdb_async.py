@@ -0,0 +1,73 @@
+"""
+Tests for the async TMDb client and concurrent movie enrichment.
+"""
+import asyncio
+from unittest import mock
+
+import httpx
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from chatbot.services import http_clients, tmdb_service
+from chatbot.services.tmdb_async import AsyncTMDBClient
+from chatbot.services.tmdb_service import TMDBService
+
+
+class AsyncEnrichmentTest(SimpleTestCase):
+    """Test that a batch of movies is enriched concurrently, bounded and cached."""
+
+    def setUp(self):
+        caches['pipeline'].clear()
+        http_clients._session = None
+        self.addCleanup(setattr, http_clients, '_session', None)
+        self.in_flight = 0
+        self.peak = 0
+        self.paths = []
+        self.params = []
+
+    async def handler(self, request):
+        self.paths.append(request.url.path)
+        self.params.append(request.url.params)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.05)
+        self.in_flight -= 1
+        movie_id = int(request.url.path.split('/')[3])
+        return httpx.Response(200, json={
+            'id': movie_id,
+            'vote_average': 7.5,
+            'genres': [{'name': 'Drama'}],
+            'images': {'posters': [{'file_path': f'/{movie_id}-textless.jpg', 'iso_639_1': None},
+                                   {'file_path': f'/{movie_id}.jpg', 'iso_639_1': 'en'}]},
+            'release_dates': {'results': [{'iso_3166_1': 'US', 'release_dates': [{'certification': 'PG-13'}]}]}
+        })
+
+    def enhance(self, client, movies):
+        with mock.patch.object(tmdb_service, 'get_async_client', return_value=client):
+            return TMDBService(api_key='key').enhance_movies_parallel(movies)
+
+    @override_settings(TMDB_ASYNC_CONCURRENCY=3)
+    def test_batch_is_enriched_concurrently_in_order(self):
+        client = AsyncTMDBClient(transport=httpx.MockTransport(self.handler))
+        movies = [{'title': f'Movie {i}', 'tmdb_id': i} for i in range(1, 7)] + [{'title': 'No id'}]
+
+        enhanced = self.enhance(client, movies)
+
+        self.assertEqual([movie['title'] for movie in enhanced], [movie['title'] for movie in movies])
+        self.assertEqual(enhanced[0]['poster_url'], 'https://image.tmdb.org/t/p/original/1.jpg?language=en')
+        self.assertEqual((enhanced[5]['rating'], enhanced[5]['genres']), (7.5, ['Drama']))
+        self.assertEqual(enhanced[5]['certification'], 'PG-13')
+        self.assertNotIn('poster_url', enhanced[6])
+        # One request per movie, never more than three at once
+        self.assertEqual(client.stats()['requests'], 6)
+        self.assertEqual(self.params[0]['append_to_response'], 'images,release_dates')
+        self.assertGreater(self.peak, 1)
+        self.assertLessEqual(self.peak, 3)
+
+    def test_repeat_enrichment_reads_response_cache(self):
+        client = AsyncTMDBClient(transport=httpx.MockTransport(self.handler))
+        self.enhance(client, [{'title': 'Movie', 'tmdb_id': 603}])
+        enhanced = self.enhance(client, [{'title': 'Movie', 'tmdb_id': 603}])
+
+        self.assertEqual(enhanced[0]['poster_url'], 'https://image.tmdb.org/t/p/original/603.jpg?language=en')
+        self.assertEqual(self.paths, ['/3/movie/603'])
@@ -9,6 +9,8 @@ urlpatterns = [
     path('api/poll-first-run-recommendations/', optimization_config.poll_first_run_recommendations, name='poll_first_run_recommendations'),
     path('api/theaters/<int:movie_id>/', optimization_config.get_theaters, name='get_theaters'),
     path('api/theater-status/<int:movie_id>/', optimization_config.theater_status, name='theater_status'),
+    path('api/jobs/<int:job_id>/events/', optimization_config.job_events, name='job_events'),
     path('api/reset/', optimization_config.reset_conversation, name='reset_conversation'),
     path('api/config/', optimization_config.get_api_config, name='get_api_config'),
+    path('api/metrics/', optimization_config.get_metrics, name='get_metrics'),
 ]
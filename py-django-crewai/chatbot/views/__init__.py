@@ -17,7 +17,21 @@ from .theater_views import (
 )
 
 from .api_views import (
-    get_api_config
+    get_api_config,
+    get_metrics
+)
+
+from .async_views import (
+    aget_movie_recommendations,
+    aget_movies_theaters_and_showtimes,
+    apoll_movie_recommendations,
+    apoll_first_run_recommendations,
+    atheater_status,
+    ajob_events
+)
+
+from .event_views import (
+    job_events
 )
 
 from .common_views import (
@@ -40,6 +54,18 @@ __all__ = [
 
     # API views
     'get_api_config',
+    'get_metrics',
+
+    # Async views
+    'aget_movie_recommendations',
+    'aget_movies_theaters_and_showtimes',
+    'apoll_movie_recommendations',
+    'apoll_first_run_recommendations',
+    'atheater_status',
+    'ajob_events',
+
+    # Event views
+    'job_events',
 
     # Common views
     'index',
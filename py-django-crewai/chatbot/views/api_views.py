@@ -9,6 +9,16 @@ import os
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
+from ..services.executors import executor_stats
+from ..services.crew_isolation import isolation_stats
+from ..services.admission import admission_stats, job_queue_stats
+from ..services.cache_backend import cache_stats
+from ..services.catalog_service import catalog_stats
+from ..services.llm_response_cache import LLM_RESPONSE_CACHE
+from ..services.http_clients import http_cache_stats
+from ..services.tmdb_async import async_client_stats
+from ..services.movie_crew_optimized_enhanced import LLM_CACHE
+from ..services.single_flight import PIPELINE_FLIGHTS
 from .common_views import get_client_ip
 
 # Configure logger
@@ -40,6 +50,7 @@ def get_api_config(request):
                 'enableFirstRunMode': settings.FEATURES.get('ENABLE_FIRST_RUN_MODE', True),
                 'showDebugInfo': settings.DEBUG,  # Show debug information in the UI
                 'enableTheaterSearch': True,  # Enable theater search functionality
+                'enableProgressStream': getattr(settings, 'JOB_EVENT_STREAM_ENABLED', False),  # Stream job progress via SSE
             },
 
             # UI configuration
@@ -68,3 +79,31 @@ def get_api_config(request):
             'status': 'error',
             'message': 'Error retrieving API configuration'
         }, status=500)
+
+@csrf_exempt
+def get_metrics(request):
+    """
+    Get runtime metrics for this worker process (threads, executors, shared executions,
+    crew processes, admission, cache hit rates) and the shared job queue depth, for monitoring
+    and autoscaling.
+    """
+    try:
+        metrics = executor_stats()
+        metrics['single_flight'] = PIPELINE_FLIGHTS.stats()
+        metrics['crew_processes'] = isolation_stats()
+        metrics['admission'] = admission_stats()
+        metrics['job_queue'] = job_queue_stats()
+        metrics['cache'] = cache_stats()
+        metrics['cache']['llm'] = LLM_CACHE.stats()
+        metrics['cache']['tmdb_http'] = http_cache_stats()
+        metrics['cache']['llm_responses'] = LLM_RESPONSE_CACHE.stats()
+        metrics['catalog'] = catalog_stats()
+        metrics['tmdb_async'] = async_client_stats()
+        return JsonResponse(metrics)
+
+    except Exception as e:
+        logger.error(f"Error retrieving metrics: {str(e)}")
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Error retrieving metrics'
+        }, status=500)
@@ -0,0 +1,331 @@
+"""
+Async views for the chatbot application.
+These are native async variants of the recommendation, polling and theater status
+endpoints for deployments served by an ASGI server (e.g. uvicorn). Polls are held
+open on the event loop until the job finishes or ASYNC_POLL_WAIT_SECONDS elapses,
+so a single worker can keep many pending polls open without tying up threads.
+"""
+
+import asyncio
+import logging
+import traceback
+import time
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.conf import settings
+from ..models import Conversation, Message, MovieRecommendation, CrewJob
+from ..services.admission import AdmissionRejected, check_job_backlog
+from ..services.job_events import astream_events
+from ..services.job_runner import enqueue_job, ensure_workers
+from ..services.recommendation_store import serialize_saved_theaters
+from .common_views import _parse_request_data, get_client_ip, _busy_response
+from .event_views import SESSION_CONVERSATION_KEYS, _event_stream_response, _last_event_id
+
+# Configure logger
+logger = logging.getLogger('chatbot')
+
+async def _aget_or_create_conversation(request, mode):
+    """Async helper function to get or create a conversation."""
+    session_key = f"{mode}_conversation_id"
+    conversation_id = await request.session.aget(session_key)
+
+    if conversation_id:
+        try:
+            conversation = await Conversation.objects.aget(id=conversation_id)
+            if conversation.mode != mode:
+                conversation.mode = mode
+                await conversation.asave()
+            return conversation
+        except Conversation.DoesNotExist:
+            pass
+
+    logger.info(f"Creating new {mode} conversation")
+    conversation = await Conversation.objects.acreate(mode=mode)
+    await request.session.aset(session_key, conversation.id)
+    return conversation
+
+async def _aget_pending_job(request, mode):
+    """Async helper function to find the crew job a poll refers to."""
+    job_id = request.GET.get('job_id') or await request.session.aget(f"{mode}_job_id")
+    conversation_id = await request.session.aget(f"{mode}_conversation_id")
+    if not job_id or not conversation_id:
+        return None
+
+    try:
+        return await CrewJob.objects.aget(id=job_id, mode=mode, conversation_id=conversation_id)
+    except (CrewJob.DoesNotExist, ValueError):
+        logger.warning(f"No {mode} job found with ID: {job_id}")
+        return None
+
+async def _await_job(job):
+    """Hold the poll open until the job has a result or the configured wait elapses."""
+    wait_seconds = getattr(settings, 'ASYNC_POLL_WAIT_SECONDS', 20)
+    interval = getattr(settings, 'ASYNC_POLL_INTERVAL', 1.0)
+    deadline = time.monotonic() + wait_seconds
+
+    while not job.is_finished and not job.result and time.monotonic() < deadline:
+        await asyncio.sleep(interval)
+        job = await CrewJob.objects.aget(pk=job.pk)
+    return job
+
+async def _ajob_poll_response(request, job, mode):
+    """Async helper function to build the poll response for a crew job."""
+    if not job.is_finished:
+        if job.result:
+            # Recommendations published while theaters are still being found
+            return JsonResponse({**job.result, 'conversation_id': job.conversation_id, 'job_id': job.id})
+        return JsonResponse({
+            'status': 'processing',
+            'message': 'Your movie recommendations are still being processed. Please wait a moment.',
+            'conversation_id': job.conversation_id,
+            'job_id': job.id
+        })
+
+    # The job is done, so the session no longer needs to track it
+    session_key = f"{mode}_job_id"
+    if await request.session.aget(session_key) == job.id:
+        await request.session.apop(session_key)
+
+    if job.status == CrewJob.STATUS_FAILED:
+        return JsonResponse(job.result or {
+            'status': 'error',
+            'message': 'An error occurred while processing your request.'
+        }, status=500)
+
+    return JsonResponse(job.result)
+
+async def _aenqueue(request, mode, data, first_run_mode):
+    """Save the user message, queue the crew job and return the processing response."""
+    # Turn the request away early if the job queue of this lane is already full
+    try:
+        await sync_to_async(check_job_backlog)(mode)
+    except AdmissionRejected as rejected:
+        return _busy_response(rejected)
+
+    conversation = await _aget_or_create_conversation(request, mode)
+
+    user_message_text = (
+        data.get('message') or
+        data.get('text') or
+        data.get('query') or
+        ''
+    )
+    await Message.objects.acreate(
+        conversation=conversation,
+        sender='user',
+        content=user_message_text
+    )
+
+    if first_run_mode:
+        location = (
+            data.get('location') or
+            data.get('city') or
+            data.get('loc') or
+            await request.session.aget('user_location') or
+            'Unknown'
+        )
+        timezone_str = (
+            data.get('timezone') or
+            await request.session.aget('user_timezone') or
+            'America/Los_Angeles'
+        )
+        # Remember the location for later theater lookups
+        await request.session.aset('user_location', location)
+        await request.session.aset('user_timezone', timezone_str)
+        user_ip = get_client_ip(request)
+    else:
+        location = ''
+        timezone_str = await request.session.aget('user_timezone')
+        user_ip = ''
+
+    # Queue the crew execution; polls only read the job state
+    job = await sync_to_async(enqueue_job)(
+        conversation=conversation,
+        query=user_message_text,
+        first_run_mode=first_run_mode,
+        user_location=location,
+        user_ip=user_ip,
+        timezone_str=timezone_str
+    )
+    if job.is_finished:
+        # Served from cache in the fast lane, so there is nothing to poll for
+        return JsonResponse({**job.result, 'conversation_id': conversation.id, 'job_id': job.id})
+    await request.session.aset(f"{mode}_job_id", job.id)
+
+    return JsonResponse({
+        'status': 'processing',
+        'message': 'Your movie recommendations are being processed. Please wait a moment.',
+        'conversation_id': conversation.id,
+        'job_id': job.id
+    })
+
+@csrf_exempt
+async def aget_movie_recommendations(request):
+    """Async variant of get_movie_recommendations (Casual Viewing mode)."""
+    if request.method != 'POST':
+        return JsonResponse({
+            'status': 'error',
+            'message': 'This endpoint only accepts POST requests'
+        }, status=405)
+
+    try:
+        logger.info("=== Processing Casual Viewing mode request for movie recommendations (async) ===")
+        data = _parse_request_data(request)
+        return await _aenqueue(request, 'casual', data, first_run_mode=False)
+
+    except Exception as e:
+        logger.error(f"Error initiating movie recommendation request: {str(e)}")
+        logger.error(traceback.format_exc())
+        return JsonResponse({
+            'status': 'error',
+            'message': 'An error occurred while processing your request.'
+        }, status=500)
+
+@csrf_exempt
+async def aget_movies_theaters_and_showtimes(request):
+    """Async variant of get_movies_theaters_and_showtimes (First Run mode)."""
+    if request.method != 'POST':
+        return JsonResponse({
+            'status': 'error',
+            'message': 'This endpoint only accepts POST requests'
+        }, status=405)
+
+    # Check if First Run mode is enabled via feature flag
+    if not settings.FEATURES.get('ENABLE_FIRST_RUN_MODE', True):
+        logger.warning("First Run mode is disabled but endpoint was accessed")
+        return JsonResponse({
+            'status': 'error',
+            'message': 'First Run mode is currently disabled. Please use Casual Viewing mode instead.'
+        }, status=400)
+
+    try:
+        logger.info("=== Processing First Run mode request for movies, theaters, and showtimes (async) ===")
+        data = _parse_request_data(request)
+        return await _aenqueue(request, 'first_run', data, first_run_mode=True)
+
+    except Exception as e:
+        logger.error(f"Error initiating first run movie recommendation request: {str(e)}")
+        logger.error(traceback.format_exc())
+        return JsonResponse({
+            'status': 'error',
+            'message': 'An error occurred while processing your request.'
+        }, status=500)
+
+async def _apoll(request, mode, not_found_message):
+    """Shared implementation of the async poll endpoints."""
+    if request.method != 'GET':
+        return JsonResponse({
+            'status': 'error',
+            'message': 'This endpoint only accepts GET requests'
+        }, status=405)
+
+    try:
+        job = await _aget_pending_job(request, mode)
+        if job is None:
+            return JsonResponse({
+                'status': 'error',
+                'message': not_found_message
+            }, status=404)
+
+        # Make sure this process can pick up jobs left pending by a restart
+        await sync_to_async(ensure_workers)()
+
+        job = await _await_job(job)
+        logger.info(f"{mode} job {job.id} is {job.status}")
+        return await _ajob_poll_response(request, job, mode)
+
+    except Exception as e:
+        logger.error(f"Error processing {mode} movie recommendation poll: {str(e)}")
+        logger.error(traceback.format_exc())
+        return JsonResponse({
+            'status': 'error',
+            'message': 'An error occurred while processing your request.'
+        }, status=500)
+
+@csrf_exempt
+async def apoll_movie_recommendations(request):
+    """Async variant of poll_movie_recommendations that holds the poll until the job finishes."""
+    return await _apoll(request, 'casual', 'No pending movie recommendation request found.')
+
+@csrf_exempt
+async def apoll_first_run_recommendations(request):
+    """Async variant of poll_first_run_recommendations that holds the poll until the job finishes."""
+    return await _apoll(request, 'first_run', 'No pending first run movie request found.')
+
+@csrf_exempt
+async def atheater_status(request, movie_id):
+    """Async variant of theater_status."""
+    if request.method != 'GET':
+        return JsonResponse({
+            'status': 'error',
+            'message': 'This endpoint only accepts GET requests'
+        }, status=405)
+
+    try:
+        try:
+            movie = await MovieRecommendation.objects.aget(id=movie_id)
+        except MovieRecommendation.DoesNotExist:
+            logger.error(f"Movie with ID {movie_id} not found")
+            return JsonResponse({
+                'status': 'error',
+                'message': f'Movie with ID {movie_id} not found'
+            }, status=404)
+
+        theater_data = await sync_to_async(serialize_saved_theaters)(movie)
+        if not theater_data and not movie.theaters_ready:
+            return JsonResponse({
+                'status': 'processing',
+                'message': f'Still searching for theaters for {movie.title}...'
+            })
+
+        return JsonResponse({
+            'status': 'success',
+            'movie_id': movie_id,
+            'movie_title': movie.title,
+            'theaters': theater_data
+        })
+
+    except Exception as e:
+        logger.error(f"Error checking theater status: {str(e)}")
+        logger.error(traceback.format_exc())
+        return JsonResponse({
+            'status': 'error',
+            'message': 'An error occurred while checking theater status'
+        }, status=500)
+
+@csrf_exempt
+async def ajob_events(request, job_id):
+    """Async variant of job_events that streams without holding a thread."""
+    if request.method != 'GET':
+        return JsonResponse({
+            'status': 'error',
+            'message': 'This endpoint only accepts GET requests'
+        }, status=405)
+
+    if not getattr(settings, 'JOB_EVENT_STREAM_ENABLED', False):
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Progress streaming is disabled. Please poll for results instead.'
+        }, status=404)
+
+    try:
+        # Jobs are only visible to the conversations in this session
+        conversation_ids = [await request.session.aget(key) for key in SESSION_CONVERSATION_KEYS]
+        if not await CrewJob.objects.filter(id=job_id, conversation_id__in=[cid for cid in conversation_ids if cid]).aexists():
+            logger.warning(f"No job found with ID: {job_id}")
+            return JsonResponse({
+                'status': 'error',
+                'message': f'Job with ID {job_id} not found'
+            }, status=404)
+
+        logger.info(f"Streaming events for job {job_id} (async)")
+        return _event_stream_response(astream_events(job_id, _last_event_id(request)))
+
+    except Exception as e:
+        logger.error(f"Error streaming job events: {str(e)}")
+        logger.error(traceback.format_exc())
+        return JsonResponse({
+            'status': 'error',
+            'message': 'An error occurred while streaming job progress'
+        }, status=500)
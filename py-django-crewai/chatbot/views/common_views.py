@@ -5,10 +5,11 @@ This module provides shared functions used across various views.
 
 import json
 import logging
+from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from django.conf import settings
 from django.utils import timezone
-from ..models import Conversation, Message
+from ..models import Conversation, Message, CrewJob
 
 # Configure logger
 logger = logging.getLogger('chatbot')
@@ -148,3 +149,57 @@ def _get_or_create_conversation(request, mode):
             request.session[session_key] = conversation.id
 
     return conversation
+
+def _busy_response(rejected):
+    """Helper function to build the 429 response for a request turned away at capacity."""
+    response = JsonResponse({
+        'status': 'error',
+        'message': 'We are handling a lot of requests right now. Please try again in a moment.',
+        'retry_after': rejected.retry_after
+    }, status=429)
+    response['Retry-After'] = str(rejected.retry_after)
+    return response
+
+def _get_pending_job(request, mode):
+    """
+    Helper function to find the crew job a poll refers to.
+
+    The job ID is taken from the `job_id` query parameter when present, falling
+    back to the session. Jobs are only visible to the conversation that owns them.
+    """
+    job_id = request.GET.get('job_id') or request.session.get(f"{mode}_job_id")
+    conversation_id = request.session.get(f"{mode}_conversation_id")
+    if not job_id or not conversation_id:
+        return None
+
+    try:
+        return CrewJob.objects.get(id=job_id, mode=mode, conversation_id=conversation_id)
+    except (CrewJob.DoesNotExist, ValueError):
+        logger.warning(f"No {mode} job found with ID: {job_id}")
+        return None
+
+def _job_poll_response(request, job, mode):
+    """Helper function to build the poll response for a crew job."""
+    if not job.is_finished:
+        if job.result:
+            # Recommendations published while theaters are still being found
+            return JsonResponse({**job.result, 'conversation_id': job.conversation_id, 'job_id': job.id})
+        return JsonResponse({
+            'status': 'processing',
+            'message': 'Your movie recommendations are still being processed. Please wait a moment.',
+            'conversation_id': job.conversation_id,
+            'job_id': job.id
+        })
+
+    # The job is done, so the session no longer needs to track it
+    session_key = f"{mode}_job_id"
+    if request.session.get(session_key) == job.id:
+        del request.session[session_key]
+
+    if job.status == CrewJob.STATUS_FAILED:
+        return JsonResponse(job.result or {
+            'status': 'error',
+            'message': 'An error occurred while processing your request.'
+        }, status=500)
+
+    return JsonResponse(job.result)
@@ -0,0 +1,70 @@
+"""
+Job event views for the chatbot application.
+This module streams crew job progress to the browser as Server-Sent Events,
+replacing repeated polling of the poll_* and theater_status endpoints.
+"""
+
+import logging
+import traceback
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.conf import settings
+from ..models import CrewJob
+from ..services.job_events import stream_events
+
+# Configure logger
+logger = logging.getLogger('chatbot')
+
+SESSION_CONVERSATION_KEYS = ('casual_conversation_id', 'first_run_conversation_id')
+
+def _last_event_id(request):
+    """Helper function to read the ID of the last event the client received."""
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id') or 0
+    try:
+        return int(last_event_id)
+    except (TypeError, ValueError):
+        return 0
+
+def _event_stream_response(events):
+    """Helper function to wrap an event iterator in an SSE response."""
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx-style proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@csrf_exempt
+def job_events(request, job_id):
+    """Stream progress events for a crew job as Server-Sent Events."""
+    if request.method != 'GET':
+        return JsonResponse({
+            'status': 'error',
+            'message': 'This endpoint only accepts GET requests'
+        }, status=405)
+
+    if not getattr(settings, 'JOB_EVENT_STREAM_ENABLED', False):
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Progress streaming is disabled. Please poll for results instead.'
+        }, status=404)
+
+    try:
+        # Jobs are only visible to the conversations in this session
+        conversation_ids = [request.session.get(key) for key in SESSION_CONVERSATION_KEYS]
+        if not CrewJob.objects.filter(id=job_id, conversation_id__in=[cid for cid in conversation_ids if cid]).exists():
+            logger.warning(f"No job found with ID: {job_id}")
+            return JsonResponse({
+                'status': 'error',
+                'message': f'Job with ID {job_id} not found'
+            }, status=404)
+
+        logger.info(f"Streaming events for job {job_id}")
+        return _event_stream_response(stream_events(job_id, _last_event_id(request)))
+
+    except Exception as e:
+        logger.error(f"Error streaming job events: {str(e)}")
+        logger.error(traceback.format_exc())
+        return JsonResponse({
+            'status': 'error',
+            'message': 'An error occurred while streaming job progress'
+        }, status=500)
@@ -13,7 +13,9 @@ from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
 from django.utils import timezone
 from ..models import Conversation, Message, MovieRecommendation, Theater, Showtime
-from .common_views import _parse_request_data, _get_or_create_conversation, get_client_ip
+from ..services.admission import LANE_FIRST_RUN, AdmissionRejected, check_job_backlog
+from ..services.job_runner import enqueue_job
+from .common_views import _parse_request_data, _get_or_create_conversation, get_client_ip, _busy_response
 
 # Configure logger
 logger = logging.getLogger('chatbot')
@@ -39,6 +41,9 @@ def get_movies_theaters_and_showtimes(request):
         logger.info("=== Processing First Run mode request for movies, theaters, and showtimes ===")
         start_time = time.time()
 
+        # Turn the request away early if the first run job queue is already full
+        check_job_backlog(LANE_FIRST_RUN)
+
         # Parse the request data
         data = _parse_request_data(request)
         conversation = _get_or_create_conversation(request, 'first_run')
@@ -70,23 +75,40 @@ def get_movies_theaters_and_showtimes(request):
             content=user_message_text
         )
 
-        # Store the query in the session for polling
-        request.session['first_run_query'] = user_message_text
+        # Remember the location for later theater lookups
         request.session['user_location'] = location
         request.session['user_timezone'] = timezone_str
-        request.session['first_run_query_timestamp'] = timezone.now().isoformat()
+
+        # Queue the crew execution; polls only read the job state
+        job = enqueue_job(
+            conversation=conversation,
+            query=user_message_text,
+            first_run_mode=True,
+            user_location=location,
+            user_ip=get_client_ip(request),
+            timezone_str=timezone_str
+        )
 
         # Measure request processing time
         processing_time = time.time() - start_time
         logger.info(f"Request processing took {processing_time:.2f}s")
 
+        if job.is_finished:
+            # Served from cache in the fast lane, so there is nothing to poll for
+            return JsonResponse({**job.result, 'conversation_id': conversation.id, 'job_id': job.id})
+        request.session['first_run_job_id'] = job.id
+
         # Return a processing status to enable polling
         return JsonResponse({
             'status': 'processing',
             'message': 'Your movie recommendations are being processed. Please wait a moment.',
-            'conversation_id': conversation.id
+            'conversation_id': conversation.id,
+            'job_id': job.id
         })
 
+    except AdmissionRejected as rejected:
+        return _busy_response(rejected)
+
     except Exception as e:
         logger.error(f"Error initiating first run movie recommendation request: {str(e)}")
         logger.error(traceback.format_exc())
@@ -172,6 +194,15 @@ def get_theaters(request, movie_id):
                 'movie_title': movie.title,
                 'theaters': theater_data
             })
+        elif movie.theaters_ready:
+            # The theater search for this movie finished without finding showtimes
+            logger.info(f"No theaters found for {movie.title}")
+            return JsonResponse({
+                'status': 'success',
+                'movie_id': movie_id,
+                'movie_title': movie.title,
+                'theaters': []
+            })
         else:
             # Return processing status to trigger polling
             logger.info(f"No showtimes found for {movie.title}, returning processing status")
@@ -257,6 +288,14 @@ def theater_status(request, movie_id):
                 'movie_title': movie.title,
                 'theaters': theater_data
             })
+        elif movie.theaters_ready:
+            # The theater search for this movie finished without finding showtimes
+            return JsonResponse({
+                'status': 'success',
+                'movie_id': movie_id,
+                'movie_title': movie.title,
+                'theaters': []
+            })
         else:
             # If no showtimes yet, return processing status
             return JsonResponse({
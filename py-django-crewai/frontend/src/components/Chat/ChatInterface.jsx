@@ -1,7 +1,6 @@
 import React, { useState, useRef, useEffect, useCallback } from 'react';
 import { useAppContext } from '../../context/AppContext';
 import { chatApi } from '../../services/api';
-import { getConfig } from '../../config';
 import { useLocation } from '../../hooks/useLocation';
 import MessageList from './MessageList';
 import InputArea from './InputArea';
@@ -133,71 +132,10 @@ function ChatInterface() {
 
             setMessages([...currentMessages, userMessage, processingMessage]);
 
-            // Get configuration values
-            const config = getConfig();
-
-            // Start polling with exponential backoff
-            let attempts = 0;
-            const maxAttempts = config.apiMaxRetries; // Use value from config
-            const initialPollInterval = 2000; // 2 seconds
-
-            const poll = async () => {
-              if (attempts >= maxAttempts) {
-                console.log(`Max polling attempts (${maxAttempts}) reached`);
-                throw {
-                  status: 'error',
-                  message: 'It\'s taking longer than expected to get your recommendations. Please try again.'
-                };
-              }
-
-              attempts++;
-              const backoffFactor = Math.min(attempts, 5); // Cap the backoff factor
-              const pollInterval = initialPollInterval * Math.pow(config.apiRetryBackoffFactor, backoffFactor - 1);
-
-              console.log(`Polling attempt ${attempts}/${maxAttempts} (interval: ${pollInterval}ms)`);
-
-              try {
-                const pollResponse = await chatApi.pollFirstRunRecommendations();
-
-                if (pollResponse.status === 'success' && pollResponse.recommendations) {
-                  console.log('Polling successful, found first run recommendations');
-                  // Replace the processing message with the actual response
-                  response = pollResponse;
-                  return; // Exit polling once we get results
-                } else if (pollResponse.status === 'processing') {
-                  // Continue polling
-                  setTimeout(poll, pollInterval);
-                } else {
-                  console.log('Polling returned unexpected status:', pollResponse.status);
-                  throw {
-                    status: 'error',
-                    message: 'Failed to get movie recommendations. Please try again.'
-                  };
-                }
-              } catch (pollError) {
-                console.error('Error while polling for first run recommendations:', pollError);
-
-                // Check if we've reached max attempts
-                if (attempts >= maxAttempts - 1) {
-                  throw pollError;
-                }
-
-                // For network errors, retry with exponential backoff
-                if (!pollError.response) {
-                  console.log(`Network error during polling, will retry (attempt ${attempts + 1}/${maxAttempts})`);
-                  setTimeout(poll, pollInterval * 2); // Double the interval for network errors
-                } else {
-                  throw pollError;
-                }
-              }
-            };
-
-            // Start polling
-            try {
-              await poll();
-            } catch (pollError) {
-              throw pollError;
-            }
+            // Wait for the job, streaming progress when available and polling otherwise
+            response = await chatApi.waitForJob(response.job_id, 'first_run', (event, data) => {
+              console.log(`Job progress: ${event}`, data);
+            });
           }
         } else {
           console.log('Using Casual Viewing mode API');
@@ -218,71 +156,10 @@ function ChatInterface() {
 
             setMessages([...currentMessages, userMessage, processingMessage]);
 
-            // Get configuration values
-            const config = getConfig();
-
-            // Start polling with exponential backoff
-            let attempts = 0;
-            const maxAttempts = config.apiMaxRetries; // Use value from config
-            const initialPollInterval = 2000; // 2 seconds
-
-            const poll = async () => {
-              if (attempts >= maxAttempts) {
-                console.log(`Max polling attempts (${maxAttempts}) reached`);
-                throw {
-                  status: 'error',
-                  message: 'It\'s taking longer than expected to get your recommendations. Please try again.'
-                };
-              }
-
-              attempts++;
-              const backoffFactor = Math.min(attempts, 5); // Cap the backoff factor
-              const pollInterval = initialPollInterval * Math.pow(config.apiRetryBackoffFactor, backoffFactor - 1);
-
-              console.log(`Polling attempt ${attempts}/${maxAttempts} (interval: ${pollInterval}ms)`);
-
-              try {
-                const pollResponse = await chatApi.pollMovieRecommendations();
-
-                if (pollResponse.status === 'success' && pollResponse.recommendations) {
-                  console.log('Polling successful, found recommendations');
-                  // Replace the processing message with the actual response
-                  response = pollResponse;
-                  return; // Exit polling once we get results
-                } else if (pollResponse.status === 'processing') {
-                  // Continue polling
-                  setTimeout(poll, pollInterval);
-                } else {
-                  console.log('Polling returned unexpected status:', pollResponse.status);
-                  throw {
-                    status: 'error',
-                    message: 'Failed to get movie recommendations. Please try again.'
-                  };
-                }
-              } catch (pollError) {
-                console.error('Error while polling for recommendations:', pollError);
-
-                // Check if we've reached max attempts
-                if (attempts >= maxAttempts - 1) {
-                  throw pollError;
-                }
-
-                // For network errors, retry with exponential backoff
-                if (!pollError.response) {
-                  console.log(`Network error during polling, will retry (attempt ${attempts + 1}/${maxAttempts})`);
-                  setTimeout(poll, pollInterval * 2); // Double the interval for network errors
-                } else {
-                  throw pollError;
-                }
-              }
-            };
-
-            // Start polling
-            try {
-              await poll();
-            } catch (pollError) {
-              throw pollError;
-            }
+            // Wait for the job, streaming progress when available and polling otherwise
+            response = await chatApi.waitForJob(response.job_id, 'casual', (event, data) => {
+              console.log(`Job progress: ${event}`, data);
+            });
           }
         }
 
@@ -306,7 +183,11 @@ function ChatInterface() {
       let botContent = response.message;
       if (isFirstRunMode && response.recommendations) {
         const movieTheaterCounts = response.recommendations.map(movie => {
-          const theaterCount = movie.theaters ? movie.theaters.length : 0;
+          // Theaters for this movie are still being found
+          if (movie.theaters === undefined) {
+            return `${movie.title}: Finding theaters...`;
+          }
+          const theaterCount = movie.theaters.length;
           return `${movie.title}: Available at ${theaterCount} theater${theaterCount === 1 ? '' : 's'}`;
         }).join('\n');
 
@@ -207,7 +207,7 @@ function TheaterSection() {
             )
           );
         }
-      }, 15 * 1000); // 15 seconds max polling (reduced from 30 seconds)
+      }, 60 * 1000); // 60 seconds max polling, theaters are filled in while the crew finishes
     }, 500);
 
     // Cleanup function
@@ -44,6 +44,16 @@ api.interceptors.response.use(
       });
     }
 
+    // Handle backpressure: the server is at capacity and says when to retry
+    if (error.response.status === 429) {
+      const retryAfter = Number(error.response.headers['retry-after']) || null;
+      return Promise.reject({
+        status: 'error',
+        message: error.response.data.message || 'The server is busy. Please try again in a moment.',
+        retryAfter
+      });
+    }
+
     // Handle server errors
     if (error.response.status >= 500) {
       console.error('Server error:', error);
@@ -101,6 +111,76 @@ const cache = {
   }
 };
 
+// Events streamed for a crew job before it finishes
+const JOB_PROGRESS_EVENTS = ['queued', 'started', 'crew_started', 'task_finished', 'recommendations_ready', 'theaters_ready'];
+
+// Stream job progress via Server-Sent Events, resolving with the final result
+const streamJob = (jobId, onProgress) => new Promise((resolve, reject) => {
+  const source = new EventSource(`/api/jobs/${jobId}/events/`);
+  let settled = false;
+
+  const finish = (callback, value) => {
+    settled = true;
+    source.close();
+    callback(value);
+  };
+
+  JOB_PROGRESS_EVENTS.forEach(eventName => {
+    source.addEventListener(eventName, event => {
+      if (onProgress) {
+        onProgress(eventName, JSON.parse(event.data));
+      }
+    });
+  });
+
+  // In First Run mode recommendations arrive before theaters, which the theater section fetches per movie
+  source.addEventListener('recommendations_ready', event => {
+    const data = JSON.parse(event.data);
+    if (data.recommendations) {
+      finish(resolve, data);
+    }
+  });
+  source.addEventListener('succeeded', event => finish(resolve, JSON.parse(event.data)));
+  source.addEventListener('failed', event => {
+    const data = JSON.parse(event.data);
+    finish(reject, {
+      status: 'error',
+      message: data.message || 'Failed to get movie recommendations. Please try again.'
+    });
+  });
+
+  // The browser reconnects on its own after a dropped connection; a closed
+  // source means the stream could not be opened at all
+  source.onerror = () => {
+    if (!settled && source.readyState === EventSource.CLOSED) {
+      finish(reject, { status: 'stream_unavailable' });
+    }
+  };
+});
+
+// Poll for the job result with exponential backoff
+const pollJob = async (pollFn, jobId) => {
+  const config = getConfig();
+  const initialPollInterval = 2000; // 2 seconds
+
+  for (let attempt = 1; attempt <= config.apiMaxRetries; attempt++) {
+    const response = await pollFn(jobId);
+    if (response.status === 'success') {
+      return response;
+    }
+
+    const backoffFactor = Math.min(attempt, 5); // Cap the backoff factor
+    const pollInterval = initialPollInterval * Math.pow(config.apiRetryBackoffFactor, backoffFactor - 1);
+    console.log(`Polling attempt ${attempt}/${config.apiMaxRetries} (interval: ${pollInterval}ms)`);
+    await new Promise(resolve => setTimeout(resolve, pollInterval));
+  }
+
+  throw {
+    status: 'error',
+    message: 'It\'s taking longer than expected to get your recommendations. Please try again.'
+  };
+};
+
 // API service functions
 export const chatApi = {
   getMoviesTheatersAndShowtimes: async (message, location = '') => {
@@ -137,7 +217,8 @@ export const chatApi = {
         return {
           status: 'processing',
           message: response.data.message || 'Processing your movie recommendations and theaters...',
-          conversation_id: response.data.conversation_id
+          conversation_id: response.data.conversation_id,
+          job_id: response.data.job_id
         };
       }
 
@@ -199,7 +280,8 @@ export const chatApi = {
         return {
           status: 'processing',
           message: response.data.message || 'Processing your movie recommendations...',
-          conversation_id: response.data.conversation_id
+          conversation_id: response.data.conversation_id,
+          job_id: response.data.job_id
         };
       }
 
@@ -215,10 +297,12 @@ export const chatApi = {
   },
 
   // Method for polling movie recommendation status
-  pollMovieRecommendations: async () => {
+  pollMovieRecommendations: async (jobId) => {
     try {
       console.log('Polling for movie recommendations...');
-      const response = await api.get('/api/poll-movie-recommendations/');
+      const response = await api.get('/api/poll-movie-recommendations/', {
+        params: jobId ? { job_id: jobId } : undefined
+      });
 
       // If the processing is complete, return the results
       if (response.data.status === 'success' && response.data.recommendations) {
@@ -242,10 +326,12 @@ export const chatApi = {
   },
 
   // Method for polling first run movie recommendations
-  pollFirstRunRecommendations: async () => {
+  pollFirstRunRecommendations: async (jobId) => {
     try {
       console.log('Polling for first run movie recommendations...');
-      const response = await api.get('/api/poll-first-run-recommendations/');
+      const response = await api.get('/api/poll-first-run-recommendations/', {
+        params: jobId ? { job_id: jobId } : undefined
+      });
 
       // If the processing is complete, return the results
       if (response.data.status === 'success' && response.data.recommendations) {
@@ -268,6 +354,42 @@ export const chatApi = {
     }
   },
 
+  // Wait for a crew job to finish, streaming progress when enabled and polling otherwise
+  waitForJob: async (jobId, mode, onProgress) => {
+    const pollFn = mode === 'first_run' ? chatApi.pollFirstRunRecommendations : chatApi.pollMovieRecommendations;
+    let result;
+
+    if (getConfig().features.enableProgressStream && typeof EventSource !== 'undefined') {
+      try {
+        console.log(`Streaming progress for job ${jobId}...`);
+        result = await streamJob(jobId, onProgress);
+      } catch (error) {
+        if (error.status !== 'stream_unavailable') {
+          throw error;
+        }
+        console.log('Progress stream unavailable, falling back to polling');
+      }
+    }
+
+    if (!result) {
+      result = await pollJob(pollFn, jobId);
+    }
+
+    // Cache theaters for each movie so the theater section does not need to poll
+    if (result.recommendations) {
+      result.recommendations.forEach(movie => {
+        if (movie.theaters && movie.theaters.length > 0) {
+          cache.set(movie.id, {
+            status: 'success',
+            theaters: movie.theaters
+          });
+        }
+      });
+    }
+
+    return result;
+  },
+
   getTheaters: async (movieId) => {
     try {
       console.log(`Fetching theaters for movie ID: ${movieId}`);
@@ -39,6 +39,7 @@ try:
     from .apps import * # noqa
     from .templates import * # noqa
     from .database import * # noqa
+    from .cache import * # noqa
     from .static import * # noqa
     from .logging_config import * # noqa
     from .external_apis import * # noqa
@@ -40,3 +40,158 @@ SERPAPI_MAX_RETRIES = config_loader.get_int_config('SERPAPI_MAX_RETRIES', 2)  #
 SERPAPI_BASE_RETRY_DELAY = config_loader.get_float_config('SERPAPI_BASE_RETRY_DELAY', 3.0)  # Reduced from 5.0 to 3.0
 # Multiplier for exponential backoff during retries
 SERPAPI_RETRY_MULTIPLIER = config_loader.get_float_config('SERPAPI_RETRY_MULTIPLIER', 1.5)  # Reduced from 2.0 to 1.5
+# 'per_movie' searches showtimes once per movie, 'location' once per location for all movies
+SERPAPI_SHOWTIME_MODE = config_loader.get_config('SERPAPI_SHOWTIME_MODE', 'per_movie')
+
+
+# --- Background Job Configuration ---
+
+# Where crew jobs run: 'thread' starts worker threads inside each web process,
+# 'external' leaves them to `python manage.py run_crew_worker`
+CREW_JOB_WORKER_MODE = config_loader.get_config('CREW_JOB_WORKER_MODE', 'thread')
+# Number of worker threads per process that run jobs from all lanes, casual jobs first
+CREW_JOB_WORKER_THREADS = config_loader.get_int_config('CREW_JOB_WORKER_THREADS', 2)
+# Number of additional worker threads per process that only run casual jobs
+CREW_JOB_CASUAL_WORKER_THREADS = config_loader.get_int_config('CREW_JOB_CASUAL_WORKER_THREADS', 1)
+# Seconds an idle worker waits before checking the job table again
+CREW_JOB_POLL_INTERVAL = config_loader.get_float_config('CREW_JOB_POLL_INTERVAL', 1.0)
+# Seconds after which a running job is assumed lost (e.g. its worker was restarted)
+CREW_JOB_STALE_SECONDS = config_loader.get_int_config('CREW_JOB_STALE_SECONDS', 900)
+# Maximum attempts for a job before it is marked failed
+CREW_JOB_MAX_ATTEMPTS = config_loader.get_int_config('CREW_JOB_MAX_ATTEMPTS', 2)
+# Share one crew execution between identical queries that are in flight at the same time
+SINGLE_FLIGHT_ENABLED = config_loader.get_bool_config('SINGLE_FLIGHT_ENABLED', True)
+
+
+# --- Execution Pool Configuration ---
+
+# Threads in the shared pool that runs crew kickoffs and result processing (per process)
+PIPELINE_EXECUTOR_WORKERS = config_loader.get_int_config('PIPELINE_EXECUTOR_WORKERS', 4)
+# Threads in the shared pool for external API fan-out such as showtime and image lookups (per process)
+IO_EXECUTOR_WORKERS = config_loader.get_int_config('IO_EXECUTOR_WORKERS', 8)
+# Maximum seconds to wait for a crew kickoff to finish; the timed-out run is cancelled
+CREW_EXECUTION_TIMEOUT = config_loader.get_int_config('CREW_EXECUTION_TIMEOUT', 180)
+
+# --- Crew Isolation Configuration ---
+
+# Where crew runs execute: 'thread' (cooperative cancellation) or 'process' (killable worker processes)
+CREW_EXECUTION_ISOLATION = config_loader.get_config('CREW_EXECUTION_ISOLATION', 'thread')
+# Worker processes per web process when CREW_EXECUTION_ISOLATION is 'process'
+CREW_PROCESS_WORKERS = config_loader.get_int_config('CREW_PROCESS_WORKERS', 2)
+# Extra seconds after CREW_EXECUTION_TIMEOUT before a worker process is terminated
+CREW_PROCESS_KILL_GRACE = config_loader.get_int_config('CREW_PROCESS_KILL_GRACE', 30)
+
+# --- Admission Control Configuration ---
+
+# Maximum Casual Viewing crew executions running at once in each process
+CREW_CASUAL_MAX_IN_FLIGHT = config_loader.get_int_config('CREW_CASUAL_MAX_IN_FLIGHT', 2)
+# Maximum First Run crew executions running at once in each process
+CREW_FIRST_RUN_MAX_IN_FLIGHT = config_loader.get_int_config('CREW_FIRST_RUN_MAX_IN_FLIGHT', 2)
+# Maximum crew executions waiting for a slot in each process
+CREW_ADMISSION_QUEUE_SIZE = config_loader.get_int_config('CREW_ADMISSION_QUEUE_SIZE', 8)
+# Maximum seconds a crew execution waits for a slot before it is turned away
+CREW_ADMISSION_MAX_WAIT = config_loader.get_int_config('CREW_ADMISSION_MAX_WAIT', 30)
+# Pending jobs at which new requests get a 429 response (0 disables the limit)
+CREW_JOB_MAX_PENDING = config_loader.get_int_config('CREW_JOB_MAX_PENDING', 50)
+# Retry-After seconds sent with a 429 before any crew run times are known
+CREW_ADMISSION_RETRY_AFTER = config_loader.get_int_config('CREW_ADMISSION_RETRY_AFTER', 15)
+
+# --- HTTP Client Configuration ---
+
+# Hosts each provider adapter keeps a connection pool for
+HTTP_POOL_CONNECTIONS = config_loader.get_int_config('HTTP_POOL_CONNECTIONS', 10)
+# Connections kept alive per host
+HTTP_POOL_MAXSIZE = config_loader.get_int_config('HTTP_POOL_MAXSIZE', 16)
+# Default timeout in seconds for hosts without their own setting
+HTTP_TIMEOUT_DEFAULT = config_loader.get_int_config('HTTP_TIMEOUT_DEFAULT', 30)
+# Default timeout in seconds for TMDb requests
+HTTP_TIMEOUT_TMDB = config_loader.get_int_config('HTTP_TIMEOUT_TMDB', 10)
+# Default timeout in seconds for Overpass (OpenStreetMap) queries
+HTTP_TIMEOUT_OVERPASS = config_loader.get_int_config('HTTP_TIMEOUT_OVERPASS', 60)
+# Timeout in seconds for Nominatim geocoding requests
+HTTP_TIMEOUT_NOMINATIM = config_loader.get_int_config('HTTP_TIMEOUT_NOMINATIM', 10)
+# Default timeout in seconds for ipinfo.io lookups
+HTTP_TIMEOUT_IPINFO = config_loader.get_int_config('HTTP_TIMEOUT_IPINFO', 5)
+# Enrich movie batches with concurrent requests from the async TMDb client
+TMDB_ASYNC_ENABLED = config_loader.get_bool_config('TMDB_ASYNC_ENABLED', True)
+# Maximum TMDb requests the async client has in flight at once per process
+TMDB_ASYNC_CONCURRENCY = config_loader.get_int_config('TMDB_ASYNC_CONCURRENCY', 8)
+
+# --- TMDb Cache Configuration ---
+
+# Answer repeated TMDb requests from the shared cache
+TMDB_CACHE_ENABLED = config_loader.get_bool_config('TMDB_CACHE_ENABLED', True)
+# Seconds movie details, images and genre lists stay fresh
+TMDB_CACHE_DETAILS_TTL = config_loader.get_int_config('TMDB_CACHE_DETAILS_TTL', 604800)
+# Seconds search and discover results stay fresh
+TMDB_CACHE_SEARCH_TTL = config_loader.get_int_config('TMDB_CACHE_SEARCH_TTL', 21600)
+# Seconds now playing, upcoming and popular lists stay fresh
+TMDB_CACHE_NOW_PLAYING_TTL = config_loader.get_int_config('TMDB_CACHE_NOW_PLAYING_TTL', 1800)
+# Seconds an expired response is kept for revalidation with ETag / Last-Modified
+TMDB_CACHE_STALE_TTL = config_loader.get_int_config('TMDB_CACHE_STALE_TTL', 604800)
+
+# --- Showtime Cache Configuration ---
+
+# Reuse SerpAPI showtimes per movie, location and local date until local midnight
+SHOWTIME_CACHE_ENABLED = config_loader.get_bool_config('SHOWTIME_CACHE_ENABLED', True)
+# Seconds cached showtimes are served without a background refresh
+SHOWTIME_CACHE_FRESH_TTL = config_loader.get_int_config('SHOWTIME_CACHE_FRESH_TTL', 14400)
+# Maximum seconds a First Run response is reused per location (0 disables caching First Run results)
+FIRST_RUN_CACHE_TTL = config_loader.get_int_config('FIRST_RUN_CACHE_TTL', 1800)
+
+# --- Negative Cache Configuration ---
+
+# Seconds a known-empty lookup (no showtimes, unknown location, TMDb 404) is remembered
+NEGATIVE_CACHE_TTL = config_loader.get_int_config('NEGATIVE_CACHE_TTL', 900)
+
+# --- Location Cache Configuration ---
+
+# Seconds a geocoded location is reused
+GEOCODE_CACHE_TTL = config_loader.get_int_config('GEOCODE_CACHE_TTL', 2592000)
+# Seconds an IP network's location is reused
+IP_LOCATION_CACHE_TTL = config_loader.get_int_config('IP_LOCATION_CACHE_TTL', 604800)
+# Decimal places user coordinates are rounded to (2 is about 1 km)
+LOCATION_COORDINATE_PRECISION = config_loader.get_int_config('LOCATION_COORDINATE_PRECISION', 2)
+# Geohash precision of the cells Overpass cinema results are cached by (4 is about 39 x 20 km)
+THEATER_CELL_PRECISION = config_loader.get_int_config('THEATER_CELL_PRECISION', 4)
+# Seconds a cell's cinemas are reused
+THEATER_CELL_CACHE_TTL = config_loader.get_int_config('THEATER_CELL_CACHE_TTL', 604800)
+
+# --- LLM Response Cache Configuration ---
+
+# Answer repeated agent prompts from the shared cache instead of the model
+LLM_RESPONSE_CACHE_ENABLED = config_loader.get_bool_config('LLM_RESPONSE_CACHE_ENABLED', True)
+# Seconds a cached LLM response is reused
+LLM_RESPONSE_CACHE_TTL = config_loader.get_int_config('LLM_RESPONSE_CACHE_TTL', 86400)
+# Longest response, in characters, that is stored
+LLM_RESPONSE_CACHE_MAX_CHARS = config_loader.get_int_config('LLM_RESPONSE_CACHE_MAX_CHARS', 20000)
+
+# --- Catalog Configuration ---
+
+# Keep now playing and popular titles in memory and answer matching searches from them
+CATALOG_ENABLED = config_loader.get_bool_config('CATALOG_ENABLED', True)
+# Seconds between catalog refreshes from TMDb
+CATALOG_REFRESH_INTERVAL = config_loader.get_int_config('CATALOG_REFRESH_INTERVAL', 1800)
+# Pages of now playing and of popular titles loaded per refresh (20 titles per page)
+CATALOG_PAGES = config_loader.get_int_config('CATALOG_PAGES', 3)
+
+# --- ASGI Configuration ---
+
+# Serve the recommendation and polling endpoints from native async views (requires an ASGI server)
+ASYNC_VIEWS_ENABLED = config_loader.get_bool_config('ASYNC_VIEWS_ENABLED', False)
+# Maximum seconds an async poll is held open waiting for its job to finish
+ASYNC_POLL_WAIT_SECONDS = config_loader.get_int_config('ASYNC_POLL_WAIT_SECONDS', 20)
+# Seconds between job status checks while an async poll is held open
+ASYNC_POLL_INTERVAL = config_loader.get_float_config('ASYNC_POLL_INTERVAL', 1.0)
+
+# --- Progress Stream Configuration ---
+
+# Stream job progress to the browser as Server-Sent Events instead of polling
+# (each open stream holds a connection, so use an ASGI or threaded server)
+JOB_EVENT_STREAM_ENABLED = config_loader.get_bool_config('JOB_EVENT_STREAM_ENABLED', False)
+# Maximum seconds a single stream stays open before the browser reconnects
+JOB_EVENT_STREAM_MAX_SECONDS = config_loader.get_int_config('JOB_EVENT_STREAM_MAX_SECONDS', 300)
+# Seconds between keep-alive comments on an idle stream
+JOB_EVENT_HEARTBEAT_SECONDS = config_loader.get_int_config('JOB_EVENT_HEARTBEAT_SECONDS', 15)
+# Seconds between checks for events recorded by other processes
+JOB_EVENT_POLL_INTERVAL = config_loader.get_float_config('JOB_EVENT_POLL_INTERVAL', 0.5)
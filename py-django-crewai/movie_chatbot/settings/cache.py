@@ -0,0 +1,62 @@
+# movie_chatbot/settings/cache.py
+
+import os
+from . import config_loader
+from .base import BASE_DIR # Import BASE_DIR
+
+# --- Cache ---
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# 'default' stays in local memory for Django itself. 'pipeline' holds the crew
+# results, theater lists and geocoded coordinates shared by every worker:
+# - memory: per-process LRU with a byte limit, lost on restart (development)
+# - locmem: Django's per-process cache
+# - file:   shared by the workers of one machine or instance
+# - db:     shared through the database (run `python manage.py createcachetable`)
+# - redis:  shared by the whole fleet (requires the `redis` package)
+
+_CACHE_BACKENDS = {
+    'memory': 'chatbot.services.memory_cache.MemoryCacheBackend',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+_CACHE_DEFAULT_LOCATIONS = {
+    'memory': 'movie-chatbot-pipeline',
+    'locmem': 'movie-chatbot-pipeline',
+    'file': os.path.join(BASE_DIR, '.cache', 'pipeline'),
+    'db': 'chatbot_pipeline_cache',
+    'redis': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+}
+
+# Backend for the shared pipeline cache: 'memory', 'locmem', 'file', 'db' or 'redis'
+CACHE_BACKEND = config_loader.get_config('CACHE_BACKEND', 'memory')
+if CACHE_BACKEND not in _CACHE_BACKENDS:
+    raise ValueError(f"CACHE_BACKEND must be one of {', '.join(_CACHE_BACKENDS)}, got '{CACHE_BACKEND}'")
+# Directory, table name or Redis URL, depending on the backend
+CACHE_LOCATION = config_loader.get_config('CACHE_LOCATION', _CACHE_DEFAULT_LOCATIONS[CACHE_BACKEND])
+# Seconds an entry lives when its cache does not set its own TTL
+CACHE_DEFAULT_TIMEOUT = config_loader.get_int_config('CACHE_DEFAULT_TIMEOUT', 3600)
+# Maximum entries kept by the memory, locmem, file and db backends before culling
+CACHE_MAX_ENTRIES = config_loader.get_int_config('CACHE_MAX_ENTRIES', 1000)
+# Maximum total size in bytes of the memory backend's pickled entries (0 for no limit)
+CACHE_MAX_BYTES = config_loader.get_int_config('CACHE_MAX_BYTES', 64 * 1024 * 1024)
+
+_pipeline_cache = {
+    'BACKEND': _CACHE_BACKENDS[CACHE_BACKEND],
+    'LOCATION': CACHE_LOCATION,
+    'TIMEOUT': CACHE_DEFAULT_TIMEOUT,
+    'KEY_PREFIX': 'chatbot',
+}
+if CACHE_BACKEND == 'memory':
+    _pipeline_cache['OPTIONS'] = {'MAX_ENTRIES': CACHE_MAX_ENTRIES, 'MAX_BYTES': CACHE_MAX_BYTES}
+elif CACHE_BACKEND != 'redis':
+    _pipeline_cache['OPTIONS'] = {'MAX_ENTRIES': CACHE_MAX_ENTRIES}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'pipeline': _pipeline_cache,
+}